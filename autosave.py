@@ -0,0 +1,310 @@
+import json
+import os
+import threading
+
+# Crash-safe autosave. Every preview update appends the line diff it just
+# applied to a journal, so saving costs as much as the edit rather than the
+# whole document. A background thread fsyncs the journal on a timer (one fsync
+# covers every edit since the last) and, once the journal grows past a size
+# threshold, folds it into a snapshot so recovery is one JSON load plus at
+# most a threshold's worth of deltas.
+#
+#   snapshot.json          {"seq": 120, "lines": [...]}
+#   journal-000000000121.jsonl
+#                          {"seq": 121, "ops": [[start, end, [lines]], ...], "count": 57}
+#
+# Compaction starts a new journal segment first and deletes the old segments
+# only once the snapshot is on disk, so a crash at any point leaves files that
+# replay to the last flushed edit. A clean exit removes everything.
+#
+# Every open tab of every running instance journals into a session directory
+# of its own and holds an OS lock on the lock file inside it for as long as it
+# runs. The OS drops the lock when the process dies, so a session whose lock
+# can be taken was left behind by a crash; sessions still locked belong to a
+# live instance and are never recovered or cleared.
+
+AUTOSAVE_DIR = os.path.join(os.path.expanduser('~'), '.readme-generator', 'autosave')
+SESSION_PREFIX = 'session-'
+LOCK_FILE = 'lock'
+SNAPSHOT_FILE = 'snapshot.json'
+SEGMENT_PREFIX = 'journal-'
+SEGMENT_SUFFIX = '.jsonl'
+
+
+def segment_name(first_seq):
+    # Zero-padded so segments sort in replay order
+    return f"{SEGMENT_PREFIX}{first_seq:012d}{SEGMENT_SUFFIX}"
+
+
+def list_segments(directory):
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return []
+    return sorted(name for name in names if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX))
+
+
+def apply_ops(lines, ops):
+    # Ops are stored bottom-up, so each one's line numbers are still those of the old text
+    for start, end, inserted in ops:
+        lines[start:end] = inserted
+
+
+def load_snapshot(directory):
+    try:
+        with open(os.path.join(directory, SNAPSHOT_FILE), 'r', encoding='utf-8') as file:
+            snapshot = json.load(file)
+        return snapshot['seq'], snapshot['lines']
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def lock_session(directory):
+    # Returns the open lock file, or None while another process holds the lock
+    file = open(os.path.join(directory, LOCK_FILE), 'a+b')
+    try:
+        if os.name == 'nt':
+            import msvcrt
+            file.seek(0)
+            msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        file.close()
+        return None
+    return file
+
+
+def discard_session(directory, lock):
+    # Deletes a session we hold the lock for, then lets go of the lock
+    for name in list_segments(directory) + [SNAPSHOT_FILE]:
+        try:
+            os.remove(os.path.join(directory, name))
+        except OSError:
+            pass
+    lock.close()
+    
+    # Only reached at exit or after a recovery, so startup never imports it
+    import shutil
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def list_sessions(root=AUTOSAVE_DIR):
+    # Newest first, so the most recent crash is offered first
+    try:
+        names = [name for name in os.listdir(root) if name.startswith(SESSION_PREFIX)]
+    except OSError:
+        return []
+    sessions = []
+    for name in names:
+        path = os.path.join(root, name)
+        try:
+            if os.path.isdir(path):
+                sessions.append((os.path.getmtime(path), path))
+        except OSError:
+            # Another instance cleared it after listdir
+            continue
+    return [path for _, path in sorted(sessions, reverse=True)]
+
+
+def recover_orphans(root=AUTOSAVE_DIR):
+    # Returns [(directory, lock, lines, edits_replayed), ...], newest first, for
+    # every session crashed instances left behind: one per tab they had open.
+    # The caller holds the locks until it calls discard_session, so two
+    # instances starting together can't both recover a session. Orphans with
+    # nothing in them are cleaned up on the way.
+    orphans = []
+    for directory in list_sessions(root):
+        try:
+            lock = lock_session(directory)
+        except OSError:
+            continue
+        if lock is None:
+            # A running instance's journal
+            continue
+        recovered = recover(directory)
+        if recovered is not None:
+            orphans.append((directory, lock) + recovered)
+        else:
+            discard_session(directory, lock)
+    return orphans
+
+
+def recover(directory):
+    # Returns (lines, edits_replayed) for the document a crashed session left
+    # behind, or None when there is nothing to recover. Replay stops at the first
+    # torn or out-of-sequence record; everything before it is intact.
+    snapshot = load_snapshot(directory)
+    seq, lines = snapshot if snapshot is not None else (0, [])
+    replayed = 0
+    
+    for name in list_segments(directory):
+        try:
+            with open(os.path.join(directory, name), 'r', encoding='utf-8') as file:
+                for raw in file:
+                    record = json.loads(raw)
+                    if record['seq'] <= seq:
+                        # Already folded into the snapshot
+                        continue
+                    if record['seq'] != seq + 1:
+                        raise ValueError(f"journal skips from {seq} to {record['seq']}")
+                    apply_ops(lines, record['ops'])
+                    if len(lines) != record['count']:
+                        raise ValueError(f"journal record {record['seq']} doesn't replay cleanly")
+                    seq += 1
+                    replayed += 1
+        except (OSError, ValueError, KeyError, TypeError):
+            break
+            
+    if snapshot is None and not replayed:
+        return None
+    return lines, replayed
+
+
+class Autosave:
+    def __init__(self, root=AUTOSAVE_DIR, flush_interval=1.0, compact_bytes=1024 * 1024):
+        self.root = root
+        self.directory = None
+        self.lock = None
+        self.flush_interval = flush_interval
+        self.compact_bytes = compact_bytes
+        
+        # The document as the journal knows it: the preview's line list after the last record
+        self.lines = []
+        self.seq = 0
+        
+        # Shared with the background thread
+        self.mutex = threading.Lock()
+        self.wake = threading.Event()
+        self.file = None
+        self.segment_bytes = 0
+        self.dirty = False
+        self.retired = []
+        self.compaction = None
+        self.closing = False
+        self.error = None
+        self.thread = None
+        
+    def start(self):
+        # Begins a fresh journal in a session directory of our own; other
+        # sessions, live or orphaned, are left alone
+        import tempfile
+        
+        os.makedirs(self.root, exist_ok=True)
+        self.directory = tempfile.mkdtemp(prefix=SESSION_PREFIX, dir=self.root)
+        self.lock = lock_session(self.directory)
+        if self.lock is None:
+            raise OSError(f"can't lock {self.directory}")
+        self.file = self._open_segment(1)
+        self.thread = threading.Thread(target=self._run, name='autosave', daemon=True)
+        self.thread.start()
+        return self
+        
+    def record(self, base, lines, changes):
+        # base, changes: IncrementalPreview.last_update; lines: the preview's new line list.
+        # The preview never mutates a line list it has replaced, so identity tells
+        # whether the diff starts from the text this journal last saw.
+        if self.error is not None:
+            raise self.error
+        if base is self.lines:
+            if not changes:
+                return
+            ops = [[old_start, old_end, lines[new_start:new_end]]
+                   for old_start, old_end, new_start, new_end in reversed(changes)]
+        else:
+            # The preview rebuilt from scratch (or an update was missed): journal the whole text
+            ops = [[0, len(self.lines), lines]]
+            
+        self.seq += 1
+        data = (json.dumps({'seq': self.seq, 'ops': ops, 'count': len(lines)}, ensure_ascii=False) + '\n').encode('utf-8')
+        
+        with self.mutex:
+            self.file.write(data)
+            self.segment_bytes += len(data)
+            self.dirty = True
+            
+            if self.segment_bytes >= self.compact_bytes and self.compaction is None:
+                # New edits go to a new segment while the thread snapshots this point
+                self.retired.append(self.file)
+                self.file = self._open_segment(self.seq + 1)
+                self.segment_bytes = 0
+                self.compaction = (self.seq, lines)
+                self.wake.set()
+                
+        self.lines = lines
+        
+    def close(self, discard=True):
+        # Flushes what is pending; a clean exit then leaves nothing to recover
+        if self.thread is None:
+            return
+        self.closing = True
+        self.wake.set()
+        self.thread.join()
+        self.thread = None
+        
+        with self.mutex:
+            for file in self.retired + [self.file]:
+                file.close()
+            self.retired = []
+            self.file = None
+        if discard:
+            discard_session(self.directory, self.lock)
+        else:
+            # Unlocked, the next start offers it for recovery
+            self.lock.close()
+        self.lock = None
+            
+                
+    def flush(self):
+        with self.mutex:
+            if not self.dirty and not self.retired:
+                return
+            file = self.file
+            retired, self.retired = self.retired, []
+            for pending in retired + [file]:
+                pending.flush()
+            self.dirty = False
+            
+        # fsync outside the lock so typing never waits on the disk
+        for pending in retired:
+            os.fsync(pending.fileno())
+            pending.close()
+        os.fsync(file.fileno())
+        
+    def _run(self):
+        while True:
+            self.wake.wait(self.flush_interval)
+            self.wake.clear()
+            try:
+                self.flush()
+                self._compact()
+            except (OSError, ValueError) as e:
+                self.error = e if isinstance(e, OSError) else OSError(str(e))
+                return
+            if self.closing:
+                return
+                
+    def _compact(self):
+        with self.mutex:
+            pending, self.compaction = self.compaction, None
+        if pending is None:
+            return
+            
+        from site_builder import write_atomic
+        
+        seq, lines = pending
+        write_atomic(os.path.join(self.directory, SNAPSHOT_FILE),
+                     json.dumps({'seq': seq, 'lines': lines}, ensure_ascii=False), fsync=True)
+        
+        # Every segment that starts before the one opened for seq + 1 is in the snapshot now
+        current = segment_name(seq + 1)
+        for name in list_segments(self.directory):
+            if name < current:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+                    
+    def _open_segment(self, first_seq):
+        return open(os.path.join(self.directory, segment_name(first_seq)), 'ab')
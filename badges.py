@@ -0,0 +1,261 @@
+import os
+import re
+import struct
+import zlib
+from collections import OrderedDict
+from urllib.parse import quote, unquote, urlsplit
+
+from rendering import content_hash
+
+# Offline badge rendering for the preview. Static shields.io badge URLs (the
+# kind BadgeDialog writes) are drawn locally into small PNGs with a built-in
+# bitmap font, so the preview can show real badges without any network
+# access. Rendered PNGs are kept in memory and in a size-capped disk cache.
+
+BADGE_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.readme-generator', 'badge-cache')
+
+# Bump when the drawing changes so stale disk entries are ignored
+RENDERER_VERSION = 1
+
+# shields.io's named colors
+NAMED_COLORS = {
+    'brightgreen': '4c1', 'green': '97ca00', 'yellowgreen': 'a4a61d', 'yellow': 'dfb317',
+    'orange': 'fe7d37', 'red': 'e05d44', 'blue': '007ec6', 'lightgrey': '9f9f9f', 'lightgray': '9f9f9f',
+    'grey': '555', 'gray': '555', 'blueviolet': '8a2be2', 'success': '4c1', 'important': 'fe7d37',
+    'critical': 'e05d44', 'informational': '007ec6', 'inactive': '9f9f9f',
+}
+LABEL_COLOR = '555'
+
+BADGE_MARKDOWN = re.compile(r'!\[[^\]]*\]\((https?://img\.shields\.io/badge/[^)\s]+)\)')
+
+# Classic 5x8 font for ASCII 0x20-0x7e: five column bytes per glyph, bit 0 at the top
+FONT_5X8 = bytes.fromhex(
+    '000000000000005F00000007000700147F147F14242A7F2A12231308646236495620500008070300'
+    '001C2241000041221C002A1C7F1C2A08083E08080080703000080808080800006060002010080402'
+    '3E5149453E00427F400072494949462141494D331814127F1027454545393C4A4949314121110907'
+    '3649494936464949291E000014000000403400000008142241141414141400412214080201590906'
+    '3E415D594E7C1211127C7F494949363E414141227F4141413E7F494949417F090909013E41415173'
+    '7F0808087F00417F41002040413F017F081422417F404040407F021C027F7F0408107F3E4141413E'
+    '7F090909063E4151215E7F09192946264949493203017F01033F4040403F1F2040201F3F4038403F'
+    '631408146303047804036159494D43007F4141410204081020004141417F04020102044040404040'
+    '000307080020545478407F284444383844444428384444287F385454541800087E090218A4A49C78'
+    '7F0804047800447D40002040403D007F1028440000417F40007C047804787C080404783844444438'
+    'FC1824241818242418FC7C08040408485454542404043F44243C4040207C1C2040201C3C4030403C'
+    '44281028444C9090907C4464544C440008364100000077000000413608000201020402'
+)
+GLYPH_WIDTH = 5
+GLYPH_ADVANCE = 6
+
+HEIGHT = 20
+PADDING = 6
+TEXT_TOP = 6
+
+
+def badge_url(label, message, color):
+    # Static badge URL with shields.io escaping: - and _ are doubled, spaces become _
+    def escape(text):
+        return quote(text.replace('-', '--').replace('_', '__').replace(' ', '_'), safe='_-.')
+    return f"https://img.shields.io/badge/{escape(label)}-{escape(message)}-{escape(color)}.svg"
+
+
+def parse_badge_url(url):
+    # (label, message, color) of a static shields.io badge, or None for anything else
+    parts = urlsplit(url)
+    if parts.hostname != 'img.shields.io' or not parts.path.startswith('/badge/'):
+        return None
+    spec = unquote(parts.path[len('/badge/'):])
+    spec = spec.rsplit('.', 1)[0] if spec.endswith(('.svg', '.png')) else spec
+    
+    # Split on single dashes only; -- is a literal dash
+    fields = [field.replace('\0', '-') for field in spec.replace('--', '\0').split('-')]
+    if len(fields) == 2:
+        fields.insert(0, '')
+    if len(fields) != 3:
+        return None
+    label, message, color = (field.replace('__', '\0').replace('_', ' ').replace('\0', '_') for field in fields)
+    return label, message, color
+
+
+def find_badges(line):
+    # (start, end, (label, message, color)) for each static badge image in a markdown line
+    for match in BADGE_MARKDOWN.finditer(line):
+        spec = parse_badge_url(match.group(1))
+        if spec is not None:
+            yield match.start(), match.end(), spec
+
+
+def badges_in(lines):
+    # Every badge spec the lines show
+    specs = set()
+    for line in lines:
+        if 'shields.io/badge/' in line:
+            specs.update(spec for _, _, spec in find_badges(line))
+    return specs
+
+
+def parse_color(color):
+    # (r, g, b) for a shields color name or hex value; unknown colors fall back to lightgrey
+    value = NAMED_COLORS.get(color.lower(), color.lstrip('#'))
+    if len(value) == 3:
+        value = ''.join(ch * 2 for ch in value)
+    try:
+        return tuple(bytes.fromhex(value)) if len(value) == 6 else parse_color('lightgrey')
+    except ValueError:
+        return parse_color('lightgrey')
+
+
+def text_width(text):
+    return max(0, len(text) * GLYPH_ADVANCE - 1)
+
+
+def render_badge_png(label, message, color):
+    # Draws a flat-style badge: grey label box, colored message box, white text
+    # with a faint shadow and rounded corners
+    label_width = text_width(label) + 2 * PADDING if label else 0
+    message_width = text_width(message) + 2 * PADDING
+    width = label_width + message_width
+    pixels = bytearray(width * HEIGHT * 4)
+    
+    def fill(x0, x1, rgb):
+        row = bytes(rgb) + b'\xff'
+        for y in range(HEIGHT):
+            start = (y * width + x0) * 4
+            pixels[start:start + (x1 - x0) * 4] = row * (x1 - x0)
+            
+    def draw_text(text, x, top, rgb, alpha=255):
+        for ch in text:
+            code = ord(ch)
+            glyph = code - 32 if 32 <= code < 127 else ord('?') - 32
+            for column in range(GLYPH_WIDTH):
+                bits = FONT_5X8[glyph * GLYPH_WIDTH + column]
+                row = 0
+                while bits:
+                    if bits & 1:
+                        offset = ((top + row) * width + x + column) * 4
+                        # Blend over the box color
+                        for channel in range(3):
+                            pixels[offset + channel] = (rgb[channel] * alpha + pixels[offset + channel] * (255 - alpha)) // 255
+                    bits >>= 1
+                    row += 1
+            x += GLYPH_ADVANCE
+            
+    if label:
+        fill(0, label_width, parse_color(LABEL_COLOR))
+    fill(label_width, width, parse_color(color))
+    # A faint shadow one pixel down, then the text on top of it
+    for x0, text in ((0, label), (label_width, message)):
+        if text:
+            draw_text(text, x0 + PADDING, TEXT_TOP + 1, (1, 1, 1), alpha=77)
+            draw_text(text, x0 + PADDING, TEXT_TOP, (255, 255, 255))
+            
+    # Rounded corners: clear the outermost corner pixels
+    for x, y in ((0, 0), (1, 0), (0, 1), (width - 1, 0), (width - 2, 0), (width - 1, 1),
+                 (0, HEIGHT - 1), (1, HEIGHT - 1), (0, HEIGHT - 2),
+                 (width - 1, HEIGHT - 1), (width - 2, HEIGHT - 1), (width - 1, HEIGHT - 2)):
+        pixels[(y * width + x) * 4 + 3] = 0
+        
+    return encode_png(width, HEIGHT, pixels)
+
+
+def encode_png(width, height, rgba):
+    # Minimal RGBA PNG: every scanline uses filter 0, all data in one IDAT chunk
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+    stride = width * 4
+    raw = b''.join(b'\x00' + bytes(rgba[y * stride:(y + 1) * stride]) for y in range(height))
+    return (b'\x89PNG\r\n\x1a\n'
+            + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(raw, 9))
+            + chunk(b'IEND', b''))
+
+
+class BadgeCache:
+    # Badge images by (label, message, color): an in-memory LRU of whatever
+    # make_image builds from the PNG (a Tk PhotoImage in the GUI), in front of
+    # a directory of PNGs that is trimmed oldest-first past max_disk_bytes.
+    # A PhotoImage is deleted from Tk with its last Python reference, so callers
+    # that keep showing an image must hold on to it themselves; eviction here
+    # only drops the cache's reference.
+    def __init__(self, make_image=None, directory=BADGE_CACHE_DIR, max_entries=256, max_disk_bytes=4 * 1024 * 1024):
+        self.make_image = make_image or (lambda png: png)
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.images = OrderedDict()
+        
+        # file name -> (mtime, size), scanned on the first write
+        self.disk_files = None
+        self.disk_bytes = 0
+        
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        
+    def get(self, label, message, color):
+        key = (label, message, color)
+        image = self.images.get(key)
+        if image is not None:
+            self.images.move_to_end(key)
+            self.hits += 1
+            return image
+            
+        name = content_hash('\n'.join(key), f"badge:{RENDERER_VERSION}") + '.png'
+        png = self._read(name)
+        if png is None:
+            self.misses += 1
+            png = render_badge_png(label, message, color)
+            self._write(name, png)
+        else:
+            self.disk_hits += 1
+            
+        image = self.images[key] = self.make_image(png)
+        while len(self.images) > self.max_entries:
+            self.images.popitem(last=False)
+        return image
+        
+    def _read(self, name):
+        path = os.path.join(self.directory, name)
+        try:
+            with open(path, 'rb') as file:
+                png = file.read()
+            # Recently used files survive trimming
+            os.utime(path)
+        except OSError:
+            return None
+        if self.disk_files is not None and name in self.disk_files:
+            self.disk_files[name] = (os.path.getmtime(path), self.disk_files[name][1])
+        return png
+        
+    def _write(self, name, png):
+        # The disk cache is an optimisation only; failures just mean rendering again next time
+        from site_builder import write_atomic
+        try:
+            if self.disk_files is None:
+                self._scan()
+            write_atomic(os.path.join(self.directory, name), png)
+        except OSError:
+            return
+        previous = self.disk_files.get(name)
+        self.disk_bytes += len(png) - (previous[1] if previous else 0)
+        self.disk_files[name] = (os.path.getmtime(os.path.join(self.directory, name)), len(png))
+        
+        while self.disk_bytes > self.max_disk_bytes and len(self.disk_files) > 1:
+            oldest = min(self.disk_files, key=lambda item: self.disk_files[item][0])
+            try:
+                os.remove(os.path.join(self.directory, oldest))
+            except OSError:
+                pass
+            self.disk_bytes -= self.disk_files.pop(oldest)[1]
+            
+    def _scan(self):
+        self.disk_files = {}
+        self.disk_bytes = 0
+        try:
+            entries = list(os.scandir(self.directory))
+        except OSError:
+            return
+        for entry in entries:
+            if entry.name.endswith('.png') and entry.is_file():
+                stat = entry.stat()
+                self.disk_files[entry.name] = (stat.st_mtime, stat.st_size)
+                self.disk_bytes += stat.st_size
@@ -0,0 +1,56 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import markdown
+
+from rendering import MARKDOWN_PROFILES, convert_markdown
+
+# Per-call setup cost of markdown.markdown(), which builds a new Markdown
+# object and loads every extension, against the pooled converter that keeps
+# one configured instance per thread and calls reset() between documents.
+#
+#   python benchmarks/bench_converter.py [calls]
+
+SMALL_DOCUMENT = "# Title\n\nSome **bold** text and a [link](https://example.com).\n"
+
+
+def load_readme():
+    readme = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'README.md')
+    with open(readme, 'r', encoding='utf-8') as file:
+        return file.read()
+
+
+def time_calls(convert, content, calls):
+    started = time.perf_counter()
+    for _ in range(calls):
+        convert(content)
+    return (time.perf_counter() - started) / calls * 1000
+
+
+def main(argv):
+    calls = int(argv[1]) if len(argv) > 1 else 200
+    settings = MARKDOWN_PROFILES['github']
+    
+    def rebuild(content):
+        return markdown.markdown(content, **settings)
+        
+    def pooled(content):
+        return convert_markdown(content, 'github')
+        
+    # Both must produce identical output, otherwise the comparison is meaningless
+    for content in (SMALL_DOCUMENT, load_readme()):
+        assert rebuild(content) == pooled(content)
+        
+    print(f"{calls} calls per case, ms per call")
+    for name, content in (('small document', SMALL_DOCUMENT), ('README.md', load_readme())):
+        fresh = time_calls(rebuild, content, calls)
+        reused = time_calls(pooled, content, calls)
+        print(f"  {name:15} markdown.markdown {fresh:7.3f}  pooled {reused:7.3f}  "
+              f"saved {fresh - reused:7.3f} ({fresh / reused:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
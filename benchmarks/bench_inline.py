@@ -0,0 +1,99 @@
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from formatting import classify_line, scan_inline
+
+# Micro-benchmark for the preview line scanner: the original four-regex
+# implementation against the single-pass scanner in formatting.py.
+#
+#   python benchmarks/bench_inline.py [lines]
+
+SAMPLE_LINES = [
+    "# Project Title",
+    "![Version](https://img.shields.io/badge/version-1.0.0-blue.svg)",
+    "A **professional**, feature-rich tool with *live* preview and `inline code`.",
+    "## 🔧 Usage",
+    "- [Installation](#installation) and [Usage](#usage)",
+    "- `param1` (type): Description with __strong__ and _emphasis_",
+    "```python",
+    "# Add code examples here",
+    "```",
+    "> Note: **bold** inside a quote with a [link](https://example.com/some_path_here)",
+    "1. Fork the Project",
+    "Plain paragraph text without any inline markup at all, just words.",
+    "",
+]
+
+
+def legacy_format_line(line):
+    spans = []
+    if line.startswith('# '):
+        spans.append(('h1', 0, len(line)))
+    elif line.startswith('## '):
+        spans.append(('h2', 0, len(line)))
+    elif line.startswith('### '):
+        spans.append(('h3', 0, len(line)))
+    elif line.startswith('#### '):
+        spans.append(('h4', 0, len(line)))
+    elif line.startswith('##### '):
+        spans.append(('h5', 0, len(line)))
+    elif line.startswith('###### '):
+        spans.append(('h6', 0, len(line)))
+    elif line.startswith('```'):
+        spans.append(('code_block', 0, len(line)))
+    elif line.startswith('> '):
+        spans.append(('blockquote', 0, len(line)))
+    elif line.strip().startswith('- ') or line.strip().startswith('* ') or re.match(r'^\s*\d+\.', line):
+        spans.append(('list_item', 0, len(line)))
+    elif '![' in line and 'shields.io' in line:
+        spans.append(('badge', 0, len(line)))
+        
+    for kind, pattern in (('bold', r'\*\*(.*?)\*\*|__(.*?)__'),
+                          ('italic', r'(?<!\*)\*(?!\*)([^*]+?)\*(?!\*)|(?<!_)_(?!_)([^_]+?)_(?!_)'),
+                          ('code', r'`([^`]+)`'),
+                          ('link', r'\[([^\]]+)\]\([^)]+\)')):
+        for match in re.finditer(pattern, line):
+            spans.append((kind, match.start(), match.end()))
+    return spans
+
+
+def scanner_format_line(line):
+    spans = []
+    block_tag = classify_line(line)
+    if block_tag:
+        spans.append((block_tag, 0, len(line)))
+    spans.extend(scan_inline(line))
+    return spans
+
+
+def run(format_line, lines, repeat=3):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for line in lines:
+            if line.strip():
+                format_line(line)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(argv):
+    line_count = int(argv[1]) if len(argv) > 1 else 50000
+    lines = [SAMPLE_LINES[i % len(SAMPLE_LINES)] for i in range(line_count)]
+    
+    legacy = run(legacy_format_line, lines)
+    scanner = run(scanner_format_line, lines)
+    
+    print(f"{line_count} lines")
+    print(f"  four regex passes : {legacy * 1000:8.1f} ms  {line_count / legacy:12,.0f} lines/s")
+    print(f"  single-pass scan  : {scanner * 1000:8.1f} ms  {line_count / scanner:12,.0f} lines/s")
+    print(f"  speedup           : {legacy / scanner:8.2f}x")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,229 @@
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import KINDS, generate
+from fake_text import RecordingText
+from preview import IncrementalPreview, build_paint_plan
+from rendering import convert_github_markdown
+
+# Benchmark suite for the preview and render hot paths, run against a
+# recording fake of the Text widget so it works without a display. For each
+# corpus kind and size it reports renders per second, Tcl calls per render and
+# peak traced memory, and compares them with benchmarks/baselines.json.
+#
+#   python benchmarks/bench_preview.py                     compare with the baselines
+#   python benchmarks/bench_preview.py --update-baselines  record new baselines
+#   python benchmarks/bench_preview.py --sizes 100 1000 --kinds code
+#
+# Tcl call counts are deterministic and must never go up. Speed and memory
+# vary between machines, so they only fail beyond --tolerance.
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+SIZES = (100, 1000, 10000, 100000)
+
+# Matches the preview in main.py
+VIRTUALIZE_THRESHOLD = 5000
+
+
+def edited_copy(content):
+    # The same document with one character typed in the middle line
+    lines = content.split('\n')
+    middle = len(lines) // 2
+    lines[middle] = lines[middle] + 'x'
+    return '\n'.join(lines)
+
+
+def scenario_paint(content):
+    # First render of a document into an empty preview
+    def setup():
+        widget = RecordingText()
+        return widget, IncrementalPreview(widget, virtualize_threshold=VIRTUALIZE_THRESHOLD)
+        
+    def run(state):
+        widget, preview = state
+        preview.update(content)
+        return widget.total_calls()
+    return setup, run
+
+
+def scenario_keystroke(content):
+    # Re-render after a single keystroke; alternates between the two versions
+    edited = edited_copy(content)
+    
+    def setup():
+        widget = RecordingText()
+        preview = IncrementalPreview(widget, virtualize_threshold=VIRTUALIZE_THRESHOLD)
+        preview.update(content)
+        return widget, preview, [edited, content]
+        
+    def run(state):
+        widget, preview, versions = state
+        widget.reset_calls()
+        preview.update(versions[0])
+        versions.reverse()
+        return widget.total_calls()
+    return setup, run
+
+
+def scenario_delta(content):
+    # The same keystroke with the changed range handed over by the editor proxy,
+    # so nothing is split or diffed
+    lines = content.split('\n')
+    edited = edited_copy(content).split('\n')
+    middle = len(lines) // 2
+    changes = [(middle, middle + 1, middle, middle + 1)]
+    
+    def setup():
+        widget = RecordingText()
+        preview = IncrementalPreview(widget, virtualize_threshold=VIRTUALIZE_THRESHOLD)
+        preview.update_lines(lines)
+        return widget, preview, [edited, lines]
+        
+    def run(state):
+        widget, preview, versions = state
+        widget.reset_calls()
+        preview.update_lines(versions[0], changes)
+        versions.reverse()
+        return widget.total_calls()
+    return setup, run
+
+
+def scenario_scan(content):
+    # Line classification and inline scanning on their own
+    lines = content.split('\n')
+    
+    def run(state):
+        build_paint_plan(lines, 1)
+        return 0
+    return lambda: None, run
+
+
+def scenario_html(content):
+    # Markdown to HTML, as used by the browser preview and the exporters
+    def run(state):
+        convert_github_markdown(content)
+        return 0
+    return lambda: None, run
+
+
+SCENARIOS = {
+    'paint': scenario_paint,
+    'keystroke': scenario_keystroke,
+    'delta': scenario_delta,
+    'scan': scenario_scan,
+    'html': scenario_html,
+}
+
+
+def measure(setup, run, min_time=0.3, max_repeat=50):
+    # Best per-render time over enough repeats to fill min_time
+    timings = []
+    tcl_calls = 0
+    spent = 0.0
+    while len(timings) < max_repeat and (spent < min_time or len(timings) < 3):
+        state = setup()
+        started = time.perf_counter()
+        tcl_calls = run(state)
+        elapsed = time.perf_counter() - started
+        timings.append(elapsed)
+        spent += elapsed
+        
+    # Peak memory is traced in a separate run since tracing slows everything down
+    state = setup()
+    tracemalloc.start()
+    try:
+        run(state)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+        
+    best = min(timings)
+    return {
+        'ops_per_sec': round(1 / best, 2) if best else float('inf'),
+        'tcl_calls': tcl_calls,
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+def run_suite(kinds, sizes, scenarios, html_max_lines):
+    results = {}
+    for kind in kinds:
+        for size in sizes:
+            content = generate(kind, size)
+            for name in scenarios:
+                if name == 'html' and size > html_max_lines:
+                    continue
+                key = f"{kind}/{size}/{name}"
+                results[key] = measure(*SCENARIOS[name](content))
+                print_result(key, results[key])
+    return results
+
+
+def print_result(key, result, note=''):
+    print(f"{key:<26} {result['ops_per_sec']:>12,.1f} ops/s {result['tcl_calls']:>8} tcl "
+          f"{result['peak_kb']:>10,.1f} KB peak{note}")
+
+
+def compare(results, baselines, tolerance):
+    # Returns a list of regression messages
+    regressions = []
+    for key, result in results.items():
+        baseline = baselines.get(key)
+        if baseline is None:
+            continue
+        if result['tcl_calls'] > baseline['tcl_calls']:
+            regressions.append(f"{key}: {result['tcl_calls']} Tcl calls per render (baseline {baseline['tcl_calls']})")
+        if result['ops_per_sec'] < baseline['ops_per_sec'] * (1 - tolerance):
+            regressions.append(f"{key}: {result['ops_per_sec']:,.1f} ops/s (baseline {baseline['ops_per_sec']:,.1f})")
+        if result['peak_kb'] > baseline['peak_kb'] * (1 + tolerance) + 64:
+            regressions.append(f"{key}: {result['peak_kb']:,.1f} KB peak (baseline {baseline['peak_kb']:,.1f})")
+    return regressions
+
+
+def load_baselines(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Preview and render benchmarks")
+    parser.add_argument('--kinds', nargs='+', choices=KINDS, default=list(KINDS))
+    parser.add_argument('--sizes', nargs='+', type=int, default=list(SIZES))
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--html-max-lines', type=int, default=10000,
+                        help="skip the markdown conversion above this many lines (default: 10000)")
+    parser.add_argument('--baselines', default=BASELINE_FILE)
+    parser.add_argument('--update-baselines', action='store_true', help="store these results as the new baselines")
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help="allowed slowdown or memory growth as a fraction (default: 0.5)")
+    args = parser.parse_args(argv)
+    
+    results = run_suite(args.kinds, args.sizes, args.scenarios, args.html_max_lines)
+    
+    if args.update_baselines:
+        baselines = load_baselines(args.baselines)
+        baselines.update(results)
+        with open(args.baselines, 'w', encoding='utf-8') as file:
+            json.dump(baselines, file, indent=1, sort_keys=True)
+            file.write('\n')
+        print(f"saved {len(results)} baselines to {args.baselines}")
+        return 0
+        
+    regressions = compare(results, load_baselines(args.baselines), args.tolerance)
+    for message in regressions:
+        print(f"REGRESSION  {message}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,63 @@
+import random
+
+# Synthetic READMEs for the benchmarks. Each generator returns a document of
+# exactly `lines` lines, deterministic for a given seed.
+
+KINDS = ('heading', 'list', 'code', 'badge')
+
+
+def _paragraph(rng):
+    words = ['markdown', 'preview', 'render', '**bold**', '*italic*', '`code`', '[link](https://example.com)',
+             'readme', 'generator', 'template', 'project', 'badge', '_emphasis_', 'the', 'a', 'with']
+    return ' '.join(rng.choice(words) for _ in range(rng.randint(6, 18)))
+
+
+def _heading_block(rng, index):
+    level = rng.randint(1, 4)
+    return ['#' * level + f" Section {index}", '', _paragraph(rng), '']
+
+
+def _list_block(rng, index):
+    block = [f"## List {index}", '']
+    for item in range(rng.randint(4, 10)):
+        marker = '-' if item % 3 else f"{item + 1}."
+        block.append(f"{marker} Item {item} {_paragraph(rng)}")
+    block.append('')
+    return block
+
+
+def _code_block(rng, index):
+    block = [f"### Example {index}", '', '```python']
+    for line in range(rng.randint(5, 15)):
+        block.append(f"value_{line} = compute(**options, *args)  # step `{line}`")
+    block.extend(['```', ''])
+    return block
+
+
+def _badge_block(rng, index):
+    colors = ('blue', 'green', 'orange', 'red', 'brightgreen')
+    block = []
+    for badge in range(rng.randint(3, 6)):
+        label = rng.choice(('version', 'license', 'build', 'coverage', 'downloads'))
+        block.append(f"![{label}](https://img.shields.io/badge/{label}-{index}.{badge}-{rng.choice(colors)}.svg)")
+    block.extend(['', _paragraph(rng), ''])
+    return block
+
+
+GENERATORS = {
+    'heading': _heading_block,
+    'list': _list_block,
+    'code': _code_block,
+    'badge': _badge_block,
+}
+
+
+def generate(kind, lines, seed=1234):
+    rng = random.Random(seed)
+    block_generator = GENERATORS[kind]
+    document = ['# Benchmark README', '']
+    index = 0
+    while len(document) < lines:
+        document.extend(block_generator(rng, index))
+        index += 1
+    return '\n'.join(document[:lines]) + '\n'
@@ -0,0 +1,57 @@
+# A stand-in for the preview ScrolledText that records every Tcl-level call
+# instead of talking to Tk, so the paint pipeline can be benchmarked in CI
+# without an X server. It tracks the line count so viewport queries stay
+# realistic, but keeps no text.
+
+
+class RecordingText:
+    def __init__(self, visible_lines=50):
+        self.visible_lines = visible_lines
+        self.line_count = 1
+        self.top_line = 1
+        self.calls = {}
+        self.inserted_chars = 0
+        
+    def _record(self, name):
+        self.calls[name] = self.calls.get(name, 0) + 1
+        
+    def reset_calls(self):
+        self.calls = {}
+        
+    def total_calls(self):
+        return sum(self.calls.values())
+        
+    def index(self, index):
+        self._record('index')
+        if index.startswith('@'):
+            y = int(index.split(',')[1])
+            line = self.top_line + (self.visible_lines - 1 if y > 0 else 0)
+            return f"{min(line, self.line_count)}.0"
+        return index
+        
+    def winfo_height(self):
+        self._record('winfo_height')
+        return 800
+        
+    def insert(self, index, text, *tags):
+        self._record('insert')
+        self.inserted_chars += len(text)
+        self.line_count += text.count('\n')
+        
+    def delete(self, start, end):
+        self._record('delete')
+        first = int(start.split('.')[0]) if start[0].isdigit() else 1
+        last = int(end.split('.')[0]) if end[0].isdigit() else self.line_count
+        self.line_count -= max(0, min(last, self.line_count) - first)
+        
+    def tag_add(self, tag, *indices):
+        self._record('tag_add')
+        
+    def tag_remove(self, tag, *indices):
+        self._record('tag_remove')
+        
+    def yview(self, *args):
+        self._record('yview')
+        
+    def after_idle(self, callback):
+        callback()
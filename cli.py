@@ -0,0 +1,214 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from rendering import GITHUB_CSS, build_html_page, content_hash, convert_github_markdown, profile_fingerprint
+from site_builder import build_site, find_markdown_files, write_atomic
+
+# Headless entry points. This module must never import tkinter (directly or
+# through main.py) so it starts fast on servers without a display.
+#
+#   python main.py render README.md docs/ -o out/
+#   python main.py site docs/ -o public/
+#   python main.py linkcheck README.md docs/
+
+RENDER_CACHE_FILE = '.readme-render-cache.json'
+
+# Changing the page CSS or converter settings invalidates every cached page
+RENDER_PROFILE = profile_fingerprint('github') + ':' + content_hash(GITHUB_CSS)
+
+
+def output_path_for(source, root, output_dir):
+    # Mirrors the source tree under output_dir, or writes next to the source
+    base = os.path.splitext(source)[0] + '.html'
+    if not output_dir:
+        return base
+    relative = os.path.relpath(base, root) if root else os.path.basename(base)
+    return os.path.join(output_dir, relative)
+
+
+def render_markdown_file(source, target):
+    # Runs in a worker process: read, convert, wrap in the GitHub page and write.
+    # Errors are returned rather than raised so one bad file doesn't stop the batch.
+    started = time.perf_counter()
+    try:
+        with open(source, 'r', encoding='utf-8') as file:
+            content = file.read()
+            
+        html = build_html_page(convert_github_markdown(content), title=os.path.basename(source))
+        
+        write_atomic(target, html)
+    except Exception as e:
+        return (time.perf_counter() - started) * 1000, str(e)
+    return (time.perf_counter() - started) * 1000, None
+
+
+def load_render_cache(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_render_cache(path, cache):
+    write_atomic(path, json.dumps(cache, indent=1, sort_keys=True))
+
+
+def plan_render_jobs(paths, output_dir, cache, force=False):
+    # Returns (jobs, skipped); a file is skipped when its content hash matches
+    # the last successful render and the output is still there
+    jobs, skipped = [], []
+    for path in paths:
+        root = path if os.path.isdir(path) else os.path.dirname(path)
+        for source in find_markdown_files([path]):
+            target = output_path_for(source, root, output_dir)
+            with open(source, 'rb') as file:
+                source_hash = content_hash(file.read().decode('utf-8', errors='replace'), RENDER_PROFILE)
+                
+            entry = cache.get(os.path.abspath(source))
+            if (not force and entry and entry.get('hash') == source_hash
+                    and entry.get('output') == os.path.abspath(target) and os.path.exists(target)):
+                skipped.append((source, target))
+            else:
+                jobs.append((source, target, source_hash))
+    return jobs, skipped
+
+
+def render_command(args):
+    cache_path = args.cache or os.path.join(args.output or '.', RENDER_CACHE_FILE)
+    cache = load_render_cache(cache_path)
+    
+    started = time.perf_counter()
+    jobs, skipped = plan_render_jobs(args.paths, args.output, cache, force=args.force)
+    
+    for source, target in skipped:
+        print(f"{'skipped':>10}  {source}")
+        
+    failures = 0
+    if jobs:
+        sources = [job[0] for job in jobs]
+        targets = [job[1] for job in jobs]
+        workers = args.jobs or os.cpu_count() or 1
+        
+        if workers == 1 or len(jobs) == 1:
+            results = map(render_markdown_file, sources, targets)
+            executor = None
+        else:
+            # Chunking keeps per-file IPC overhead low when rendering hundreds of small READMEs
+            chunk_size = args.chunk_size or max(1, len(jobs) // (workers * 4))
+            executor = ProcessPoolExecutor(max_workers=workers)
+            results = executor.map(render_markdown_file, sources, targets, chunksize=chunk_size)
+            
+        try:
+            for (source, target, source_hash), (elapsed, error) in zip(jobs, results):
+                if error is not None:
+                    failures += 1
+                    print(f"{'FAILED':>10}  {source}: {error}", file=sys.stderr)
+                    continue
+                print(f"{elapsed:8.1f}ms  {source} -> {target}")
+                cache[os.path.abspath(source)] = {'hash': source_hash, 'output': os.path.abspath(target)}
+        finally:
+            if executor is not None:
+                executor.shutdown()
+                
+    save_render_cache(cache_path, cache)
+    
+    total = (time.perf_counter() - started) * 1000
+    print(f"rendered {len(jobs) - failures}, skipped {len(skipped)}, failed {failures} in {total:.1f}ms")
+    return 1 if failures else 0
+
+
+def site_command(args):
+    def report_page(relative_source, target, elapsed, error):
+        if error is not None:
+            print(f"{'FAILED':>10}  {relative_source}: {error}", file=sys.stderr)
+        else:
+            print(f"{elapsed:8.1f}ms  {relative_source} -> {target}")
+            
+    report = build_site(args.source, args.output, jobs=args.jobs, force=args.force, on_page=report_page)
+    print(report.summary())
+    return 1 if report.failed else 0
+
+
+def linkcheck_command(args):
+    from linkcheck import LINK_CACHE_FILE, LinkCache, LinkChecker, extract_links
+    
+    # url -> [(file, line)] so each URL is checked once however often it appears
+    locations = {}
+    for source in find_markdown_files(args.paths):
+        with open(source, 'r', encoding='utf-8', errors='replace') as file:
+            content = file.read()
+        for occurrence in extract_links(content):
+            locations.setdefault(occurrence.url, []).append((source, occurrence.line))
+            
+    if not locations:
+        print("no links found")
+        return 0
+        
+    cache = None if args.no_cache else LinkCache(args.cache or LINK_CACHE_FILE, ttl=args.ttl)
+    checker = LinkChecker(per_host=args.per_host, concurrency=args.concurrency, timeout=args.timeout, cache=cache)
+    
+    started = time.perf_counter()
+    results = checker.run(list(locations))
+    
+    broken = 0
+    for url, result in results.items():
+        if result.ok:
+            if args.verbose:
+                print(f"{'ok':>6} {result.status}  {url}{'  (cached)' if result.cached else ''}")
+            continue
+        broken += 1
+        where = ', '.join(f"{source}:{line}" for source, line in locations[url])
+        print(f"{'BROKEN':>6} {result.error}  {url}  ({where})", file=sys.stderr)
+        
+    total = (time.perf_counter() - started) * 1000
+    cached = sum(1 for result in results.values() if result.cached)
+    print(f"checked {len(results)} links ({cached} cached), {broken} broken in {total:.1f}ms")
+    return 1 if broken else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='main.py', description="Headless README rendering")
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    render = commands.add_parser('render', help="render markdown files or directory trees to GitHub-styled HTML")
+    render.add_argument('paths', nargs='+', help="markdown files or directories to scan for .md files")
+    render.add_argument('-o', '--output', help="output directory (default: next to each source file)")
+    render.add_argument('-j', '--jobs', type=int, help="worker processes (default: CPU count)")
+    render.add_argument('--chunk-size', type=int, help="files handed to a worker at a time")
+    render.add_argument('--cache', help=f"render cache file (default: OUTPUT/{RENDER_CACHE_FILE})")
+    render.add_argument('--force', action='store_true', help="render even if the source is unchanged")
+    render.set_defaults(handler=render_command)
+    
+    site = commands.add_parser('site', help="export a folder of markdown docs as a static HTML site")
+    site.add_argument('source', help="folder of READMEs and docs")
+    site.add_argument('-o', '--output', required=True, help="site output directory")
+    site.add_argument('-j', '--jobs', type=int, help="worker processes (default: CPU count)")
+    site.add_argument('--force', action='store_true', help="rebuild every page")
+    site.set_defaults(handler=site_command)
+    
+    linkcheck = commands.add_parser('linkcheck', help="check every http(s) link and badge in markdown files")
+    linkcheck.add_argument('paths', nargs='+', help="markdown files or directories to scan for .md files")
+    linkcheck.add_argument('--per-host', type=int, default=4, help="connections per host (default: 4)")
+    linkcheck.add_argument('--concurrency', type=int, default=32, help="checks in flight at once (default: 32)")
+    linkcheck.add_argument('--timeout', type=float, default=10.0, help="seconds per link (default: 10)")
+    linkcheck.add_argument('--ttl', type=int, default=24 * 3600, help="seconds a good result stays cached (default: 86400)")
+    linkcheck.add_argument('--cache', help="result cache file (default: ~/.readme-generator/linkcheck-cache.json)")
+    linkcheck.add_argument('--no-cache', action='store_true', help="check everything over the network")
+    linkcheck.add_argument('-v', '--verbose', action='store_true', help="list working links too")
+    linkcheck.set_defaults(handler=linkcheck_command)
+    
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,124 @@
+import os
+from collections import OrderedDict
+
+from history import EditHistory
+from outline import HeadingIndex
+from rendering import RenderCache
+
+# Multi-document state. Every open README is a Document; the app shows one at
+# a time and points its editor, preview and caches at the active one.
+#
+# A tab's editor holds its text and is always kept. Its preview widget, the
+# IncrementalPreview paint state and the render cache are only a view of that
+# text, so once the previews together pass a memory cap, inactive tabs give
+# them up, least recently used first. Switching back repaints from the text.
+
+MEMORY_CAP_ENV = 'README_PREVIEW_MEMORY_MB'
+DEFAULT_MEMORY_CAP_MB = 64
+
+# Rough cost of a character in Tk's text B-tree and of one tagged preview line
+TEXT_BYTES_PER_CHAR = 4
+TAGGED_LINE_BYTES = 96
+
+
+def default_memory_cap():
+    try:
+        return int(float(os.environ.get(MEMORY_CAP_ENV, DEFAULT_MEMORY_CAP_MB)) * 1024 * 1024)
+    except ValueError:
+        return DEFAULT_MEMORY_CAP_MB * 1024 * 1024
+
+
+class Document:
+    def __init__(self, title, project_info, path=None):
+        self.title = title
+        self.path = path
+        self.project_info = project_info
+        
+        self.heading_index = HeadingIndex()
+        self.history = EditHistory()
+        self.render_cache = RenderCache()
+        self.link_results = {}
+        self.link_total = 0
+        
+        # Badge images the preview embeds, by spec: the references that keep Tk
+        # from deleting them once the shared badge cache lets them go
+        self.badge_images = {}
+        
+        # This tab's crash journal, once the app has started autosave
+        self.autosave = None
+        
+        # Tk widgets, created by the app; preview and preview_engine are None while evicted
+        self.editor = None
+        self.editor_proxy = None
+        self.preview = None
+        self.preview_engine = None
+        
+        # Where the preview was scrolled to when it was last hidden
+        self.preview_yview = 0.0
+        
+    def preview_bytes(self):
+        # Estimated memory this tab would free by dropping its preview and caches
+        total = sum(len(html) for html in self.render_cache.entries.values())
+        engine = self.preview_engine
+        if engine is not None and engine.lines is not None:
+            total += sum(map(len, engine.lines)) * TEXT_BYTES_PER_CHAR
+            total += sum(engine.tagged) * TAGGED_LINE_BYTES
+        return total
+
+
+class DocumentSet:
+    # Documents in tab order, plus an LRU order for eviction
+    def __init__(self, memory_cap=None):
+        self.memory_cap = default_memory_cap() if memory_cap is None else memory_cap
+        self.documents = []
+        self.recent = OrderedDict()
+        self.active = None
+        self.untitled = 0
+        
+    def __len__(self):
+        return len(self.documents)
+        
+    def next_title(self):
+        self.untitled += 1
+        return f"Untitled {self.untitled}"
+        
+    def add(self, document):
+        self.documents.append(document)
+        self.recent[id(document)] = document
+        
+    def remove(self, document):
+        self.documents.remove(document)
+        self.recent.pop(id(document), None)
+        if self.active is document:
+            self.active = None
+            
+    def activate(self, document):
+        self.active = document
+        self.recent.move_to_end(id(document))
+        
+    def find(self, predicate):
+        for document in self.documents:
+            if predicate(document):
+                return document
+        return None
+        
+    def preview_bytes(self):
+        return sum(document.preview_bytes() for document in self.documents)
+        
+    def evict(self, release):
+        # Calls release(document) on the least recently used inactive tabs that
+        # still have a preview until the total fits the cap. The active tab is
+        # never evicted, even if it alone is over the cap.
+        sizes = {id(document): document.preview_bytes() for document in self.documents
+                 if document.preview is not None}
+        total = sum(sizes.values())
+        evicted = []
+        for key, document in list(self.recent.items()):
+            if total <= self.memory_cap:
+                break
+            if document is self.active or key not in sizes:
+                continue
+            release(document)
+            total -= sizes[key]
+            evicted.append(document)
+        return evicted
@@ -0,0 +1,158 @@
+from collections import namedtuple
+from tkinter import TclError
+
+# Edit capture for the editor. Every change to a Tk Text widget, typed or
+# programmatic, goes through its Tcl widget command, so renaming that command
+# and putting a Python one in its place sees each insert, delete and replace
+# before Tk applies it. The proxy keeps a shadow copy of the text as a line
+# list and, after each edit, re-reads only the lines the edit touched.
+#
+# Consumers never copy the whole document out of Tk again: the preview takes a
+# snapshot of the line list plus the one line range that changed since its
+# last snapshot, and everything downstream follows that range.
+#
+# The line list has the shape of editor.get(1.0, 'end').split('\n'): the last
+# entry is always the '' after Tk's final newline, and edits never touch it.
+
+# index: where the edit starts ("line.column", before the edit); removed and
+# inserted: the text itself; first_line, old_end, new_end: the 0-based lines it
+# replaced, [first_line, old_end) before and [first_line, new_end) after
+EditEvent = namedtuple('EditEvent', ['index', 'removed', 'inserted', 'first_line', 'old_end', 'new_end'])
+
+EDIT_OPERATIONS = ('insert', 'delete', 'replace')
+
+
+class EditorProxy:
+    def __init__(self, widget, on_edit=None):
+        self.widget = widget
+        self.on_edit = on_edit
+        self.name = str(widget)
+        self.original = self.name + '_proxied'
+        
+        widget.tk.call('rename', self.name, self.original)
+        widget.tk.createcommand(self.name, self._dispatch)
+        widget.bind('<Destroy>', self._on_destroy, add='+')
+        
+        self.lines = None
+        self.chars = 0
+        self.resync()
+        
+    def resync(self):
+        # Reads the whole text once; edits keep it current from here on
+        text = self._call('get', '1.0', 'end')
+        self.lines = text.split('\n')
+        self.chars = len(text) - 1
+        
+        # [start, old_end) of the last snapshot became [start, new_end), or None if nothing changed
+        self.dirty = None
+        self.snapshot_lines = None
+        
+    def text(self):
+        # The same string editor.get(1.0, 'end') returns, without asking Tk
+        return '\n'.join(self.lines)
+        
+    def snapshot(self, base):
+        # Returns (lines, changes): a copy of the line list and the diff_lines
+        # style ranges that turn base into it. base must be the list the previous
+        # snapshot returned; for anything else changes is None and the caller diffs.
+        if base is None or base is not self.snapshot_lines:
+            changes = None
+        elif self.dirty is None:
+            return base, []
+        else:
+            start, old_end, new_end = self.dirty
+            
+            # The range can cover lines that were edited back to what they were
+            while start < old_end and start < new_end and base[start] == self.lines[start]:
+                start += 1
+            while old_end > start and new_end > start and base[old_end - 1] == self.lines[new_end - 1]:
+                old_end -= 1
+                new_end -= 1
+            if start == old_end and start == new_end:
+                self.dirty = None
+                return base, []
+            changes = [(start, old_end, start, new_end)]
+            
+        # Copies references to the line strings, not the text
+        lines = self.lines[:]
+        self.dirty = None
+        self.snapshot_lines = lines
+        return lines, changes
+        
+    def close(self):
+        # Puts the original widget command back
+        if self.original is None:
+            return
+        try:
+            self.widget.tk.deletecommand(self.name)
+            self.widget.tk.call('rename', self.original, self.name)
+        except TclError:
+            # Tk deletes the original itself when the widget is destroyed
+            pass
+        self.original = None
+        
+    def _call(self, *args):
+        return self.widget.tk.call((self.original,) + args)
+        
+    def _dispatch(self, operation, *args):
+        if operation in EDIT_OPERATIONS and args:
+            return self._edit(operation, args)
+        return self._call(operation, *args)
+        
+    def _edit(self, operation, args):
+        total = len(self.lines) - 1
+        if operation == 'delete' and len(args) > 2:
+            # Several ranges at once: nothing in the app does this, so just re-read everything
+            start, end = '1.0', str(self._call('index', 'end-1c'))
+            removed = ''.join(self._call('get', *args[i:i + 2]) for i in range(0, len(args), 2))
+            inserted = ''
+        else:
+            # Tk never edits past the newline it keeps at the very end
+            start = self._clamp(args[0])
+            if operation == 'insert':
+                end = start
+                inserted = ''.join(args[1::2])
+            elif len(args) == 1:
+                end = self._clamp(f"{start} +1c")
+                inserted = ''
+            else:
+                end = self._clamp(args[1])
+                inserted = ''.join(args[2::2]) if operation == 'replace' else ''
+            removed = self._call('get', start, end) if end != start else ''
+            
+        first_line = int(start.split('.')[0]) - 1
+        last_line = max(first_line, int(end.split('.')[0]) - 1)
+        
+        result = self._call(operation, *args)
+        
+        # Only the touched lines are read back, however long the document is
+        new_total = int(str(self._call('index', 'end-1c')).split('.')[0])
+        new_last = last_line + new_total - total
+        new = self._call('get', f"{first_line + 1}.0", f"{new_last + 1}.end").split('\n')
+        old = self.lines[first_line:last_line + 1]
+        self.chars += sum(map(len, new)) - sum(map(len, old)) + new_total - total
+        self.lines[first_line:last_line + 1] = new
+        
+        self._mark(first_line, last_line + 1, new_last + 1)
+        if self.on_edit is not None:
+            self.on_edit(EditEvent(start, removed, inserted, first_line, last_line + 1, new_last + 1))
+        return result
+        
+    def _clamp(self, index):
+        index = str(self._call('index', index))
+        if self.widget.tk.getboolean(self._call('compare', index, '>', 'end-1c')):
+            return str(self._call('index', 'end-1c'))
+        return index
+        
+    def _mark(self, first_line, old_end, new_end):
+        # Grows the dirty range to cover an edit given in current line numbers
+        if self.dirty is None:
+            self.dirty = (first_line, old_end, new_end)
+            return
+        start, dirty_old_end, dirty_new_end = self.dirty
+        end = max(dirty_new_end, old_end)
+        self.dirty = (min(start, first_line), dirty_old_end + end - dirty_new_end, end + new_end - old_end)
+        
+    def _on_destroy(self, event):
+        if event.widget is self.widget:
+            self.close()
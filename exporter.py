@@ -0,0 +1,244 @@
+import os
+import queue
+import re
+import threading
+import time
+from html.parser import HTMLParser
+
+from rendering import build_html_page, convert_github_markdown
+from site_builder import write_atomic
+
+# One-pass export of the current document. The markdown is converted once by
+# the shared converter and every format is derived from that result: the
+# source itself, a standalone GitHub-styled page, and plain text stripped from
+# the rendered HTML (so lists, tables and code read the way the preview shows
+# them). Targets are written concurrently, each through a temp file and a
+# rename, and a target that already holds the same bytes is left untouched so
+# its mtime doesn't change and watchers don't fire.
+
+EXPORT_FORMATS = {
+    'md': '.md',
+    'html': '.html',
+    'txt': '.txt',
+}
+
+_BLOCK_TAGS = frozenset(('address', 'article', 'aside', 'blockquote', 'dd', 'details', 'div', 'dl', 'dt',
+                         'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+                         'header', 'hr', 'main', 'nav', 'ol', 'p', 'pre', 'section', 'summary', 'table', 'ul'))
+_SKIPPED_TAGS = frozenset(('script', 'style', 'head', 'title'))
+_WHITESPACE = re.compile(r'\s+')
+
+
+class _TextExtractor(HTMLParser):
+    # Paragraph-level elements are separated by a blank line, list items and
+    # table rows start a new line, and whitespace is collapsed outside <pre>
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.pending_break = 0
+        self.at_line_start = True
+        self.skip_depth = 0
+        self.pre_depth = 0
+        self.lists = []
+        self.row_has_cell = False
+        self.after_marker = False
+        
+    def text(self):
+        return '\n'.join(line.rstrip() for line in ''.join(self.parts).split('\n')).strip('\n') + '\n'
+        
+    def line_break(self, count):
+        if self.after_marker:
+            # The <p> of a loose list item stays on the bullet's line
+            return
+        self.pending_break = max(self.pending_break, count)
+        
+    def emit(self, text, markup=False):
+        if (self.at_line_start or self.pending_break) and not self.pre_depth and not markup:
+            # Whitespace between blocks would otherwise stack up blank lines
+            text = text.lstrip()
+            if not text:
+                return
+        if self.pending_break and self.parts:
+            # A <pre> block already ends its last line
+            self.parts.append('\n' * (self.pending_break - self.parts[-1].endswith('\n')))
+        self.pending_break = 0
+        self.parts.append(text)
+        self.at_line_start = text.endswith('\n')
+        self.after_marker = markup and text.endswith(('- ', '. '))
+        
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIPPED_TAGS:
+            self.skip_depth += 1
+            return
+        if tag in _BLOCK_TAGS:
+            self.line_break(1 if self.lists and tag in ('ul', 'ol', 'p') else 2)
+        if tag == 'pre':
+            self.pre_depth += 1
+        elif tag == 'br':
+            self.line_break(1)
+        elif tag == 'hr':
+            self.emit('-' * 40, markup=True)
+            self.line_break(2)
+        elif tag in ('ul', 'ol'):
+            self.lists.append(0 if tag == 'ol' else None)
+        elif tag == 'li':
+            self.after_marker = False
+            self.line_break(1)
+            indent = '  ' * max(0, len(self.lists) - 1)
+            if self.lists and self.lists[-1] is not None:
+                self.lists[-1] += 1
+                self.emit(f"{indent}{self.lists[-1]}. ", markup=True)
+            else:
+                self.emit(f"{indent}- ", markup=True)
+        elif tag == 'tr':
+            self.line_break(1)
+            self.row_has_cell = False
+        elif tag in ('td', 'th'):
+            if self.row_has_cell:
+                self.parts[-1] = self.parts[-1].rstrip(' ')
+                self.emit(' | ', markup=True)
+            self.row_has_cell = True
+        elif tag == 'img':
+            alt = dict(attrs).get('alt')
+            if alt:
+                self.emit(alt)
+                
+    def handle_endtag(self, tag):
+        if tag in _SKIPPED_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+            return
+        if tag == 'pre':
+            self.pre_depth = max(0, self.pre_depth - 1)
+        elif tag in ('ul', 'ol') and self.lists:
+            self.lists.pop()
+        if tag in _BLOCK_TAGS:
+            self.line_break(1 if self.lists and tag in ('ul', 'ol', 'p') else 2)
+            
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        if not self.pre_depth:
+            data = _WHITESPACE.sub(' ', data)
+            if data.startswith(' ') and (self.at_line_start or (self.parts and self.parts[-1].endswith(' '))):
+                data = data[1:]
+                if not data:
+                    return
+        self.emit(data)
+
+
+def html_to_text(html):
+    extractor = _TextExtractor()
+    extractor.feed(html)
+    extractor.close()
+    return extractor.text()
+
+
+def render_exports(markdown_content, formats, title='README', html=None):
+    # Returns {format: bytes}. Pass html when the document is already rendered
+    # (the GUI's render cache) and the converter isn't run at all.
+    if html is None and ('html' in formats or 'txt' in formats):
+        html = convert_github_markdown(markdown_content)
+        
+    outputs = {}
+    for export_format in formats:
+        if export_format == 'md':
+            data = markdown_content
+        elif export_format == 'html':
+            data = build_html_page(html, title=title)
+        elif export_format == 'txt':
+            data = html_to_text(html)
+        else:
+            raise ValueError(f"Unknown export format: {export_format}")
+        outputs[export_format] = data.encode('utf-8')
+    return outputs
+
+
+def write_if_changed(path, data):
+    # Returns False when the file already holds exactly these bytes
+    try:
+        if os.path.getsize(path) == len(data):
+            with open(path, 'rb') as file:
+                if file.read() == data:
+                    return False
+    except OSError:
+        pass
+    write_atomic(path, data)
+    return True
+
+
+class ExportReport:
+    def __init__(self):
+        self.written = []
+        self.unchanged = []
+        self.failed = []
+        self.elapsed_ms = 0.0
+        
+    def summary(self):
+        return (f"wrote {len(self.written)}, unchanged {len(self.unchanged)}, failed {len(self.failed)} "
+                f"in {self.elapsed_ms:.1f}ms")
+
+
+def export_paths(base_path, formats=tuple(EXPORT_FORMATS)):
+    # README.md -> {README.md: md, README.html: html, README.txt: txt}
+    stem = os.path.splitext(base_path)[0]
+    return {stem + EXPORT_FORMATS[export_format]: export_format for export_format in formats}
+
+
+def export_document(markdown_content, targets, title='README', html=None):
+    # targets maps each output path to its format
+    from concurrent.futures import ThreadPoolExecutor
+    
+    started = time.perf_counter()
+    report = ExportReport()
+    outputs = render_exports(markdown_content, set(targets.values()), title=title, html=html)
+    
+    # The writes are I/O bound, so threads overlap the temp-file writes and renames
+    with ThreadPoolExecutor(max_workers=len(targets) or 1) as executor:
+        futures = [(path, executor.submit(write_if_changed, path, outputs[export_format]))
+                   for path, export_format in targets.items()]
+        for path, future in futures:
+            try:
+                (report.written if future.result() else report.unchanged).append(path)
+            except OSError as e:
+                report.failed.append((path, str(e)))
+                
+    report.elapsed_ms = (time.perf_counter() - started) * 1000
+    return report
+
+
+class BackgroundExport:
+    # Runs export_document on a thread of its own and hands the report to the
+    # Tk loop, which polls for it with after(). Exports stay out of the render
+    # worker, whose newest-job-wins queue would let a preview render drop them.
+    def __init__(self, root, markdown_content, targets, title='README', html=None, on_done=None, poll_interval=50):
+        self.root = root
+        self.markdown_content = markdown_content
+        self.targets = dict(targets)
+        self.title = title
+        self.html = html
+        self.on_done = on_done
+        self.poll_interval = poll_interval
+        self.results = queue.Queue()
+        self.poll_id = None
+        self.thread = threading.Thread(target=self._work, name='export', daemon=True)
+        
+    def start(self):
+        self.thread.start()
+        self.poll_id = self.root.after(self.poll_interval, self._poll)
+        return self
+        
+    def _work(self):
+        try:
+            self.results.put((export_document(self.markdown_content, self.targets, title=self.title, html=self.html), None))
+        except Exception as e:
+            self.results.put((None, e))
+            
+    def _poll(self):
+        try:
+            report, error = self.results.get_nowait()
+        except queue.Empty:
+            self.poll_id = self.root.after(self.poll_interval, self._poll)
+            return
+        self.poll_id = None
+        if self.on_done:
+            self.on_done(report, error)
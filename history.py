@@ -0,0 +1,196 @@
+import time
+from collections import deque
+
+from preview import diff_lines
+
+# Undo/redo built from the line diffs the preview already computes. A step
+# is a list of (old_start, new_start, old_lines, new_lines) ops; the line
+# lists are slices of the preview's line lists, so they share the strings
+# with the document instead of copying them, and a whole template
+# replacement costs one step holding references to the old lines.
+#
+# Edits arriving within merge_ms of each other that stay inside the lines
+# the previous step produced (typing, Enter, backspace) extend that step, so
+# a typing run undoes in one go. Steps are charged by their line bytes, and
+# the oldest are dropped once the history passes its byte budget.
+#
+# Line lists are editor.get(1.0, 'end').split('\n'): the last entry is
+# always the '' after Tk's final newline, and ops never include it, so
+# every op maps onto whole lines of the Text widget.
+
+DEFAULT_BUDGET_BYTES = 4 * 1024 * 1024
+
+# Rough per-line and per-step cost beyond the characters themselves
+LINE_OVERHEAD_BYTES = 56
+STEP_OVERHEAD_BYTES = 128
+
+
+def line_bytes(lines):
+    return sum(len(line) for line in lines) + LINE_OVERHEAD_BYTES * len(lines)
+
+
+class EditStep:
+    def __init__(self, ops, when):
+        self.ops = ops
+        self.started = when
+        self.updated = when
+        self.size = STEP_OVERHEAD_BYTES + sum(line_bytes(old) + line_bytes(new) for _, _, old, new in ops)
+
+
+def build_ops(base, lines, changes):
+    # diff_lines ranges -> ops that leave the trailing '' alone
+    ops = []
+    for old_start, old_end, new_start, new_end in changes:
+        if old_end == len(base) and new_end == len(lines):
+            if old_start == old_end or new_start == new_end:
+                # A pure insert or delete at the very end: pull in the line
+                # above, which is the same on both sides
+                old_start -= 1
+                new_start -= 1
+            old_end -= 1
+            new_end -= 1
+        if old_start == old_end and new_start == new_end:
+            continue
+        ops.append((old_start, new_start, base[old_start:old_end], lines[new_start:new_end]))
+    return ops
+
+
+def replace_lines(widget, start, count, lines, total):
+    # Replaces count whole lines of the Text widget from 0-based line start
+    # with lines; total is how many lines the widget has
+    if start + count < total:
+        if count:
+            widget.delete(f"{start + 1}.0", f"{start + count + 1}.0")
+        if lines:
+            widget.insert(f"{start + 1}.0", ''.join(line + '\n' for line in lines))
+    elif not count:
+        # After the last line, which has no newline of its own yet
+        if lines:
+            widget.insert('end-1c', ''.join('\n' + line for line in lines))
+    elif lines:
+        # Up to the end of the text
+        widget.delete(f"{start + 1}.0", 'end-1c')
+        widget.insert(f"{start + 1}.0", '\n'.join(lines))
+    else:
+        # Dropping the last lines also drops the newline that ended the line before
+        widget.delete(f"{start}.end", 'end-1c')
+
+
+class EditHistory:
+    def __init__(self, budget_bytes=DEFAULT_BUDGET_BYTES, merge_ms=1000, max_run_lines=50):
+        self.budget_bytes = budget_bytes
+        self.merge_ms = merge_ms
+        self.max_run_lines = max_run_lines
+        
+        # The text as of the newest step, as a line list (an empty editor to start with)
+        self.lines = ['', '']
+        self.undo_steps = deque()
+        self.redo_steps = []
+        self.size = 0
+        
+        self.paused = False
+        self.run_open = False
+        self.isolate_next = False
+        
+    def record(self, base, lines, changes=None, now=None):
+        # Called after every preview update with the preview's last_update
+        if self.paused:
+            # Our own undo or redo coming back through the preview
+            self.lines = lines
+            return
+        if changes is None or base is not self.lines:
+            changes = diff_lines(self.lines, lines)
+        ops = build_ops(self.lines, lines, changes)
+        self.lines = lines
+        if not ops:
+            return
+            
+        now = time.perf_counter() if now is None else now
+        for step in self.redo_steps:
+            self.size -= step.size
+        self.redo_steps = []
+        
+        if not self._merge(ops, now):
+            self.undo_steps.append(EditStep(ops, now))
+            self.size += self.undo_steps[-1].size
+        self.run_open = not self.isolate_next
+        self.isolate_next = False
+        self._enforce_budget()
+        
+    def separate(self):
+        # The next edit is a step of its own that later typing doesn't merge
+        # into either: template loads, quick inserts, replacements
+        self.run_open = False
+        self.isolate_next = True
+        
+    def can_undo(self):
+        return bool(self.undo_steps)
+        
+    def can_redo(self):
+        return bool(self.redo_steps)
+        
+    def undo(self, widget):
+        # Applies the newest step backwards to widget; returns the first line it touched, or None
+        if not self.undo_steps:
+            return None
+        step = self.undo_steps.pop()
+        self.redo_steps.append(step)
+        self.run_open = False
+        return self._apply(widget, [(new_start, len(new), old) for _, new_start, old, new in step.ops])
+        
+    def redo(self, widget):
+        if not self.redo_steps:
+            return None
+        step = self.redo_steps.pop()
+        self.undo_steps.append(step)
+        self.run_open = False
+        return self._apply(widget, [(old_start, len(old), new) for old_start, _, old, new in step.ops])
+        
+    def clear(self):
+        self.undo_steps.clear()
+        self.redo_steps = []
+        self.size = 0
+        self.run_open = False
+        self.isolate_next = False
+        
+    def _apply(self, widget, replacements):
+        # Bottom-up, so the line numbers of the ranges above stay valid
+        lines = list(self.lines)
+        for start, count, inserted in reversed(replacements):
+            replace_lines(widget, start, count, inserted, len(lines) - 1)
+            lines[start:start + count] = inserted
+        self.lines = lines
+        return replacements[0][0]
+        
+    def _merge(self, ops, now):
+        # Folds a single-range edit into the previous step when it lands inside
+        # what that step produced, e.g. the next keystroke of the same word
+        if not self.run_open or not self.undo_steps or len(ops) != 1:
+            return False
+        step = self.undo_steps[-1]
+        if len(step.ops) != 1 or (now - step.updated) * 1000 > self.merge_ms:
+            return False
+            
+        old_start, new_start, old, new = step.ops[0]
+        start, _, removed, inserted = ops[0]
+        offset = start - new_start
+        if offset < 0 or offset + len(removed) > len(new):
+            return False
+        merged = new[:offset] + inserted + new[offset + len(removed):]
+        if len(merged) > self.max_run_lines:
+            return False
+            
+        self.size -= step.size
+        step.ops = [(old_start, new_start, old, merged)]
+        step.updated = now
+        step.size = STEP_OVERHEAD_BYTES + line_bytes(old) + line_bytes(merged)
+        self.size += step.size
+        return True
+        
+    def _enforce_budget(self):
+        # Oldest history goes first; the newest step stays even if it alone is over budget
+        while self.size > self.budget_bytes and len(self.undo_steps) + len(self.redo_steps) > 1:
+            if self.undo_steps and (len(self.undo_steps) > 1 or not self.redo_steps):
+                self.size -= self.undo_steps.popleft().size
+            else:
+                self.size -= self.redo_steps.pop(0).size
@@ -0,0 +1,140 @@
+import codecs
+import mmap
+import os
+
+# Streaming import for large markdown files. The file is memory-mapped (or
+# read in blocks when it can't be) and decoded chunk by chunk, so nothing
+# ever holds more than one chunk of raw bytes and one of text at a time.
+
+CHUNK_SIZE = 256 * 1024
+DETECT_SIZE = 64 * 1024
+
+BYTE_ORDER_MARKS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+
+def detect_encoding(head):
+    # BOMs win; otherwise UTF-8 if the first block decodes cleanly (a multi-byte
+    # character cut off at the end is fine), else fall back to Windows-1252
+    for bom, encoding in BYTE_ORDER_MARKS:
+        if head.startswith(bom):
+            return encoding
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(head, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'cp1252'
+
+
+class NewlineNormalizer:
+    # Converts \r\n and lone \r to \n across chunk boundaries: a chunk ending in
+    # \r is held back until we know whether a \n follows
+    def __init__(self):
+        self.pending_cr = False
+        
+    def feed(self, text, final=False):
+        if self.pending_cr:
+            text = '\r' + text
+            self.pending_cr = False
+        if not final and text.endswith('\r'):
+            text = text[:-1]
+            self.pending_cr = True
+        return text.replace('\r\n', '\n').replace('\r', '\n')
+
+
+def iter_byte_chunks(path, chunk_size=CHUNK_SIZE):
+    with open(path, 'rb') as file:
+        size = os.fstat(file.fileno()).st_size
+        try:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        except (OSError, ValueError):
+            mapped = None
+            
+        if mapped is None:
+            # Empty files can't be mapped, and some filesystems don't support it
+            while True:
+                block = file.read(chunk_size)
+                if not block:
+                    return
+                yield block
+        else:
+            with mapped:
+                for offset in range(0, size, chunk_size):
+                    yield mapped[offset:offset + chunk_size]
+
+
+def iter_text_chunks(path, chunk_size=CHUNK_SIZE):
+    # Yields (text, bytes_read, total_bytes) with decoding and newline
+    # normalization applied incrementally
+    total = os.path.getsize(path)
+    decoder = None
+    normalizer = NewlineNormalizer()
+    bytes_read = 0
+    
+    for block in iter_byte_chunks(path, chunk_size):
+        if decoder is None:
+            encoding = detect_encoding(block[:DETECT_SIZE])
+            decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        bytes_read += len(block)
+        text = normalizer.feed(decoder.decode(block))
+        if text:
+            yield text, bytes_read, total
+            
+    tail = normalizer.feed(decoder.decode(b'', final=True) if decoder else '', final=True)
+    if tail:
+        yield tail, bytes_read, total
+
+
+class ChunkedImport:
+    # Inserts a file into a Text widget one chunk per event-loop tick so the
+    # window keeps redrawing and responding. The first chunk goes in right away
+    # so the top of the document is visible immediately.
+    def __init__(self, editor, path, on_progress=None, on_done=None, on_error=None, chunk_size=CHUNK_SIZE):
+        self.editor = editor
+        self.path = path
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.on_error = on_error
+        self.chunks = iter_text_chunks(path, chunk_size)
+        self.after_id = None
+        self.cancelled = False
+        
+    def start(self):
+        self.editor.delete('1.0', 'end')
+        if self._step():
+            self.editor.mark_set('insert', '1.0')
+            self.editor.see('1.0')
+            self.after_id = self.editor.after(1, self._tick)
+            
+    def cancel(self):
+        self.cancelled = True
+        if self.after_id is not None:
+            self.editor.after_cancel(self.after_id)
+            self.after_id = None
+        self.chunks.close()
+        
+    def _tick(self):
+        self.after_id = None
+        if self._step():
+            self.after_id = self.editor.after(1, self._tick)
+            
+    def _step(self):
+        # Returns True while there is more to insert
+        try:
+            text, bytes_read, total = next(self.chunks)
+        except StopIteration:
+            if self.on_done:
+                self.on_done(self)
+            return False
+        except Exception as e:
+            if self.on_error:
+                self.on_error(self, e)
+            return False
+            
+        self.editor.insert('end-1c', text)
+        if self.on_progress:
+            self.on_progress(self, bytes_read, total)
+        return True
@@ -0,0 +1,149 @@
+import json
+import os
+import sys
+import threading
+import time
+
+# Per-stage latency tracking for the editor's hot paths. Each stage keeps its
+# most recent samples in a fixed-size ring, so percentiles reflect how the
+# app feels right now and memory never grows.
+#
+#   README_TRACE=trace.jsonl   also append every sample to a JSONL trace file
+#   README_INSTRUMENT=0        turn timing off (stages become no-ops)
+
+ENABLE_ENV = 'README_INSTRUMENT'
+TRACE_ENV = 'README_TRACE'
+
+
+class LatencyRing:
+    def __init__(self, size=1024):
+        self.size = size
+        self.samples = [0.0] * size
+        self.count = 0
+        self.last = 0.0
+        
+    def record(self, ms):
+        self.samples[self.count % self.size] = ms
+        self.count += 1
+        self.last = ms
+        
+    def values(self):
+        return self.samples[:min(self.count, self.size)]
+        
+    def summary(self):
+        values = sorted(self.values())
+        if not values:
+            return {'count': 0, 'last': 0.0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+            
+        def percentile(p):
+            # Nearest rank
+            return values[min(len(values) - 1, max(0, int(round(p / 100 * len(values))) - 1))]
+        return {
+            'count': self.count,
+            'last': self.last,
+            'p50': percentile(50),
+            'p95': percentile(95),
+            'p99': percentile(99),
+            'max': values[-1],
+        }
+
+
+class _StageTimer:
+    __slots__ = ('instruments', 'name', 'fields', 'started')
+    
+    def __init__(self, instruments, name):
+        self.instruments = instruments
+        self.name = name
+        self.fields = None
+        
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+        
+    def __exit__(self, exc_type, exc, traceback):
+        elapsed = (time.perf_counter() - self.started) * 1000
+        self.instruments.record(self.name, elapsed, self.fields)
+        return False
+        
+    def note(self, **fields):
+        # Extra values for the trace line, e.g. how many characters were processed
+        self.fields = fields
+
+
+class _NullStage:
+    # Shared no-op stage used while timing is off
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+        
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+        
+    def note(self, **fields):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class Instrumentation:
+    def __init__(self, enabled=True, trace_path=None, ring_size=1024):
+        self.enabled = enabled
+        self.ring_size = ring_size
+        self.stages = {}
+        self.lock = threading.Lock()
+        self.trace_path = None
+        self.trace_file = None
+        if trace_path:
+            self.open_trace(trace_path)
+            
+    def stage(self, name):
+        # with PERF.stage('editor.snapshot') as timing: ...
+        if not self.enabled:
+            return _NULL_STAGE
+        return _StageTimer(self, name)
+        
+    def record(self, name, ms, fields=None):
+        # Also called from the render thread
+        with self.lock:
+            ring = self.stages.get(name)
+            if ring is None:
+                ring = self.stages[name] = LatencyRing(self.ring_size)
+            ring.record(ms)
+            
+            if self.trace_file is not None:
+                line = {'time': round(time.time(), 6), 'stage': name, 'ms': round(ms, 3)}
+                if fields:
+                    line.update(fields)
+                self.trace_file.write(json.dumps(line) + '\n')
+                
+    def summary(self):
+        with self.lock:
+            return [(name, self.stages[name].summary()) for name in sorted(self.stages)]
+            
+    def reset(self):
+        with self.lock:
+            self.stages.clear()
+            
+    def open_trace(self, path):
+        try:
+            # Line buffered, so the trace survives a crash
+            trace_file = open(path, 'a', encoding='utf-8', buffering=1)
+        except OSError as e:
+            print(f"warning: can't write trace to {path}: {e}", file=sys.stderr)
+            return False
+        with self.lock:
+            self.trace_path = path
+            self.trace_file = trace_file
+        return True
+        
+    def close(self):
+        with self.lock:
+            if self.trace_file is not None:
+                self.trace_file.close()
+                self.trace_file = None
+
+
+PERF = Instrumentation(enabled=os.environ.get(ENABLE_ENV, '1') != '0',
+                       trace_path=os.environ.get(TRACE_ENV) or None)
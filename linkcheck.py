@@ -0,0 +1,317 @@
+import asyncio
+import json
+import os
+import queue
+import re
+import ssl
+import threading
+import time
+from collections import deque, namedtuple
+from urllib.parse import quote, urljoin, urlsplit
+
+from outline import parse_line
+from site_builder import write_atomic
+
+# Link and badge checker. Every http(s) URL in a document is checked once,
+# concurrently, with asyncio: connections are kept alive and reused per host,
+# each host gets at most a few at a time, and results are cached on disk for
+# a while so re-checking a README doesn't hit the network again.
+#
+# Only the standard library is used, so the HTTP/1.1 client below is small:
+# HEAD (falling back to GET for servers that refuse HEAD), redirects, and
+# Content-Length bodies on reused connections.
+
+LINK_CACHE_FILE = os.path.join(os.path.expanduser('~'), '.readme-generator', 'linkcheck-cache.json')
+USER_AGENT = 'readme-generator-linkcheck/1.0'
+MAX_REDIRECTS = 5
+MAX_DRAIN_BYTES = 64 * 1024
+
+LinkOccurrence = namedtuple('LinkOccurrence', ['url', 'line', 'start', 'end'])
+LinkResult = namedtuple('LinkResult', ['url', 'ok', 'status', 'error', 'elapsed_ms', 'cached'])
+
+_URL = re.compile(r'https?://[^\s<>"\'\[\]`]+')
+_TRAILING = '.,;:!?*_'
+
+
+def extract_links(markdown_content):
+    # Every http(s) URL outside fenced code blocks, with its 1-based line and columns
+    occurrences = []
+    fence = ''
+    for line_num, line in enumerate(markdown_content.split('\n'), 1):
+        in_fence = fence
+        _, fence = parse_line(line, fence)
+        if in_fence or fence or 'http' not in line:
+            continue
+        for match in _URL.finditer(line):
+            url = match.group(0).rstrip(_TRAILING)
+            # A ) that closes the surrounding markdown link isn't part of the URL
+            while url.endswith(')') and url.count(')') > url.count('('):
+                url = url[:-1].rstrip(_TRAILING)
+            occurrences.append(LinkOccurrence(url, line_num, match.start(), match.start() + len(url)))
+    return occurrences
+
+
+class LinkCache:
+    # URL -> last result on disk. Failures expire sooner so fixed links clear quickly.
+    def __init__(self, path=LINK_CACHE_FILE, ttl=24 * 3600, failure_ttl=3600):
+        self.path = path
+        self.ttl = ttl
+        self.failure_ttl = failure_ttl
+        self.entries = {}
+        self.dirty = False
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                self.entries = json.load(file)
+        except (OSError, ValueError):
+            pass
+            
+    def get(self, url, now=None):
+        entry = self.entries.get(url)
+        if entry is None:
+            return None
+        age = (now or time.time()) - entry['checked']
+        if age > (self.ttl if entry['ok'] else self.failure_ttl):
+            return None
+        return LinkResult(url, entry['ok'], entry['status'], entry['error'], 0.0, True)
+        
+    def put(self, result):
+        self.entries[result.url] = {'ok': result.ok, 'status': result.status, 'error': result.error,
+                                    'checked': time.time()}
+        self.dirty = True
+        
+    def save(self):
+        if not self.dirty:
+            return
+        now = time.time()
+        longest = max(self.ttl, self.failure_ttl)
+        entries = {url: entry for url, entry in self.entries.items() if now - entry['checked'] <= longest}
+        try:
+            write_atomic(self.path, json.dumps(entries, indent=1, sort_keys=True))
+            self.dirty = False
+        except OSError:
+            pass
+
+
+class _HostPool:
+    # Keep-alive connections to one (scheme, host, port), at most `limit` at a time
+    def __init__(self, host, port, ssl_context, limit):
+        self.host = host
+        self.port = port
+        self.ssl_context = ssl_context
+        self.semaphore = asyncio.Semaphore(limit)
+        self.idle = deque()
+        self.opened = 0
+        
+    async def acquire(self, fresh=False):
+        # Returns (reader, writer, reused)
+        await self.semaphore.acquire()
+        try:
+            while self.idle and not fresh:
+                reader, writer = self.idle.pop()
+                if not reader.at_eof() and not writer.is_closing():
+                    return reader, writer, True
+                writer.close()
+            reader, writer = await asyncio.open_connection(
+                self.host, self.port, ssl=self.ssl_context, server_hostname=self.host if self.ssl_context else None)
+            self.opened += 1
+            return reader, writer, False
+        except BaseException:
+            self.semaphore.release()
+            raise
+            
+    def release(self, reader, writer, reusable):
+        if reusable:
+            self.idle.append((reader, writer))
+        else:
+            writer.close()
+        self.semaphore.release()
+        
+    def close(self):
+        while self.idle:
+            self.idle.pop()[1].close()
+
+
+class LinkChecker:
+    def __init__(self, per_host=4, concurrency=32, timeout=10.0, cache=None, ssl_context=None):
+        self.per_host = per_host
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.cache = cache
+        self.ssl_context = ssl_context
+        self.pools = {}
+        
+    def run(self, urls, on_result=None):
+        # Blocking entry point; returns {url: LinkResult}
+        try:
+            return asyncio.run(self.check_all(urls, on_result))
+        finally:
+            if self.cache is not None:
+                self.cache.save()
+                
+    async def check_all(self, urls, on_result=None):
+        results = {}
+        limit = asyncio.Semaphore(self.concurrency)
+        
+        async def check(url):
+            result = self.cache.get(url) if self.cache is not None else None
+            if result is None:
+                async with limit:
+                    result = await self.check(url)
+                if self.cache is not None:
+                    self.cache.put(result)
+            results[url] = result
+            if on_result:
+                on_result(result)
+                
+        try:
+            await asyncio.gather(*(check(url) for url in dict.fromkeys(urls)))
+        finally:
+            for pool in self.pools.values():
+                pool.close()
+            self.pools.clear()
+        return results
+        
+    async def check(self, url):
+        started = time.perf_counter()
+        status, error = None, None
+        try:
+            status = await asyncio.wait_for(self._follow(url), self.timeout)
+        except asyncio.TimeoutError:
+            error = f"timed out after {self.timeout:g}s"
+        except (OSError, ValueError, asyncio.IncompleteReadError) as e:
+            error = str(e) or type(e).__name__
+        ok = status is not None and 200 <= status < 400
+        if status is not None and not ok:
+            error = f"HTTP {status}"
+        return LinkResult(url, ok, status, error, (time.perf_counter() - started) * 1000, False)
+        
+    async def _follow(self, url):
+        for _ in range(MAX_REDIRECTS + 1):
+            status, headers = await self._fetch('HEAD', url)
+            if status in (403, 405, 501):
+                # Some servers only refuse HEAD
+                status, headers = await self._fetch('GET', url)
+            location = headers.get('location')
+            if status in (301, 302, 303, 307, 308) and location:
+                url = urljoin(url, location)
+                continue
+            return status
+        raise ValueError("too many redirects")
+        
+    async def _fetch(self, method, url):
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise ValueError(f"unsupported URL: {url}")
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        
+        # READMEs link to non-ASCII hosts and paths as written; the request line
+        # and Host header take them IDNA- and percent-encoded, as a browser sends them
+        host = parts.hostname.encode('idna').decode('ascii')
+        key = (parts.scheme, host, port)
+        pool = self.pools.get(key)
+        if pool is None:
+            ssl_context = None
+            if parts.scheme == 'https':
+                ssl_context = self.ssl_context or ssl.create_default_context()
+            pool = self.pools[key] = _HostPool(host, port, ssl_context, self.per_host)
+            
+        target = quote((parts.path or '/') + (f"?{parts.query}" if parts.query else ''), safe="/%?=&:@!$'()*+,;~-._")
+        host_header = f"[{host}]" if ':' in host else host
+        if parts.port is not None:
+            host_header += f":{parts.port}"
+        request = (f"{method} {target} HTTP/1.1\r\nHost: {host_header}\r\nUser-Agent: {USER_AGENT}\r\n"
+                   f"Accept: */*\r\nConnection: keep-alive\r\n\r\n").encode('latin-1')
+        
+        fresh = False
+        while True:
+            reader, writer, reused = await pool.acquire(fresh)
+            reusable = False
+            try:
+                writer.write(request)
+                await writer.drain()
+                status_line = await reader.readline()
+                if not status_line:
+                    raise ConnectionResetError("connection closed by server")
+                status, headers, reusable = await self._read_response(reader, method, status_line)
+                return status, headers
+            except (ConnectionError, asyncio.IncompleteReadError):
+                if not reused:
+                    raise
+                # The server dropped an idle keep-alive connection; try once more on a new one
+                fresh = True
+            finally:
+                pool.release(reader, writer, reusable)
+                
+    async def _read_response(self, reader, method, status_line):
+        parts = status_line.decode('latin-1').split(None, 2)
+        if len(parts) < 2 or not parts[0].startswith('HTTP/') or not parts[1].isdigit():
+            raise ValueError(f"bad status line: {status_line[:80]!r}")
+        version, status = parts[0], int(parts[1])
+        
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+            
+        # The connection can only be reused once the body has been read off it
+        if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+            body_read = True
+        else:
+            length = headers.get('content-length', '')
+            body_read = length.isdigit() and int(length) <= MAX_DRAIN_BYTES and 'transfer-encoding' not in headers
+            if body_read:
+                await reader.readexactly(int(length))
+        reusable = body_read and version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+        return status, headers, reusable
+
+
+class BackgroundLinkCheck:
+    # Runs a LinkChecker on a thread and hands results to the Tk loop, which
+    # polls for them with after() like the render worker does
+    def __init__(self, root, checker, urls, on_result=None, on_done=None, poll_interval=50):
+        self.root = root
+        self.checker = checker
+        self.urls = list(urls)
+        self.on_result = on_result
+        self.on_done = on_done
+        self.poll_interval = poll_interval
+        self.results = queue.Queue()
+        self.poll_id = None
+        self.thread = threading.Thread(target=self._work, name='link-check', daemon=True)
+        
+    def start(self):
+        self.thread.start()
+        self.poll_id = self.root.after(self.poll_interval, self._poll)
+        return self
+        
+    def cancel(self):
+        # The thread finishes on its own; its results are just ignored
+        if self.poll_id is not None:
+            self.root.after_cancel(self.poll_id)
+            self.poll_id = None
+            
+    def _work(self):
+        try:
+            results = self.checker.run(self.urls, on_result=lambda result: self.results.put(('result', result)))
+            self.results.put(('done', results))
+        except Exception as e:
+            self.results.put(('error', e))
+            
+    def _poll(self):
+        self.poll_id = None
+        while True:
+            try:
+                kind, value = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'result':
+                if self.on_result:
+                    self.on_result(value)
+            else:
+                if self.on_done:
+                    self.on_done(value if kind == 'done' else {}, value if kind == 'error' else None)
+                return
+        self.poll_id = self.root.after(self.poll_interval, self._poll)
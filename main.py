@@ -1,22 +1,72 @@
+import sys
+import time
+
+# Taken before anything else is imported, for --profile-startup
+STARTUP_BEGAN = time.perf_counter()
+
+# Headless commands run before tkinter is imported so they start fast without a display.
+# alter_sys makes cli the __main__ module, so worker processes never import this file either.
+HEADLESS_COMMANDS = ('render', 'site', 'linkcheck')
+
+if __name__ == "__main__" and sys.argv[1:2] and sys.argv[1] in HEADLESS_COMMANDS:
+    import runpy
+    runpy.run_module('cli', run_name='__main__', alter_sys=True)
+    sys.exit()
+
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, simpledialog
-import markdown
-import webbrowser
-import tempfile
 import os
-import re
+import base64
 from tkinter.scrolledtext import ScrolledText
 from datetime import datetime
+from preview import PreviewScheduler, IncrementalPreview, diff_lines
+from rendering import build_html_page, convert_github_markdown
+from render_worker import RenderWorker
+from importer import ChunkedImport
+from templates import TemplateLibrary, USER_TEMPLATE_DIR
+from instrumentation import PERF
+from outline import build_toc
+from search import BackgroundSearch, compile_pattern, MATCH_TAG, CURRENT_TAG
+from badges import BadgeCache, badge_url, badges_in, find_badges
+from autosave import Autosave, discard_session, recover_orphans
+from documents import Document, DocumentSet
+from editor_proxy import EditorProxy
+
+# markdown, webbrowser, tempfile and the preview server are imported where they
+# are first used, so none of them delay the window appearing
+STARTUP_IMPORTED = time.perf_counter()
+LAZY_MODULES = ('markdown', 'webbrowser', 'tempfile', 'http.server', 'multiprocessing', 'difflib')
+
+
+def document_attribute(name):
+    # Reads and writes go to the active tab, so code working on "the" editor or
+    # preview never needs to know there are several
+    return property(lambda self: getattr(self.document, name),
+                    lambda self, value: setattr(self.document, name, value))
+
 
 class ReadmeGenerator:
-    def __init__(self):
+    editor = document_attribute('editor')
+    editor_proxy = document_attribute('editor_proxy')
+    preview = document_attribute('preview')
+    preview_engine = document_attribute('preview_engine')
+    heading_index = document_attribute('heading_index')
+    history = document_attribute('history')
+    render_cache = document_attribute('render_cache')
+    project_info = document_attribute('project_info')
+    link_results = document_attribute('link_results')
+    link_total = document_attribute('link_total')
+    autosave = document_attribute('autosave')
+    
+    def __init__(self, profile_startup=False, preview_memory_cap=None):
+        self.startup_marks = [('imports', STARTUP_IMPORTED)] if profile_startup else None
         self.root = tk.Tk()
         self.root.title("Driizzyys README Generator & Viewer")
         self.root.geometry("1400x800")
         self.root.configure(bg='#2b2b2b')
         
-        # Current project info
-        self.project_info = {
+        # Project info for new tabs; each tab keeps its own copy
+        self.default_project_info = {
             'title': 'README Generator & Viewer',
             'description': 'A professional, feature-rich GUI application for creating, editing, and previewing README.md files with real-time markdown rendering and advanced customization options.',
             'author': 'driizzyy',
@@ -27,8 +77,121 @@ class ReadmeGenerator:
             'contact': 'drakko5.56 on Discord'
         }
         
+        # Built-in and user README templates (~/.readme-generator/templates)
+        self.templates = TemplateLibrary()
+        
+        # One Document per tab, each with its own text, project info, heading index
+        # and render cache. Previews of inactive tabs are dropped under a memory cap.
+        self.documents = DocumentSet(preview_memory_cap)
+        self.document = None
+        self.outline_version = None
+        
         self.setup_ui()
-        self.load_default_template()
+        
+        # Find/replace scans in time slices and follows edits through the preview's line diffs;
+        # it is rebuilt for the active tab's editor on every switch
+        self.search = None
+        self.find_dialog = None
+        self.current_match = None
+        self.root.bind('<Control-f>', self.open_find)
+        
+        self.preview_scheduler = PreviewScheduler(self.root, self.update_preview)
+        
+        # Markdown conversion runs in the background; results older than the editor are discarded
+        self.render_worker = RenderWorker(self.root, convert_github_markdown,
+                                          current_version=lambda: self.preview_scheduler.generation)
+        
+        # "Open in Browser" serves a live page from 127.0.0.1 that follows the editor
+        self.use_preview_server = True
+        self.preview_server = None
+        self.temp_files = []
+        self.browser_job = None
+        
+        # Every tab journals its edits from the first render on
+        self.autosave_started = False
+        
+        # The first tab is filled by first_render
+        self.open_document()
+        self.root.bind('<Control-w>', self.close_document)
+        self.mark_startup('window built')
+        
+        # Show the window before doing any real work: the default template is
+        # rendered once Tk has drawn the empty window for the first time
+        self.root.bind('<Map>', self.on_first_map)
+        
+    def on_first_map(self, event):
+        # Child widgets' <Map> events arrive here too through the toplevel's bindtag
+        if event.widget is not self.root:
+            return
+        self.root.unbind('<Map>')
+        
+        # Idle callbacks run in order, so this comes after the redraws the map queued
+        self.root.after_idle(self.first_render)
+        
+    def first_render(self):
+        self.mark_startup('window shown')
+        self.autosave_started = True
+        for document in self.documents.documents:
+            self.start_autosave(document)
+        if not self.recover_autosave():
+            self.load_default_template()
+        self.root.update_idletasks()
+        self.mark_startup('first render')
+        
+        if self.startup_marks is not None:
+            self.report_startup()
+            
+    def recover_autosave(self):
+        # Only journals of instances that are no longer running are offered, one
+        # tab per journal; our own tabs' sessions are locked, so they never show up
+        orphans = recover_orphans()
+        try:
+            # The journal holds the preview's lines, which end with the Text widget's own
+            # newline. Tabs that were still empty aren't worth offering.
+            documents = [(lines[:-1] if lines and lines[-1] == '' else lines, replayed)
+                         for _, _, lines, replayed in orphans]
+            documents = [(lines, replayed) for lines, replayed in documents if any(map(str.strip, lines))]
+            if not documents:
+                return False
+            if len(documents) == 1:
+                question = f"Recover its unsaved document ({len(documents[0][0])} lines)?"
+            else:
+                question = f"Recover its {len(documents)} unsaved documents?"
+            if not messagebox.askyesno("Recover README", "A previous session didn't close cleanly.\n" + question):
+                return False
+            
+            # Oldest first, so the most recently edited one ends up the active tab
+            for position, (lines, _) in enumerate(reversed(documents)):
+                if position:
+                    self.open_document()
+                self.editor.delete(1.0, tk.END)
+                self.editor.insert(1.0, '\n'.join(lines))
+                self.refresh_preview()
+        finally:
+            # Recovered or declined, the orphans are done with; every tab journals anew
+            for directory, lock, _, _ in orphans:
+                discard_session(directory, lock)
+        replayed = sum(edits for _, edits in documents)
+        self.status_bar.config(text=f"Recovered {len(documents)} unsaved document(s) ({replayed} edits replayed)")
+        return True
+        
+    def start_autosave(self, document):
+        try:
+            document.autosave = Autosave().start()
+        except OSError as e:
+            self.status_bar.config(text=f"Autosave unavailable: {str(e)}")
+            
+    def mark_startup(self, label):
+        if self.startup_marks is not None:
+            self.startup_marks.append((label, time.perf_counter()))
+            
+    def report_startup(self):
+        print("startup profile (ms since main.py started):")
+        for label, when in self.startup_marks:
+            print(f"  {label:<14}{(when - STARTUP_BEGAN) * 1000:8.1f}")
+        loaded = [name for name in LAZY_MODULES if name in sys.modules]
+        print(f"  deferred modules already loaded: {', '.join(loaded) or 'none'}")
+        print("  (python -X importtime main.py shows the per-module import cost)")
         
     def setup_ui(self):
         # Configure styles
@@ -49,6 +212,9 @@ class ReadmeGenerator:
         paned_window = ttk.PanedWindow(main_frame, orient=tk.HORIZONTAL)
         paned_window.pack(fill=tk.BOTH, expand=True, pady=(10, 0))
         
+        # Outline of the document's headings
+        self.create_outline_panel(paned_window)
+        
         # Left panel - Editor
         self.create_editor_panel(paned_window)
         
@@ -65,13 +231,16 @@ class ReadmeGenerator:
         # File operations
         ttk.Button(toolbar, text="New README", command=self.new_readme, style='Dark.TButton').pack(side=tk.LEFT, padx=2)
         ttk.Button(toolbar, text="Import README", command=self.import_readme, style='Dark.TButton').pack(side=tk.LEFT, padx=2)
+        ttk.Button(toolbar, text="Close Tab", command=self.close_document, style='Dark.TButton').pack(side=tk.LEFT, padx=2)
         ttk.Button(toolbar, text="Export README", command=self.export_readme, style='Dark.TButton').pack(side=tk.LEFT, padx=2)
+        ttk.Button(toolbar, text="Export All Formats", command=self.export_all_formats, style='Dark.TButton').pack(side=tk.LEFT, padx=2)
         
         ttk.Separator(toolbar, orient=tk.VERTICAL).pack(side=tk.LEFT, fill=tk.Y, padx=10)
         
         # Templates
         ttk.Button(toolbar, text="Basic Template", command=lambda: self.load_template('basic'), style='Dark.TButton').pack(side=tk.LEFT, padx=2)
         ttk.Button(toolbar, text="Advanced Template", command=lambda: self.load_template('advanced'), style='Dark.TButton').pack(side=tk.LEFT, padx=2)
+        ttk.Button(toolbar, text="More Templates...", command=self.choose_template, style='Dark.TButton').pack(side=tk.LEFT, padx=2)
         ttk.Button(toolbar, text="Project Info", command=self.edit_project_info, style='Dark.TButton').pack(side=tk.LEFT, padx=2)
         
         ttk.Separator(toolbar, orient=tk.VERTICAL).pack(side=tk.LEFT, fill=tk.Y, padx=10)
@@ -80,6 +249,26 @@ class ReadmeGenerator:
         ttk.Button(toolbar, text="Add Badge", command=self.insert_badge, style='Dark.TButton').pack(side=tk.LEFT, padx=2)
         ttk.Button(toolbar, text="Add Table", command=self.insert_table, style='Dark.TButton').pack(side=tk.LEFT, padx=2)
         ttk.Button(toolbar, text="Add Code Block", command=self.insert_code_block, style='Dark.TButton').pack(side=tk.LEFT, padx=2)
+        ttk.Button(toolbar, text="Check Links", command=self.check_links, style='Dark.TButton').pack(side=tk.LEFT, padx=2)
+        ttk.Button(toolbar, text="Find/Replace", command=self.open_find, style='Dark.TButton').pack(side=tk.LEFT, padx=2)
+        ttk.Button(toolbar, text="Stats", command=self.show_stats, style='Dark.TButton').pack(side=tk.RIGHT, padx=2)
+        
+    def create_outline_panel(self, parent):
+        outline_frame = ttk.Frame(parent, style='Dark.TFrame')
+        parent.add(outline_frame, weight=0)
+        
+        outline_header = ttk.Frame(outline_frame, style='Dark.TFrame')
+        outline_header.pack(fill=tk.X, pady=(0, 5))
+        
+        ttk.Label(outline_header, text="Outline", style='Dark.TLabel', font=('Arial', 12, 'bold')).pack(side=tk.LEFT)
+        ttk.Button(outline_header, text="Regenerate TOC", command=self.regenerate_toc, style='Dark.TButton').pack(side=tk.RIGHT, padx=(5, 0))
+        
+        # A flat list indented by level, so edits only touch the rows that changed
+        self.outline = ttk.Treeview(outline_frame, show='tree', selectmode='browse')
+        self.outline.column('#0', width=220)
+        self.outline.pack(fill=tk.BOTH, expand=True)
+        self.outline.bind('<<TreeviewSelect>>', self.on_outline_select)
+        self.outline_labels = []
         
     def create_editor_panel(self, parent):
         # Editor frame
@@ -89,9 +278,15 @@ class ReadmeGenerator:
         # Editor label
         ttk.Label(editor_frame, text="Markdown Editor", style='Dark.TLabel', font=('Arial', 12, 'bold')).pack(anchor='w', pady=(0, 5))
         
+        # One editor per open document, each on its own tab
+        self.tabs = ttk.Notebook(editor_frame)
+        self.tabs.pack(fill=tk.BOTH, expand=True)
+        self.tabs.bind('<<NotebookTabChanged>>', self.on_tab_changed)
+        
+    def create_editor(self, document):
         # Text editor with scrollbar
-        self.editor = ScrolledText(
-            editor_frame,
+        editor = ScrolledText(
+            self.tabs,
             wrap=tk.WORD,
             font=('Consolas', 11),
             bg='#1e1e1e',
@@ -99,11 +294,21 @@ class ReadmeGenerator:
             insertbackground='white',
             selectbackground='#404040'
         )
-        self.editor.pack(fill=tk.BOTH, expand=True)
         
-        # Bind text change event for live preview
-        self.editor.bind('<KeyRelease>', self.on_text_change)
-        self.editor.bind('<Button-1>', self.on_text_change)
+        # Every insert and delete goes through the proxy, which keeps the text as a
+        # line list and reports each edit for live preview
+        document.editor_proxy = EditorProxy(editor, on_edit=lambda event: self.on_text_change(document, event))
+        
+        # Tk's own undo stack is left off: it grows without limit on large documents
+        editor.bind('<<Undo>>', self.undo)
+        editor.bind('<<Redo>>', self.redo)
+        
+        # Search highlights; the selection stays visible on top of them
+        editor.tag_configure(MATCH_TAG, background='#614d00')
+        editor.tag_configure(CURRENT_TAG, background='#d18616', foreground='black')
+        editor.tag_raise('sel')
+        document.editor = editor
+        self.tabs.add(editor.frame, text=document.title)
         
     def create_preview_panel(self, parent):
         # Preview frame
@@ -115,12 +320,18 @@ class ReadmeGenerator:
         preview_header.pack(fill=tk.X, pady=(0, 5))
         
         ttk.Label(preview_header, text="Live Preview", style='Dark.TLabel', font=('Arial', 12, 'bold')).pack(side=tk.LEFT)
-        ttk.Button(preview_header, text="Refresh", command=self.update_preview, style='Dark.TButton').pack(side=tk.RIGHT)
+        ttk.Button(preview_header, text="Refresh", command=self.refresh_preview, style='Dark.TButton').pack(side=tk.RIGHT)
         ttk.Button(preview_header, text="Open in Browser", command=self.open_in_browser, style='Dark.TButton').pack(side=tk.RIGHT, padx=(0, 5))
+        self.preview_frame = preview_frame
         
+        # Static shields.io badges are drawn locally and shown as images in place of their markdown
+        self.badge_cache = BadgeCache(make_image=lambda png: tk.PhotoImage(data=base64.b64encode(png).decode('ascii')))
+        self.link_check = None
+        
+    def create_preview(self, document):
         # Preview text widget with GitHub-style colors and padding
-        self.preview = ScrolledText(
-            preview_frame,
+        document.preview = ScrolledText(
+            self.preview_frame,
             wrap=tk.WORD,
             font=('Segoe UI', 10),
             bg='#ffffff',
@@ -132,175 +343,368 @@ class ReadmeGenerator:
             padx=20,
             pady=15
         )
-        self.preview.pack(fill=tk.BOTH, expand=True, padx=1, pady=1)
+        
+        # Tags are configured once per widget; repaints only add and remove tag ranges
+        self.configure_github_tags(document.preview)
+        document.preview.tag_configure('badge_source', elide=True)
+        
+        # Links the last link check found broken
+        document.preview.tag_configure('broken_link', foreground='#cf222e', overstrike=True)
+        document.preview.tag_raise('broken_link')
+        
+        # Repaints only the preview lines that changed since the last update, and
+        # only tags the lines around the viewport once a document gets very long
+        document.preview_engine = IncrementalPreview(document.preview, virtualize_threshold=5000, decorate=self.embed_badges)
+        
+    def release_preview(self, document):
+        # Evicted: the text stays in the tab's editor, everything derived from it goes
+        document.preview_yview = document.preview.yview()[0]
+        document.preview.frame.destroy()
+        document.preview = None
+        document.preview_engine = None
+        document.render_cache.clear()
+        document.badge_images.clear()
+        
+    def open_document(self, title=None, path=None):
+        # New tabs start from the current tab's project info
+        project_info = dict(self.project_info if self.document is not None else self.default_project_info)
+        document = Document(title or self.documents.next_title(), project_info, path)
+        self.documents.add(document)
+        self.create_editor(document)
+        if self.autosave_started:
+            self.start_autosave(document)
+        self.activate_document(document)
+        return document
+        
+    def on_tab_changed(self, event=None):
+        selected = self.tabs.select()
+        document = self.documents.find(lambda item: str(item.editor.frame) == selected)
+        if document is not None:
+            self.activate_document(document)
+            
+    def activate_document(self, document):
+        if document is self.document:
+            return
+        previous = self.document
+        if previous is not None and previous.preview is not None:
+            previous.preview_yview = previous.preview.yview()[0]
+            previous.preview.pack_forget()
+        if self.search is not None:
+            self.search.stop()
+        if self.link_check is not None:
+            self.link_check.cancel()
+            self.link_check = None
+        if self.browser_job is not None:
+            # Its text belongs to the tab we're leaving
+            self.browser_job = None
+            self.status_bar.config(text="Open in Browser cancelled")
+            
+        self.document = document
+        self.documents.activate(document)
+        self.documents.evict(self.release_preview)
+        if str(self.tabs.select()) != str(document.editor.frame):
+            self.tabs.select(document.editor.frame)
+            
+        if document.preview is None:
+            # Evicted earlier (or brand new): repainted from the editor's text below
+            self.create_preview(document)
+        document.preview.pack(fill=tk.BOTH, expand=True, padx=1, pady=1)
+        
+        self.search = BackgroundSearch(self.editor, on_progress=self.on_search_progress)
+        self.current_match = None
+        self.outline.delete(*self.outline.get_children())
+        self.outline_labels = []
+        self.outline_version = None
+        
+        # Counts as an edit, so renders started for the other tab are dropped
+        self.preview_scheduler.request()
+        if self.active_import is not None and self.active_import.editor is document.editor:
+            # Only the tab being imported holds its preview back, until the import is done
+            self.preview_scheduler.suspend()
+        else:
+            # Renders right away, since the request above left the preview behind
+            self.preview_scheduler.resume()
+        document.preview.yview_moveto(document.preview_yview)
+        
+        if self.find_dialog is not None:
+            self.find_dialog.search()
+        self.root.title(f"{document.title} - Driizzyys README Generator & Viewer")
+        
+    def close_document(self, event=None):
+        document = self.document
+        if not messagebox.askyesno("Close Tab", f"Close \"{document.title}\"? Anything not exported is lost."):
+            return 'break'
+        if self.active_import is not None and self.active_import.editor is document.editor:
+            self.active_import.cancel()
+            self.finish_import()
+            
+        position = self.documents.documents.index(document)
+        self.documents.remove(document)
+        if len(self.documents) == 0:
+            self.open_document()
+            self.load_default_template()
+        else:
+            self.activate_document(self.documents.documents[min(position, len(self.documents) - 1)])
+            
+        # Closing a tab drops its text, so its journal goes too
+        if document.autosave is not None:
+            document.autosave.close()
+        self.tabs.forget(document.editor.frame)
+        document.editor.frame.destroy()
+        if document.preview is not None:
+            document.preview.frame.destroy()
+        return 'break'
         
     def create_status_bar(self, parent):
         self.status_bar = ttk.Label(parent, text="Ready", style='Dark.TLabel')
         self.status_bar.pack(side=tk.BOTTOM, fill=tk.X, pady=(10, 0))
         
-    def on_text_change(self, event=None):
-        # Update preview in real-time
-        self.root.after_idle(self.update_preview)
+        # Shown only while a large file is being imported
+        self.progress_bar = ttk.Progressbar(parent, mode='determinate', maximum=100)
+        self.active_import = None
+        
+    def on_text_change(self, document, event):
+        if document is not self.document:
+            # A background tab (say, one still importing) is previewed when it's switched to
+            return
+        
+        # Update preview in real-time, coalesced and debounced by the scheduler
+        self.preview_scheduler.request()
+        
+    def refresh_preview(self):
+        # Programmatic edits render right away instead of waiting for the debounce
+        self.preview_scheduler.flush()
+        
+    def preview_held(self):
+        # True while the active tab is still importing. Its preview isn't rendered
+        # until the import is done, so anything that reads the preview's lines or
+        # edits the text has to wait for it.
+        if not self.preview_scheduler.suspended:
+            return False
+        self.status_bar.config(text="Wait for the import to finish")
+        return True
+        
+    def editor_text(self):
+        # For consumers that need the whole document as one string (rendering,
+        # export, link checks); the preview path works from line ranges instead
+        return self.editor_proxy.text()
         
     def update_preview(self):
         try:
-            # Get markdown content
-            markdown_content = self.editor.get(1.0, tk.END)
-            
-            # Convert to HTML with GitHub-style rendering
-            html = self.render_github_markdown(markdown_content)
+            # The editor's lines and the range edited since the preview's last update
+            with PERF.stage('editor.snapshot') as timing:
+                lines, changes = self.editor_proxy.snapshot(self.preview_engine.lines)
+                timing.note(lines=len(lines), changed=sum(new_end - new_start for _, _, new_start, new_end in changes or ()))
             
             # Update preview with formatted content
-            self.preview.config(state=tk.NORMAL)
-            self.preview.delete(1.0, tk.END)
+            with PERF.stage('preview.update') as timing:
+                self.preview.config(state=tk.NORMAL)
+            
+                # Apply GitHub-style formatting to the changed lines of the text widget
+                repainted = self.apply_github_formatting(lines, changes)
             
-            # Apply GitHub-style formatting to the text widget
-            self.apply_github_formatting(markdown_content)
+                self.preview.config(state=tk.DISABLED)
+                timing.note(repainted=repainted, tcl_calls=self.preview_engine.last_tcl_calls)
+            self.prune_badge_images()
             
-            self.preview.config(state=tk.DISABLED)
+            # The heading index follows the same line diff the preview just applied
+            with PERF.stage('outline.update'):
+                base, changes = self.preview_engine.last_update
+                self.heading_index.update(self.preview_engine.lines, changes, base=base)
+                self.refresh_outline()
+            self.search.follow(self.preview_engine.lines, changes, base=base)
+            with PERF.stage('history.record'):
+                self.history.record(base, self.preview_engine.lines, changes)
             
-            self.status_bar.config(text=f"Preview updated - {len(markdown_content.strip())} characters")
+            if self.autosave is not None:
+                try:
+                    with PERF.stage('autosave.record'):
+                        self.autosave.record(base, self.preview_engine.lines, changes)
+                except OSError as e:
+                    self.autosave = None
+                    self.status_bar.config(text=f"Autosave stopped: {str(e)}")
+                    return
+                
+            # Keep the live browser tab in step with the editor
+            if self.preview_server is not None:
+                self.publish_live_preview()
+                
+            status = f"Preview updated - {self.editor_proxy.chars} characters"
+            if self.preview_engine.virtual:
+                status += " (large document: formatting the visible lines only)"
+            self.status_bar.config(text=status)
             
         except Exception as e:
             self.status_bar.config(text=f"Preview error: {str(e)}")
             
-    def render_github_markdown(self, markdown_content):
-        # Convert markdown to HTML with GitHub extensions
-        html = markdown.markdown(
-            markdown_content,
-            extensions=[
-                'fenced_code',
-                'tables', 
-                'toc',
-                'codehilite',
-                'nl2br',
-                'attr_list'
-            ],
-            extension_configs={
-                'codehilite': {
-                    'css_class': 'highlight',
-                    'use_pygments': False
-                }
-            }
-        )
-        return html
-        
-    def apply_github_formatting(self, markdown_content):
-        lines = markdown_content.split('\n')
-        current_line = 1
-        
-        # Configure text tags for GitHub-style formatting
-        self.configure_github_tags()
-        
-        for line in lines:
-            line_start = f"{current_line}.0"
-            line_end = f"{current_line}.end"
+    def begin_edit_step(self):
+        # Programmatic edits undo as one step of their own, so typing still
+        # waiting for the debounce is recorded before them
+        if self.preview_scheduler.generation != self.preview_scheduler.rendered_generation:
+            self.refresh_preview()
+        self.history.separate()
+        
+    def undo(self, event=None):
+        self.step_history(self.history.undo, "Nothing to undo")
+        return 'break'
+        
+    def redo(self, event=None):
+        self.step_history(self.history.redo, "Nothing to redo")
+        return 'break'
+        
+    def step_history(self, action, nothing_message):
+        if self.preview_held():
+            return
+            
+        # The history must have seen the text it is about to rewrite
+        self.refresh_preview()
+        if self.preview_engine.lines is not self.history.lines:
+            self.status_bar.config(text="Undo unavailable until the preview updates")
+            return
+            
+        # The preview update that follows is our own edit, not a new step
+        self.history.paused = True
+        try:
+            line = action(self.editor)
+            if line is not None:
+                self.refresh_preview()
+        finally:
+            self.history.paused = False
             
-            # Insert the line
-            self.preview.insert(tk.END, line + '\n')
+        if line is None:
+            self.status_bar.config(text=nothing_message)
+            return
+        self.editor.mark_set(tk.INSERT, f"{line + 1}.0")
+        self.editor.see(tk.INSERT)
             
-            # Apply formatting based on markdown syntax
-            if line.strip():
-                self.format_line(line, current_line)
+    def refresh_outline(self):
+        if self.outline_version == self.heading_index.version:
+            return
+        self.outline_version = self.heading_index.version
+        
+        # Line numbers are looked up on click, so only added, removed or renamed headings touch the tree
+        labels = ['    ' * (heading.level - 1) + heading.text for heading in self.heading_index.headings()]
+        changes = diff_lines(self.outline_labels, labels)
+        if not changes:
+            return
+        items = self.outline.get_children()
+        for old_start, old_end, new_start, new_end in reversed(changes):
+            if old_end > old_start:
+                self.outline.delete(*items[old_start:old_end])
+            for offset, label in enumerate(labels[new_start:new_end]):
+                self.outline.insert('', old_start + offset, text=label)
+        self.outline_labels = labels
+        
+    def on_outline_select(self, event=None):
+        selection = self.outline.selection()
+        if not selection:
+            return
+        headings = self.heading_index.headings()
+        position = self.outline.index(selection[0])
+        if position >= len(headings):
+            return
             
-            current_line += 1
+        # Editor and preview show the same lines, so both jump to the heading
+        index = f"{headings[position].line}.0"
+        self.editor.mark_set(tk.INSERT, index)
+        self.editor.see(index)
+        self.preview.see(index)
+        self.editor.focus_set()
+        
+    def regenerate_toc(self):
+        if self.preview_held():
+            return
             
-    def configure_github_tags(self):
+        # Bring the index up to date with the editor first
+        self.refresh_preview()
+        self.history.separate()
+        headings = self.heading_index.headings()
+        toc = self.heading_index.find_toc()
+        
+        if toc is not None:
+            # Rewrite the links under the existing "Table of Contents" heading in place
+            toc_heading, first, end = toc
+            entries = build_toc(headings, exclude=toc_heading)
+            self.editor.delete(f"{first}.0", f"{end}.0")
+            self.editor.insert(f"{first}.0", f"\n{entries}\n")
+        else:
+            # No TOC yet: add one before the first section
+            entries = build_toc(headings)
+            sections = [heading for heading in headings if heading.level >= 2]
+            index = f"{sections[0].line}.0" if sections else tk.END
+            self.editor.insert(index, f"## Table of Contents\n\n{entries}\n")
+            
+        self.refresh_preview()
+        self.status_bar.config(text=f"Table of contents updated - {len(entries.splitlines())} entries")
+        
+    def embed_badges(self, first_line_num, lines):
+        # Images go at the end of the line and the badge markdown is elided, so
+        # the columns the preview tagged stay valid
+        tcl_calls = 0
+        hidden = []
+        images = self.document.badge_images
+        for line_num, line in enumerate(lines, first_line_num):
+            if 'shields.io/badge/' not in line:
+                continue
+            for start, end, spec in find_badges(line):
+                # Reuse the image this tab already shows: if the cache has since
+                # rebuilt it, replacing ours would blank the badges on screen
+                if spec not in images:
+                    images[spec] = self.badge_cache.get(*spec)
+                image = images[spec]
+                self.preview.image_create(f"{line_num}.end", image=image, padx=2, align='center')
+                hidden.extend((f"{line_num}.{start}", f"{line_num}.{end}"))
+                tcl_calls += 1
+        if hidden:
+            self.preview.tag_add('badge_source', *hidden)
+            tcl_calls += 1
+        return tcl_calls
+        
+    def prune_badge_images(self):
+        # Lets go of images no line shows any more, once there are more of them
+        # than the badge cache would keep itself
+        images = self.document.badge_images
+        if len(images) <= self.badge_cache.max_entries:
+            return
+        shown = badges_in(self.preview_engine.lines)
+        for spec in [spec for spec in images if spec not in shown]:
+            del images[spec]
+        
+    def apply_github_formatting(self, lines, changes=None):
+        # Repaint only the dirty line ranges, each as one insert plus one multi-range
+        # tag_add per tag; without changes the preview diffs against what it shows
+        return self.preview_engine.update_lines(lines, changes)
+            
+    def configure_github_tags(self, preview):
         # Configure text tags for GitHub styling
-        self.preview.tag_configure("h1", font=('Segoe UI', 20, 'bold'), spacing1=15, spacing3=12,
-                                 underline=True, underlinefg='#d0d7de')
-        self.preview.tag_configure("h2", font=('Segoe UI', 16, 'bold'), spacing1=12, spacing3=10,
-                                 underline=True, underlinefg='#d0d7de')
-        self.preview.tag_configure("h3", font=('Segoe UI', 14, 'bold'), spacing1=10, spacing3=8)
-        self.preview.tag_configure("h4", font=('Segoe UI', 12, 'bold'), spacing1=8, spacing3=6)
-        self.preview.tag_configure("h5", font=('Segoe UI', 11, 'bold'), spacing1=6, spacing3=4)
-        self.preview.tag_configure("h6", font=('Segoe UI', 10, 'bold'), spacing1=4, spacing3=2, foreground='#656d76')
-        
-        self.preview.tag_configure("bold", font=('Segoe UI', 10, 'bold'))
-        self.preview.tag_configure("italic", font=('Segoe UI', 10, 'italic'))
-        self.preview.tag_configure("code", font=('Consolas', 10), background='#f6f8fa', 
-                                 relief="solid", borderwidth=1)
-        self.preview.tag_configure("code_block", font=('Consolas', 9), background='#f6f8fa',
-                                 relief="solid", borderwidth=1, spacing1=8, spacing3=8,
-                                 lmargin1=16, lmargin2=16)
-        self.preview.tag_configure("blockquote", foreground='#656d76', lmargin1=16, lmargin2=16,
-                                 background='#f6f8fa', relief="solid", borderwidth=1)
-        self.preview.tag_configure("link", foreground='#0969da', underline=True)
-        self.preview.tag_configure("list_item", lmargin1=20, lmargin2=20)
-        self.preview.tag_configure("badge", background='#0969da', foreground='white', 
-                                 relief="solid", borderwidth=1)
-        
-    def format_line(self, line, line_num):
-        line_start = f"{line_num}.0"
-        line_end = f"{line_num}.end"
-        
-        # Headers
-        if line.startswith('# '):
-            self.preview.tag_add("h1", line_start, line_end)
-        elif line.startswith('## '):
-            self.preview.tag_add("h2", line_start, line_end)
-        elif line.startswith('### '):
-            self.preview.tag_add("h3", line_start, line_end)
-        elif line.startswith('#### '):
-            self.preview.tag_add("h4", line_start, line_end)
-        elif line.startswith('##### '):
-            self.preview.tag_add("h5", line_start, line_end)
-        elif line.startswith('###### '):
-            self.preview.tag_add("h6", line_start, line_end)
-            
-        # Code blocks
-        elif line.startswith('```'):
-            self.preview.tag_add("code_block", line_start, line_end)
-            
-        # Blockquotes
-        elif line.startswith('> '):
-            self.preview.tag_add("blockquote", line_start, line_end)
-            
-        # List items
-        elif line.strip().startswith('- ') or line.strip().startswith('* ') or re.match(r'^\s*\d+\.', line):
-            self.preview.tag_add("list_item", line_start, line_end)
-            
-        # Badges (shields.io pattern)
-        elif '![' in line and 'shields.io' in line:
-            self.preview.tag_add("badge", line_start, line_end)
-            
-        # Apply inline formatting
-        self.apply_inline_formatting(line, line_num)
-        
-    def apply_inline_formatting(self, line, line_num):
-        # Bold text **text** or __text__
-        bold_pattern = r'\*\*(.*?)\*\*|__(.*?)__'
-        for match in re.finditer(bold_pattern, line):
-            start_pos = f"{line_num}.{match.start()}"
-            end_pos = f"{line_num}.{match.end()}"
-            self.preview.tag_add("bold", start_pos, end_pos)
-            
-        # Italic text *text* or _text_
-        italic_pattern = r'(?<!\*)\*(?!\*)([^*]+?)\*(?!\*)|(?<!_)_(?!_)([^_]+?)_(?!_)'
-        for match in re.finditer(italic_pattern, line):
-            start_pos = f"{line_num}.{match.start()}"
-            end_pos = f"{line_num}.{match.end()}"
-            self.preview.tag_add("italic", start_pos, end_pos)
-            
-        # Inline code `code`
-        code_pattern = r'`([^`]+)`'
-        for match in re.finditer(code_pattern, line):
-            start_pos = f"{line_num}.{match.start()}"
-            end_pos = f"{line_num}.{match.end()}"
-            self.preview.tag_add("code", start_pos, end_pos)
-            
-        # Links [text](url)
-        link_pattern = r'\[([^\]]+)\]\([^)]+\)'
-        for match in re.finditer(link_pattern, line):
-            start_pos = f"{line_num}.{match.start()}"
-            end_pos = f"{line_num}.{match.end()}"
-            self.preview.tag_add("link", start_pos, end_pos)
+        preview.tag_configure("h1", font=('Segoe UI', 20, 'bold'), spacing1=15, spacing3=12,
+                            underline=True, underlinefg='#d0d7de')
+        preview.tag_configure("h2", font=('Segoe UI', 16, 'bold'), spacing1=12, spacing3=10,
+                            underline=True, underlinefg='#d0d7de')
+        preview.tag_configure("h3", font=('Segoe UI', 14, 'bold'), spacing1=10, spacing3=8)
+        preview.tag_configure("h4", font=('Segoe UI', 12, 'bold'), spacing1=8, spacing3=6)
+        preview.tag_configure("h5", font=('Segoe UI', 11, 'bold'), spacing1=6, spacing3=4)
+        preview.tag_configure("h6", font=('Segoe UI', 10, 'bold'), spacing1=4, spacing3=2, foreground='#656d76')
+        
+        preview.tag_configure("bold", font=('Segoe UI', 10, 'bold'))
+        preview.tag_configure("italic", font=('Segoe UI', 10, 'italic'))
+        preview.tag_configure("code", font=('Consolas', 10), background='#f6f8fa', 
+                            relief="solid", borderwidth=1)
+        preview.tag_configure("code_block", font=('Consolas', 9), background='#f6f8fa',
+                            relief="solid", borderwidth=1, spacing1=8, spacing3=8,
+                            lmargin1=16, lmargin2=16)
+        preview.tag_configure("blockquote", foreground='#656d76', lmargin1=16, lmargin2=16,
+                            background='#f6f8fa', relief="solid", borderwidth=1)
+        preview.tag_configure("link", foreground='#0969da', underline=True)
+        preview.tag_configure("list_item", lmargin1=20, lmargin2=20)
+        preview.tag_configure("badge", background='#0969da', foreground='white', 
+                            relief="solid", borderwidth=1)
         
     def new_readme(self):
-        if messagebox.askyesno("New README", "Create a new README? This will clear the current content."):
-            self.editor.delete(1.0, tk.END)
-            self.load_default_template()
-            self.status_bar.config(text="New README created")
+        # A new tab, so the open documents keep their text and state
+        self.open_document()
+        self.load_default_template()
+        self.status_bar.config(text="New README created")
             
     def import_readme(self):
         file_path = filedialog.askopenfilename(
@@ -310,212 +714,211 @@ class ReadmeGenerator:
         
         if file_path:
             try:
-                with open(file_path, 'r', encoding='utf-8') as file:
-                    content = file.read()
+                if self.active_import is not None:
+                    self.active_import.cancel()
                     
-                self.editor.delete(1.0, tk.END)
-                self.editor.insert(1.0, content)
-                self.update_preview()
-                self.status_bar.config(text=f"Imported: {os.path.basename(file_path)}")
+                # Each imported README gets its own tab
+                self.open_document(os.path.basename(file_path), file_path)
+                    
+                # Stream the file into the editor across event-loop ticks; the preview
+                # is built once at the end instead of after every chunk
+                self.preview_scheduler.suspend()
+                self.progress_bar['value'] = 0
+                self.progress_bar.pack(side=tk.BOTTOM, fill=tk.X, pady=(10, 0))
+                
+                self.active_import = ChunkedImport(
+                    self.editor,
+                    file_path,
+                    on_progress=self.on_import_progress,
+                    on_done=self.on_import_done,
+                    on_error=self.on_import_error
+                )
+                self.active_import.start()
                 
             except Exception as e:
+                self.finish_import()
                 messagebox.showerror("Error", f"Failed to import file: {str(e)}")
                 
+    def on_import_progress(self, job, bytes_read, total):
+        percent = 100 * bytes_read / total if total else 100
+        self.progress_bar['value'] = percent
+        self.status_bar.config(text=f"Importing {os.path.basename(job.path)}... {percent:.0f}%")
+        
+    def on_import_done(self, job):
+        self.finish_import()
+        self.refresh_preview()
+        self.status_bar.config(text=f"Imported: {os.path.basename(job.path)}")
+        
+    def on_import_error(self, job, error):
+        self.finish_import()
+        self.refresh_preview()
+        messagebox.showerror("Error", f"Failed to import file: {str(error)}")
+        
+    def finish_import(self):
+        self.active_import = None
+        self.progress_bar.pack_forget()
+        self.preview_scheduler.resume()
+                
     def export_readme(self):
         file_path = filedialog.asksaveasfilename(
             title="Export README",
             defaultextension=".md",
-            filetypes=[("Markdown files", "*.md"), ("Text files", "*.txt"), ("All files", "*.*")]
+            filetypes=[("Markdown files", "*.md"), ("HTML files", "*.html"), ("Text files", "*.txt"), ("All files", "*.*")]
         )
         
         if file_path:
-            try:
-                content = self.editor.get(1.0, tk.END)
+            # .txt keeps meaning the markdown source; "Export All Formats" writes the stripped text
+            export_format = 'html' if file_path.lower().endswith(('.html', '.htm')) else 'md'
+            self.run_export({file_path: export_format})
                 
-                with open(file_path, 'w', encoding='utf-8') as file:
-                    file.write(content)
+    def export_all_formats(self):
+        file_path = filedialog.asksaveasfilename(
+            title="Export README as Markdown, HTML and Text",
+            defaultextension=".md",
+            filetypes=[("Markdown files", "*.md"), ("All files", "*.*")]
+        )
                     
-                self.status_bar.config(text=f"Exported: {os.path.basename(file_path)}")
-                messagebox.showinfo("Success", f"README exported successfully to:\n{file_path}")
+        if file_path:
+            from exporter import export_paths
+            self.run_export(export_paths(file_path))
                 
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to export file: {str(e)}")
+    def run_export(self, targets):
+        from exporter import BackgroundExport
+        
+        if self.preview_held():
+            return
+            
+        # Text, title and cached HTML are all taken from this tab now, so switching
+        # tabs while the export runs can't send another document to these paths
+        self.refresh_preview()
+        document = self.document
+        markdown_content = document.editor_proxy.text()
+        headings = document.heading_index.headings()
+        title = headings[0].text if headings else 'README'
+        
+        # Every format comes from one conversion, and usually the preview already did it;
+        # otherwise the export thread converts the text itself
+        html = None
+        if any(export_format != 'md' for export_format in targets.values()):
+            html = document.render_cache.get(markdown_content, profile='github')
+                
+        self.status_bar.config(text=f"Exporting {document.title}...")
+        BackgroundExport(self.root, markdown_content, targets, title=title, html=html,
+                         on_done=lambda report, error: self.on_exported(document, targets, report, error)).start()
+        
+    def on_exported(self, document, targets, report, error):
+        if error is not None:
+            self.status_bar.config(text=f"Export failed: {str(error)}")
+            messagebox.showerror("Error", f"Failed to export file: {str(error)}")
+            return
+        if PERF.enabled:
+            PERF.record('export.write', report.elapsed_ms,
+                        {'written': len(report.written), 'unchanged': len(report.unchanged)})
+            
+        if report.failed:
+            self.status_bar.config(text=f"Export failed ({report.summary()})")
+            messagebox.showerror("Error", "Failed to export:\n" +
+                                 "\n".join(f"{path}: {error}" for path, error in report.failed))
+            return
+            
+        names = ', '.join(os.path.basename(path) for path in targets)
+        self.status_bar.config(text=f"Exported {document.title}: {names} ({report.summary()})")
+        lines = list(report.written)
+        lines += [f"{path} (unchanged)" for path in report.unchanged]
+        messagebox.showinfo("Success", f"{document.title} exported successfully to:\n" + "\n".join(lines))
                 
     def open_in_browser(self):
+        # Prefer the live preview server: one tab that follows the editor and no temp files
+        if self.use_preview_server and self.start_preview_server():
+            self.publish_live_preview()
+            if self.preview_server.client_count() == 0:
+                import webbrowser
+                webbrowser.open(self.preview_server.url)
+            self.status_bar.config(text=f"Live preview at {self.preview_server.url}")
+            return
+            
+        # Get markdown content
+        markdown_content = self.editor_text()
+        
+        # Unchanged text was already rendered, so there's nothing to wait for
+        html = self.render_cache.get(markdown_content, profile='github')
+        if html is not None:
+            self.show_in_browser(html)
+            return
+            
+        # Convert to HTML in the background; if the text changes meanwhile, start over with the new text.
+        # Switching tabs cancels the job (see activate_document), so a retry never opens another tab's text.
+        self.browser_job = self.render_worker.submit(
+            self.preview_scheduler.generation,
+            markdown_content,
+            self.on_browser_render,
+            on_dropped=self.on_browser_dropped
+        )
+        stats = self.render_worker.stats()
+        self.status_bar.config(text=f"Rendering for browser... ({stats['queue_length']} queued)")
+        
+    def on_browser_dropped(self, job):
+        if job is self.browser_job:
+            self.open_in_browser()
+            
+    def on_browser_render(self, job, html, error):
+        if job is not self.browser_job:
+            return
+        self.browser_job = None
+        if error is not None:
+            messagebox.showerror("Error", f"Failed to open in browser: {str(error)}")
+            return
+            
+        self.render_cache.put(job.content, html, profile='github')
+        self.show_in_browser(html)
+        
+    def start_preview_server(self):
+        if self.preview_server is None:
+            try:
+                from preview_server import PreviewServer
+                self.preview_server = PreviewServer().start()
+            except OSError as e:
+                self.use_preview_server = False
+                self.status_bar.config(text=f"Live preview unavailable ({str(e)}), using a temporary file")
+                return False
+        return True
+        
+    def publish_live_preview(self, markdown_content=None):
+        if markdown_content is None:
+            markdown_content = self.editor_text()
+            
+        html = self.render_cache.get(markdown_content, profile='github')
+        if html is not None:
+            with PERF.stage('browser.publish'):
+                self.preview_server.publish(html)
+        else:
+            # Dropped results need no retry: the edit that made them stale publishes again
+            self.render_worker.submit(self.preview_scheduler.generation, markdown_content, self.on_live_render)
+            
+    def on_live_render(self, job, html, error):
+        if error is not None:
+            self.status_bar.config(text=f"Live preview error: {str(error)}")
+            return
+            
+        self.render_cache.put(job.content, html, profile='github')
+        if self.preview_server is not None:
+            with PERF.stage('browser.publish'):
+                self.preview_server.publish(html)
+            
+    def show_in_browser(self, html):
+        import tempfile
+        import webbrowser
         try:
-            # Get markdown content
-            markdown_content = self.editor.get(1.0, tk.END)
-            
-            # Convert to HTML with styling
-            html = markdown.markdown(
-                markdown_content,
-                extensions=['fenced_code', 'tables', 'toc', 'codehilite']
-            )
-            
-            # Add GitHub-style CSS styling
-            styled_html = f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <meta charset="UTF-8">
-                <title>README Preview</title>
-                <style>
-                    body {{
-                        font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", "Noto Sans", Helvetica, Arial, sans-serif;
-                        font-size: 16px;
-                        line-height: 1.5;
-                        color: #24292f;
-                        background-color: #ffffff;
-                        max-width: 1012px;
-                        margin: 0 auto;
-                        padding: 45px;
-                        box-sizing: border-box;
-                    }}
-                    
-                    h1, h2, h3, h4, h5, h6 {{
-                        margin-top: 24px;
-                        margin-bottom: 16px;
-                        font-weight: 600;
-                        line-height: 1.25;
-                    }}
-                    
-                    h1 {{
-                        font-size: 2em;
-                        border-bottom: 1px solid #d0d7de;
-                        padding-bottom: 0.3em;
-                        margin-top: 0;
-                    }}
-                    
-                    h2 {{
-                        font-size: 1.5em;
-                        border-bottom: 1px solid #d0d7de;
-                        padding-bottom: 0.3em;
-                    }}
-                    
-                    h3 {{ font-size: 1.25em; }}
-                    h4 {{ font-size: 1em; }}
-                    h5 {{ font-size: 0.875em; }}
-                    h6 {{ 
-                        font-size: 0.85em; 
-                        color: #656d76;
-                    }}
-                    
-                    p {{ margin-top: 0; margin-bottom: 16px; }}
-                    
-                    code {{
-                        background-color: #f6f8fa;
-                        border-radius: 6px;
-                        font-size: 85%;
-                        margin: 0;
-                        padding: 0.2em 0.4em;
-                        font-family: ui-monospace, SFMono-Regular, "SF Mono", Consolas, "Liberation Mono", Menlo, monospace;
-                    }}
-                    
-                    pre {{
-                        background-color: #f6f8fa;
-                        border-radius: 6px;
-                        font-size: 85%;
-                        line-height: 1.45;
-                        overflow: auto;
-                        padding: 16px;
-                        margin-top: 0;
-                        margin-bottom: 16px;
-                    }}
-                    
-                    pre code {{
-                        background-color: transparent;
-                        border: 0;
-                        display: inline;
-                        line-height: inherit;
-                        margin: 0;
-                        overflow: visible;
-                        padding: 0;
-                        word-wrap: normal;
-                    }}
-                    
-                    blockquote {{
-                        border-left: 0.25em solid #d0d7de;
-                        color: #656d76;
-                        margin: 0;
-                        padding: 0 1em;
-                    }}
-                    
-                    ul, ol {{
-                        margin-top: 0;
-                        margin-bottom: 16px;
-                        padding-left: 2em;
-                    }}
-                    
-                    li + li {{ margin-top: 0.25em; }}
-                    
-                    table {{
-                        border-spacing: 0;
-                        border-collapse: collapse;
-                        display: block;
-                        width: max-content;
-                        max-width: 100%;
-                        overflow: auto;
-                        margin-top: 0;
-                        margin-bottom: 16px;
-                    }}
-                    
-                    th, td {{
-                        padding: 6px 13px;
-                        border: 1px solid #d0d7de;
-                    }}
-                    
-                    th {{
-                        background-color: #f6f8fa;
-                        font-weight: 600;
-                    }}
-                    
-                    tr:nth-child(2n) {{
-                        background-color: #f6f8fa;
-                    }}
-                    
-                    img {{
-                        max-width: 100%;
-                        height: auto;
-                        box-sizing: content-box;
-                        background-color: #ffffff;
-                    }}
-                    
-                    a {{
-                        color: #0969da;
-                        text-decoration: none;
-                    }}
-                    
-                    a:hover {{
-                        text-decoration: underline;
-                    }}
-                    
-                    strong {{ font-weight: 600; }}
-                    
-                    hr {{
-                        height: 0.25em;
-                        padding: 0;
-                        margin: 24px 0;
-                        background-color: #d0d7de;
-                        border: 0;
-                    }}
-                    
-                    /* Badge styling */
-                    img[src*="shields.io"] {{
-                        display: inline-block;
-                        margin: 2px;
-                    }}
-                </style>
-            </head>
-            <body>
-                {html}
-            </body>
-            </html>
-            """
-            
-            # Save to temporary file and open
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False, encoding='utf-8') as f:
-                f.write(styled_html)
-                temp_path = f.name
+            with PERF.stage('browser.export') as timing:
+                # Add GitHub-style CSS styling
+                styled_html = build_html_page(html)
+            
+                # Save to temporary file and open
+                with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False, encoding='utf-8') as f:
+                    f.write(styled_html)
+                    temp_path = f.name
+                self.temp_files.append(temp_path)
+                timing.note(chars=len(styled_html))
                 
             webbrowser.open(f'file://{temp_path}')
             self.status_bar.config(text="Opened in browser")
@@ -533,175 +936,51 @@ class ReadmeGenerator:
             self.status_bar.config(text="Project info updated")
             
     def load_template(self, template_type):
-        if template_type == 'basic':
-            self.load_basic_template()
-        elif template_type == 'advanced':
-            self.load_advanced_template()
+        if self.preview_held():
+            return
+        try:
+            # Templates are compiled once per file version and renders are memoized per project info
+            template = self.templates.render(template_type, self.project_info)
+        except (KeyError, OSError) as e:
+            messagebox.showerror("Error", f"Failed to load template: {str(e)}")
+            return
+            
+        # One undo step brings the previous text back
+        self.begin_edit_step()
+        self.editor.delete(1.0, tk.END)
+        self.editor.insert(1.0, template)
+        self.refresh_preview()
             
     def load_default_template(self):
         self.load_basic_template()
         
     def load_basic_template(self):
-        template = f"""# {self.project_info['title']}
-
-{self.project_info['description']}
-
-## Installation
-
-```bash
-git clone https://github.com/{self.project_info['author']}/{self.project_info['title'].lower().replace(' ', '-')}.git
-cd {self.project_info['title'].lower().replace(' ', '-')}
-```
-
-## Usage
-
-Describe how to use your project here.
-
-## Contributing
-
-Contributions are welcome! Please feel free to submit a Pull Request.
-
-## License
-
-This project is licensed under the {self.project_info['license']} License.
-
-## Author
-
-**{self.project_info['author']}**
-"""
-        
-        self.editor.delete(1.0, tk.END)
-        self.editor.insert(1.0, template)
-        self.update_preview()
+        self.load_template('basic')
         
     def load_advanced_template(self):
-        template = f"""# {self.project_info['title']}
-
-![Version](https://img.shields.io/badge/version-{self.project_info['version']}-blue.svg)
-![License](https://img.shields.io/badge/license-{self.project_info['license']}-green.svg)
-![Language](https://img.shields.io/badge/language-{self.project_info['language']}-orange.svg)
-
-{self.project_info['description']}
-
-## 🚀 Features
-
-- Feature 1
-- Feature 2
-- Feature 3
+        self.load_template('advanced')
 
-## 📋 Table of Contents
-
-- [Installation](#installation)
-- [Usage](#usage)
-- [API Reference](#api-reference)
-- [Examples](#examples)
-- [Contributing](#contributing)
-- [License](#license)
-- [Contact](#contact)
-
-## 💻 Installation
-
-### Prerequisites
-
-- List any prerequisites here
-
-### Install
-
-```bash
-git clone https://github.com/{self.project_info['author']}/{self.project_info['title'].lower().replace(' ', '-')}.git
-cd {self.project_info['title'].lower().replace(' ', '-')}
-# Add installation commands here
-```
-
-## 🔧 Usage
-
-### Basic Usage
-
-```python
-# Add code examples here
-```
-
-### Advanced Usage
-
-```python
-# Add more complex examples here
-```
-
-## 📚 API Reference
-
-### Class/Function Name
-
-Description of what it does.
-
-**Parameters:**
-- `param1` (type): Description
-- `param2` (type): Description
-
-**Returns:**
-- `type`: Description
-
-**Example:**
-```python
-# Example usage
-```
-
-## 🎯 Examples
-
-### Example 1: Basic Example
-
-```python
-# Code example
-```
-
-### Example 2: Advanced Example
-
-```python
-# Advanced code example
-```
-
-## 🤝 Contributing
-
-Contributions, issues, and feature requests are welcome!
-
-1. Fork the Project
-2. Create your Feature Branch (`git checkout -b feature/AmazingFeature`)
-3. Commit your Changes (`git commit -m 'Add some AmazingFeature'`)
-4. Push to the Branch (`git push origin feature/AmazingFeature`)
-5. Open a Pull Request
-
-## 📝 License
-
-This project is licensed under the {self.project_info['license']} License - see the [LICENSE](LICENSE) file for details.
-
-## 👤 Author
-
-**{self.project_info['author']}**
-
-- GitHub: [@{self.project_info['author']}](https://github.com/{self.project_info['author']})
-
-## 📞 Contact
-
-{self.project_info['contact'] if self.project_info['contact'] else 'Add your contact information here'}
-
-## ⭐ Show your support
+    def choose_template(self):
+        dialog = TemplatePickerDialog(self.root, self.templates)
+        self.root.wait_window(dialog.dialog)
 
-Give a ⭐ if this project helped you!
-"""
-        
-        self.editor.delete(1.0, tk.END)
-        self.editor.insert(1.0, template)
-        self.update_preview()
+        if dialog.result:
+            self.load_template(dialog.result)
+            self.status_bar.config(text=f"Template loaded: {dialog.result}")
         
     def insert_badge(self):
+        if self.preview_held():
+            return
         badge_dialog = BadgeDialog(self.root)
         self.root.wait_window(badge_dialog.dialog)
         
         if badge_dialog.result:
             badge_md = badge_dialog.result
+            self.begin_edit_step()
             # Insert at current cursor position
             current_pos = self.editor.index(tk.INSERT)
             self.editor.insert(current_pos, badge_md)
-            self.update_preview()
+            self.refresh_preview()
             
     def insert_table(self):
         table_md = """
@@ -710,11 +989,16 @@ Give a ⭐ if this project helped you!
 | Row 1    | Data     | Data     |
 | Row 2    | Data     | Data     |
 """
+        if self.preview_held():
+            return
+        self.begin_edit_step()
         current_pos = self.editor.index(tk.INSERT)
         self.editor.insert(current_pos, table_md)
-        self.update_preview()
+        self.refresh_preview()
         
     def insert_code_block(self):
+        if self.preview_held():
+            return
         language = simpledialog.askstring("Code Block", "Enter programming language (optional):") or ""
         
         code_block = f"""
@@ -722,12 +1006,194 @@ Give a ⭐ if this project helped you!
 # Your code here
 ```
 """
+        self.begin_edit_step()
         current_pos = self.editor.index(tk.INSERT)
         self.editor.insert(current_pos, code_block)
-        self.update_preview()
+        self.refresh_preview()
+        
+    def check_links(self):
+        from linkcheck import BackgroundLinkCheck, LinkCache, LinkChecker, extract_links
+        
+        occurrences = extract_links(self.editor_text())
+        urls = list(dict.fromkeys(occurrence.url for occurrence in occurrences))
+        if not urls:
+            self.status_bar.config(text="No links to check")
+            return
+        if self.link_check is not None:
+            self.link_check.cancel()
+            
+        self.link_results = {}
+        self.link_total = len(urls)
+        self.status_bar.config(text=f"Checking {len(urls)} links...")
+        self.link_check = BackgroundLinkCheck(self.root, LinkChecker(cache=LinkCache()), urls,
+                                              on_result=self.on_link_result, on_done=self.on_links_checked).start()
+        
+    def on_link_result(self, result):
+        self.link_results[result.url] = result
+        broken = sum(1 for item in self.link_results.values() if not item.ok)
+        self.status_bar.config(text=f"Checking links... {len(self.link_results)}/{self.link_total} ({broken} broken)")
+        
+    def on_links_checked(self, results, error):
+        self.link_check = None
+        if error is not None:
+            self.status_bar.config(text=f"Link check failed: {str(error)}")
+            return
+            
+        # Positions come from the current text, so edits made during the check don't misplace flags
+        from linkcheck import extract_links
+        self.refresh_preview()
+        broken = {url for url, result in results.items() if not result.ok}
+        ranges = []
+        for occurrence in extract_links(self.editor_text()):
+            if occurrence.url in broken:
+                ranges.extend((f"{occurrence.line}.{occurrence.start}", f"{occurrence.line}.{occurrence.end}"))
+        self.preview.tag_remove('broken_link', 1.0, tk.END)
+        if ranges:
+            self.preview.tag_add('broken_link', *ranges)
+            
+        if broken:
+            details = ', '.join(f"{url} ({results[url].error})" for url in sorted(broken))
+            self.status_bar.config(text=f"{len(broken)} of {len(results)} links broken: {details}")
+        else:
+            self.status_bar.config(text=f"All {len(results)} links OK")
+        
+    def open_find(self, event=None):
+        if self.find_dialog is None:
+            self.find_dialog = FindReplaceDialog(self.root, self)
+        else:
+            self.find_dialog.dialog.lift()
+        self.find_dialog.find_entry.focus_set()
+        return 'break'
+        
+    def start_search(self, text, regex=False, match_case=False):
+        self.current_match = None
+        if not text:
+            self.search.stop()
+            self.find_dialog.set_status("")
+            return
+        try:
+            pattern = compile_pattern(text, regex, match_case)
+        except ValueError as e:
+            self.search.stop()
+            self.find_dialog.set_status(str(e))
+            return
+        if self.preview_held():
+            self.search.stop()
+            self.find_dialog.set_status("Searching waits for the import")
+            return
+            
+        # Search what the editor shows right now; later edits arrive through update_preview
+        self.refresh_preview()
+        lines = self.preview_engine.lines
+        if lines is None:
+            lines = self.editor_proxy.lines[:]
+        self.search.start(pattern, lines)
+        
+    def on_search_progress(self, index):
+        if self.find_dialog is not None:
+            status = f"{index.match_count} matches"
+            if not index.done:
+                status += " (searching...)"
+            self.find_dialog.set_status(status)
+            
+    def find_next(self, backwards=False):
+        if self.search.index is None:
+            return
+        line, column = map(int, self.editor.index(tk.INSERT).split('.'))
+        if backwards and self.current_match and self.current_match[0] == line - 1 and self.current_match[2] == column:
+            # The cursor sits at the end of the current match; step back past it
+            column = self.current_match[1]
+            
+        match = self.search.index.find_next(line - 1, column, backwards)
+        if match is None:
+            self.find_dialog.set_status("No matches")
+            return
+        self.show_match(match)
+        
+    def show_match(self, match):
+        line, start, end = match
+        first, last = f"{line + 1}.{start}", f"{line + 1}.{end}"
+        self.editor.tag_remove(CURRENT_TAG, 1.0, tk.END)
+        self.editor.tag_add(CURRENT_TAG, first, last)
+        self.editor.mark_set(tk.INSERT, last)
+        self.editor.see(first)
+        self.current_match = match
+        
+    def replace_current(self, replacement, regex=False):
+        if self.search.index is None:
+            return
+        # Make sure the index has seen the latest edits before trusting the current match
+        self.refresh_preview()
+        match = self.current_match
+        if match is None or not self.search.index.is_match(*match):
+            self.find_next()
+            return
+            
+        line, start, end = match
+        try:
+            text = self.search.index.replacement_for(line, start, replacement, regex)
+        except ValueError as e:
+            self.find_dialog.set_status(str(e))
+            return
+        self.history.separate()
+        self.editor.delete(f"{line + 1}.{start}", f"{line + 1}.{end}")
+        self.editor.insert(f"{line + 1}.{start}", text)
+        self.refresh_preview()
+        
+        self.current_match = None
+        self.editor.mark_set(tk.INSERT, f"{line + 1}.{start + len(text)}")
+        self.find_next()
+        
+    def replace_all(self, replacement, regex=False):
+        if self.search.index is None:
+            return
+        self.refresh_preview()
+        try:
+            result = self.search.index.replace_all(replacement, regex)
+        except ValueError as e:
+            self.find_dialog.set_status(str(e))
+            return
+        if result is None:
+            self.find_dialog.set_status("No matches")
+            return
+            
+        # Every matching line is rewritten by one delete and one insert, not one edit per match
+        first, last, new_lines, count = result
+        self.history.separate()
+        self.editor.delete(f"{first + 1}.0", f"{last + 1}.end")
+        self.editor.insert(f"{first + 1}.0", '\n'.join(new_lines))
+        self.current_match = None
+        self.refresh_preview()
+        self.status_bar.config(text=f"Replaced {count} matches")
+        
+    def close_find(self):
+        self.search.stop()
+        self.current_match = None
+        self.find_dialog = None
+        
+    def show_stats(self):
+        # Non-modal so it can stay open and update while typing
+        StatsDialog(self.root, PERF)
         
     def run(self):
         self.root.mainloop()
+        self.render_worker.shutdown()
+        PERF.close()
+
+        # A clean exit leaves nothing to recover next time
+        for document in self.documents.documents:
+            if document.autosave is not None:
+                document.autosave.close()
+            
+        if self.preview_server is not None:
+            self.preview_server.stop()
+            
+        # Don't leave browser previews behind in the temp directory
+        for temp_path in self.temp_files:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
 
 
 class ProjectInfoDialog:
@@ -810,6 +1276,214 @@ class ProjectInfoDialog:
         self.dialog.destroy()
 
 
+class TemplatePickerDialog:
+    def __init__(self, parent, templates):
+        self.result = None
+        self.templates = templates
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("Choose Template")
+        self.dialog.geometry("400x450")
+        self.dialog.configure(bg='#2b2b2b')
+        
+        # Make dialog modal
+        self.dialog.transient(parent)
+        self.dialog.grab_set()
+        
+        # Center the dialog
+        self.dialog.geometry("+%d+%d" % (parent.winfo_rootx() + 50, parent.winfo_rooty() + 50))
+        
+        self.create_widgets()
+        
+    def create_widgets(self):
+        main_frame = ttk.Frame(self.dialog)
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        
+        # Title
+        title_label = tk.Label(main_frame, text="Templates",
+                              font=('Arial', 14, 'bold'),
+                              bg='#2b2b2b', fg='white')
+        title_label.pack(pady=(0, 10))
+        
+        tk.Label(main_frame, text=f"Add your own .md templates to {USER_TEMPLATE_DIR}",
+                 bg='#2b2b2b', fg='#aaaaaa', anchor='w', wraplength=340, justify=tk.LEFT).pack(fill=tk.X, pady=(0, 10))
+        
+        # The index comes from a directory scan only, and all rows go in with a single insert
+        self.entries = self.templates.index()
+        list_frame = ttk.Frame(main_frame)
+        list_frame.pack(fill=tk.BOTH, expand=True)
+        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL)
+        self.listbox = tk.Listbox(list_frame, font=('Arial', 10), bg='#404040', fg='white',
+                                  selectbackground='#0969da', yscrollcommand=scrollbar.set)
+        scrollbar.config(command=self.listbox.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.listbox.insert(tk.END, *[entry.title for entry in self.entries])
+        self.listbox.bind('<Double-Button-1>', lambda event: self.load())
+        if self.entries:
+            self.listbox.selection_set(0)
+            
+        # Buttons
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(fill=tk.X, pady=(15, 0))
+        
+        ttk.Button(button_frame, text="Load", command=self.load).pack(side=tk.RIGHT, padx=(5, 0))
+        ttk.Button(button_frame, text="Cancel", command=self.cancel).pack(side=tk.RIGHT)
+        
+    def load(self):
+        selection = self.listbox.curselection()
+        if selection:
+            self.result = self.entries[selection[0]].name
+        self.dialog.destroy()
+        
+    def cancel(self):
+        self.dialog.destroy()
+
+
+class FindReplaceDialog:
+    def __init__(self, parent, app):
+        self.app = app
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("Find and Replace")
+        self.dialog.geometry("420x220")
+        self.dialog.configure(bg='#2b2b2b')
+        self.dialog.resizable(False, False)
+        self.dialog.transient(parent)
+        
+        # Center the dialog
+        self.dialog.geometry("+%d+%d" % (parent.winfo_rootx() + 50, parent.winfo_rooty() + 50))
+        
+        self.search_id = None
+        self.create_widgets()
+        self.dialog.protocol("WM_DELETE_WINDOW", self.close)
+        
+    def create_widgets(self):
+        main_frame = ttk.Frame(self.dialog)
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=15)
+        
+        self.find_text = tk.StringVar()
+        self.replace_text = tk.StringVar()
+        self.regex = tk.BooleanVar(value=False)
+        self.match_case = tk.BooleanVar(value=False)
+        
+        tk.Label(main_frame, text="Find:", bg='#2b2b2b', fg='white', anchor='w').grid(row=0, column=0, sticky='w')
+        self.find_entry = tk.Entry(main_frame, textvariable=self.find_text, font=('Arial', 10), bg='#404040', fg='white',
+                                   insertbackground='white')
+        self.find_entry.grid(row=0, column=1, sticky='ew', pady=(0, 5))
+        
+        tk.Label(main_frame, text="Replace:", bg='#2b2b2b', fg='white', anchor='w').grid(row=1, column=0, sticky='w')
+        tk.Entry(main_frame, textvariable=self.replace_text, font=('Arial', 10), bg='#404040', fg='white',
+                 insertbackground='white').grid(row=1, column=1, sticky='ew', pady=(0, 5))
+        main_frame.columnconfigure(1, weight=1)
+        
+        options = ttk.Frame(main_frame)
+        options.grid(row=2, column=1, sticky='w')
+        ttk.Checkbutton(options, text="Regex", variable=self.regex).pack(side=tk.LEFT)
+        ttk.Checkbutton(options, text="Match case", variable=self.match_case).pack(side=tk.LEFT, padx=(10, 0))
+        
+        self.status_label = tk.Label(main_frame, text="", bg='#2b2b2b', fg='#aaaaaa', anchor='w')
+        self.status_label.grid(row=3, column=0, columnspan=2, sticky='ew', pady=(10, 0))
+        
+        # Buttons
+        button_frame = ttk.Frame(main_frame)
+        button_frame.grid(row=4, column=0, columnspan=2, sticky='ew', pady=(10, 0))
+        
+        ttk.Button(button_frame, text="Close", command=self.close).pack(side=tk.RIGHT, padx=(5, 0))
+        ttk.Button(button_frame, text="Replace All", command=lambda: self.app.replace_all(self.replace_text.get(), self.regex.get())).pack(side=tk.RIGHT, padx=(5, 0))
+        ttk.Button(button_frame, text="Replace", command=lambda: self.app.replace_current(self.replace_text.get(), self.regex.get())).pack(side=tk.RIGHT, padx=(5, 0))
+        ttk.Button(button_frame, text="Previous", command=lambda: self.app.find_next(backwards=True)).pack(side=tk.RIGHT, padx=(5, 0))
+        ttk.Button(button_frame, text="Next", command=self.app.find_next).pack(side=tk.RIGHT)
+        
+        # Search as you type, once typing pauses
+        for variable in (self.find_text, self.regex, self.match_case):
+            variable.trace_add('write', self.schedule_search)
+        self.find_entry.bind('<Return>', lambda event: self.app.find_next())
+        self.find_entry.bind('<Shift-Return>', lambda event: self.app.find_next(backwards=True))
+        
+    def schedule_search(self, *args):
+        if self.search_id is not None:
+            self.dialog.after_cancel(self.search_id)
+        self.search_id = self.dialog.after(150, self.search)
+        
+    def search(self):
+        self.search_id = None
+        self.app.start_search(self.find_text.get(), self.regex.get(), self.match_case.get())
+        
+    def set_status(self, text):
+        self.status_label.config(text=text)
+        
+    def close(self):
+        if self.search_id is not None:
+            self.dialog.after_cancel(self.search_id)
+        self.app.close_find()
+        self.dialog.destroy()
+
+
+class StatsDialog:
+    COLUMNS = ('count', 'last', 'p50', 'p95', 'p99', 'max')
+    
+    def __init__(self, parent, instruments, refresh_interval=1000):
+        self.instruments = instruments
+        self.refresh_interval = refresh_interval
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("Performance Stats")
+        self.dialog.geometry("560x320")
+        self.dialog.configure(bg='#2b2b2b')
+        self.dialog.transient(parent)
+        
+        # Center the dialog
+        self.dialog.geometry("+%d+%d" % (parent.winfo_rootx() + 50, parent.winfo_rooty() + 50))
+        
+        self.after_id = None
+        self.create_widgets()
+        self.refresh()
+        self.dialog.protocol("WM_DELETE_WINDOW", self.close)
+        
+    def create_widgets(self):
+        main_frame = ttk.Frame(self.dialog)
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        
+        self.tree = ttk.Treeview(main_frame, columns=self.COLUMNS, height=8)
+        self.tree.heading('#0', text="Stage")
+        self.tree.column('#0', width=140)
+        for column in self.COLUMNS:
+            self.tree.heading(column, text=column if column == 'count' else f"{column} (ms)")
+            self.tree.column(column, width=60, anchor=tk.E)
+        self.tree.pack(fill=tk.BOTH, expand=True)
+        
+        if not self.instruments.enabled:
+            note = "Timing is off (README_INSTRUMENT=0)"
+        elif self.instruments.trace_path:
+            note = f"Tracing to {self.instruments.trace_path}"
+        else:
+            note = "Set README_TRACE=file.jsonl to record a trace"
+        tk.Label(main_frame, text=note, bg='#2b2b2b', fg='#aaaaaa', anchor='w').pack(fill=tk.X, pady=(10, 0))
+        
+        # Buttons
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(fill=tk.X, pady=(10, 0))
+        
+        ttk.Button(button_frame, text="Close", command=self.close).pack(side=tk.RIGHT, padx=(5, 0))
+        ttk.Button(button_frame, text="Reset", command=self.reset).pack(side=tk.RIGHT)
+        
+    def refresh(self):
+        self.tree.delete(*self.tree.get_children())
+        for name, summary in self.instruments.summary():
+            values = [summary['count']] + [f"{summary[column]:.2f}" for column in self.COLUMNS[1:]]
+            self.tree.insert('', tk.END, text=name, values=values)
+        self.after_id = self.dialog.after(self.refresh_interval, self.refresh)
+        
+    def reset(self):
+        self.instruments.reset()
+        self.dialog.after_cancel(self.after_id)
+        self.refresh()
+        
+    def close(self):
+        if self.after_id is not None:
+            self.dialog.after_cancel(self.after_id)
+            self.after_id = None
+        self.dialog.destroy()
+
+
 class BadgeDialog:
     def __init__(self, parent):
         self.result = None
@@ -876,9 +1550,8 @@ class BadgeDialog:
         message = self.message_entry.get().strip() or "message"
         color = self.color_combo.get() or "blue"
         
-        # Create shields.io badge
-        badge_url = f"https://img.shields.io/badge/{label}-{message}-{color}.svg"
-        badge_md = f"![{label}]({badge_url})"
+        # Create shields.io badge (escaped, so labels with spaces or dashes work)
+        badge_md = f"![{label}]({badge_url(label, message, color)})"
         
         self.result = badge_md
         self.dialog.destroy()
@@ -888,5 +1561,5 @@ class BadgeDialog:
 
 
 if __name__ == "__main__":
-    app = ReadmeGenerator()
+    app = ReadmeGenerator(profile_startup='--profile-startup' in sys.argv[1:])
     app.run()
\ No newline at end of file
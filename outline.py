@@ -0,0 +1,155 @@
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from collections import namedtuple
+
+from preview import diff_lines
+
+# Document structure for the outline panel and the generated table of
+# contents. The index is kept in step with the editor by reparsing only the
+# lines that changed, so it is cheap enough to update on every edit.
+
+Heading = namedtuple('Heading', ['level', 'text', 'line', 'slug'])
+
+_ATX_HEADING = re.compile(r'^ {0,3}(#{1,6})(?:[ \t]+(.*?))?(?:[ \t]+#+)?[ \t]*$')
+_FENCE = re.compile(r'^ {0,3}(`{3,}|~{3,})')
+_LINK = re.compile(r'!?\[([^\]]*)\]\([^)]*\)')
+_EMPHASIS = re.compile(r'\*+|`')
+
+TOC_TITLE = re.compile(r'^\W*table of contents\W*$', re.I)
+TOC_ITEM = re.compile(r'^\s*[-*+]\s+\[[^\]]*\]\(#[^)]*\)\s*$')
+
+
+def heading_text(raw):
+    # The text GitHub renders for a heading: link text, no emphasis or code markers
+    return _EMPHASIS.sub('', _LINK.sub(r'\1', raw)).strip()
+
+
+def github_slug(text):
+    # Same rules as GitHub's anchors: lowercase, drop punctuation and symbols
+    # (emoji included), spaces become hyphens. Duplicates are numbered by the index.
+    kept = [ch for ch in text.lower()
+            if ch in ' -_' or unicodedata.category(ch)[0] in 'LNM']
+    return ''.join(kept).replace(' ', '-')
+
+
+def parse_line(line, fence):
+    # Returns ((level, text, base_slug) or None, fence state after the line)
+    match = _FENCE.match(line)
+    if fence:
+        if match and match.group(1)[0] == fence[0] and len(match.group(1)) >= len(fence) \
+                and not line[match.end():].strip():
+            return None, ''
+        return None, fence
+    if match:
+        return None, match.group(1)
+        
+    if '#' not in line[:4]:
+        return None, ''
+    match = _ATX_HEADING.match(line)
+    if match is None:
+        return None, ''
+    text = heading_text(match.group(2) or '')
+    return (len(match.group(1)), text, github_slug(text)), ''
+
+
+class HeadingIndex:
+    def __init__(self):
+        self.lines = []
+        # Per line: the parsed heading or None
+        self.heading_at = []
+        # Per line: the code fence still open after it ('' outside one); None if not parsed yet
+        self.fence_after = []
+        # Sorted line numbers (0-based) of the headings
+        self.heading_lines = []
+        self.cached_headings = []
+        self.version = 0
+        
+    def update(self, lines, changes=None, base=None):
+        # Returns True if the headings (or their line numbers) changed. changes are
+        # diff_lines() ranges from base to lines, reused if base is what we indexed last.
+        if changes is None or base is not self.lines:
+            changes = diff_lines(self.lines, lines)
+        if not changes:
+            return False
+            
+        # Splice bottom-up so earlier ranges keep their positions
+        for old_start, old_end, new_start, new_end in reversed(changes):
+            inserted = new_end - new_start
+            self.heading_at[old_start:old_end] = [None] * inserted
+            self.fence_after[old_start:old_end] = [None] * inserted
+            
+            first = bisect_left(self.heading_lines, old_start)
+            last = bisect_left(self.heading_lines, old_end)
+            delta = inserted - (old_end - old_start)
+            tail = [line + delta for line in self.heading_lines[last:]] if delta else self.heading_lines[last:]
+            self.heading_lines[first:] = tail
+            
+        self.lines = lines
+        
+        # Reparse each dirty range, running on past its end until the fence
+        # state matches what was there before (an opened or closed fence can
+        # change the meaning of everything below it)
+        for _, _, new_start, new_end in changes:
+            line_num = new_start
+            fence = self.fence_after[line_num - 1] if line_num else ''
+            # What the current line started with before this update; unknown for new lines
+            previous_fence = None
+            while line_num < len(lines):
+                if line_num >= new_end and previous_fence == fence:
+                    break
+                heading, after = parse_line(lines[line_num], fence)
+                previous_fence = self.fence_after[line_num]
+                self.fence_after[line_num] = fence = after
+                
+                previous = self.heading_at[line_num]
+                if (previous is None) != (heading is None):
+                    if heading is None:
+                        del self.heading_lines[bisect_left(self.heading_lines, line_num)]
+                    else:
+                        insort(self.heading_lines, line_num)
+                self.heading_at[line_num] = heading
+                line_num += 1
+                
+        self.cached_headings = None
+        self.version += 1
+        return True
+        
+    def headings(self):
+        # Headings in document order, with 1-based line numbers and unique slugs
+        if self.cached_headings is None:
+            seen = {}
+            headings = []
+            for line_num in self.heading_lines:
+                level, text, slug = self.heading_at[line_num]
+                count = seen.get(slug, 0)
+                seen[slug] = count + 1
+                headings.append(Heading(level, text, line_num + 1, f"{slug}-{count}" if count else slug))
+            self.cached_headings = headings
+        return self.cached_headings
+        
+    def find_toc(self):
+        # (heading, first_line, end_line) of the table of contents block, lines
+        # 1-based and end exclusive; None if the document has no TOC heading
+        headings = self.headings()
+        for position, heading in enumerate(headings):
+            if not TOC_TITLE.match(heading.text):
+                continue
+            first = heading.line + 1
+            end = first
+            limit = headings[position + 1].line if position + 1 < len(headings) else len(self.lines) + 1
+            # The block is the run of anchor links (and blank lines) under the heading
+            while end < limit and (TOC_ITEM.match(self.lines[end - 1]) or not self.lines[end - 1].strip()):
+                end += 1
+            return heading, first, end
+        return None
+
+
+def build_toc(headings, min_level=2, max_level=3, exclude=None):
+    # Markdown list of links to the headings, nested by level
+    entries = [heading for heading in headings
+               if min_level <= heading.level <= max_level and heading is not exclude]
+    if not entries:
+        return ''
+    top = min(heading.level for heading in entries)
+    return ''.join(f"{'  ' * (heading.level - top)}- [{heading.text}](#{heading.slug})\n" for heading in entries)
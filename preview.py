@@ -0,0 +1,327 @@
+import time
+
+from formatting import classify_line, scan_inline
+from instrumentation import PERF
+
+
+class PreviewScheduler:
+    # Collapses any number of preview requests into a single pending render.
+    # The debounce window grows with the cost of the last render, so cheap
+    # documents update almost instantly while huge ones wait for a typing pause.
+    def __init__(self, root, render_callback, min_delay=15, max_delay=750, cost_factor=2.0):
+        self.root = root
+        self.render_callback = render_callback
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.cost_factor = cost_factor
+        
+        self.generation = 0
+        self.rendered_generation = 0
+        self.last_render_ms = 0.0
+        self.pending_id = None
+        self.rendering = False
+        self.stale = False
+        self.suspended = False
+        
+    def debounce_delay(self):
+        # Wait roughly twice as long as the last render took before starting the next one
+        delay = self.min_delay + self.last_render_ms * self.cost_factor
+        return int(min(self.max_delay, delay))
+        
+    def request(self):
+        # Called for every edit; only the newest request survives
+        self.generation += 1
+        if self.rendering:
+            self.stale = True
+        if self.suspended:
+            return
+            
+        if self.pending_id is not None:
+            self.root.after_cancel(self.pending_id)
+        self.pending_id = self.root.after(self.debounce_delay(), self._on_timer)
+        
+    def flush(self):
+        # Render right now, dropping whatever was queued. While suspended this
+        # does nothing: resume() renders whatever the suspension held back.
+        self.cancel()
+        if self.suspended:
+            return
+        self._render()
+        
+    def suspend(self):
+        # Edits are still counted but nothing renders until resume()
+        self.suspended = True
+        self.cancel()
+        
+    def resume(self):
+        self.suspended = False
+        if self.generation != self.rendered_generation:
+            self.flush()
+        
+    def cancel(self):
+        if self.pending_id is not None:
+            self.root.after_cancel(self.pending_id)
+            self.pending_id = None
+        
+    def _on_timer(self):
+        self.pending_id = None
+        if self.generation != self.rendered_generation:
+            self._render()
+            
+    def _render(self):
+        generation = self.generation
+        self.rendering = True
+        self.stale = False
+        started = time.perf_counter()
+        
+        try:
+            self.render_callback()
+        finally:
+            self.rendering = False
+            self.last_render_ms = (time.perf_counter() - started) * 1000
+            self.rendered_generation = generation
+            
+        # Input that arrived while rendering already queued a follow-up in request()
+        if self.stale and self.pending_id is None:
+            self.pending_id = self.root.after(self.debounce_delay(), self._on_timer)
+
+
+def diff_lines(old_lines, new_lines, max_diff_work=250000):
+    # Returns the (old_start, old_end, new_start, new_end) ranges that changed.
+    # Typing only ever touches one region, which prefix/suffix trimming finds in
+    # O(n); anything left over is refined with difflib when it's small enough.
+    limit = min(len(old_lines), len(new_lines))
+    start = 0
+    while start < limit and old_lines[start] == new_lines[start]:
+        start += 1
+        
+    old_end, new_end = len(old_lines), len(new_lines)
+    while old_end > start and new_end > start and old_lines[old_end - 1] == new_lines[new_end - 1]:
+        old_end -= 1
+        new_end -= 1
+        
+    if start == old_end and start == new_end:
+        return []
+        
+    old_span, new_span = old_end - start, new_end - start
+    if old_span > 1 and new_span > 1 and old_span * new_span <= max_diff_work:
+        # Imported here since plain typing never needs it
+        import difflib
+        matcher = difflib.SequenceMatcher(None, old_lines[start:old_end], new_lines[start:new_end], autojunk=False)
+        return [(start + a1, start + a2, start + b1, start + b2)
+                for tag, a1, a2, b1, b2 in matcher.get_opcodes() if tag != 'equal']
+        
+    return [(start, old_end, start, new_end)]
+
+
+def build_paint_plan(lines, first_line_num):
+    # Turns a run of markdown lines into the text to insert plus, per tag, a
+    # flat [start, end, start, end, ...] list of Tk indices. Pure Python, so
+    # the whole block costs one insert and one tag_add per tag to apply.
+    ranges = {}
+    for offset, line in enumerate(lines):
+        if not line.strip():
+            continue
+        line_num = first_line_num + offset
+        
+        block_tag = classify_line(line)
+        if block_tag:
+            ranges.setdefault(block_tag, []).extend((f"{line_num}.0", f"{line_num}.end"))
+            
+        for kind, start, end in scan_inline(line):
+            ranges.setdefault(kind, []).extend((f"{line_num}.{start}", f"{line_num}.{end}"))
+            
+    return '\n'.join(lines) + '\n', ranges
+
+
+class IncrementalPreview:
+    # Keeps the preview text widget in sync with the editor by repainting only
+    # the lines that changed since the last update. Formatting is line-local, so
+    # tags on untouched lines stay valid and are never re-applied.
+    #
+    # Above virtualize_threshold lines the preview is virtualized: all text is
+    # inserted, but only the visible lines plus a margin are tagged. More lines
+    # are tagged as the user scrolls and tags far outside the viewport are
+    # dropped again, so tag memory stays bounded however long the document is.
+    #
+    # decorate(first_line_num, lines), if given, is called after a block is
+    # painted with tags (never in virtual mode) to embed extras like images at
+    # the end of its lines, where they can't shift the tagged columns. It
+    # returns the number of Tcl calls it made.
+    def __init__(self, widget, virtualize_threshold=5000, margin=150, keep_distance=1500, decorate=None):
+        self.widget = widget
+        self.decorate = decorate
+        self.virtualize_threshold = virtualize_threshold
+        self.margin = margin
+        self.keep_distance = keep_distance
+        
+        self.lines = []
+        self.tagged = []
+        self.tag_names = set()
+        
+        # (lines before, diff_lines ranges) of the last update, for consumers
+        # that follow the same edits, like the heading index
+        self.last_update = ([], [])
+        self.virtual = False
+        self.window_pending = False
+        
+        # Tcl round-trips made by the last update, and since startup
+        self.last_tcl_calls = 0
+        self.total_tcl_calls = 0
+        
+        # Tag lazily whenever the preview scrolls
+        if hasattr(widget, 'vbar'):
+            widget.configure(yscrollcommand=self._on_scroll)
+            
+    def reset(self):
+        with PERF.stage('preview.clear'):
+            self.widget.delete('1.0', 'end')
+        self.lines = []
+        self.tagged = []
+        
+    def paint(self, index, lines, first_line_num, with_tags=True):
+        # Insert a block of lines and tag it: 1 + (number of distinct tags) Tcl calls
+        with PERF.stage('preview.paint') as timing:
+            text, ranges = build_paint_plan(lines, first_line_num) if with_tags else ('\n'.join(lines) + '\n', {})
+        
+            # An explicit empty tag list keeps new text from inheriting neighbouring tags
+            self.widget.insert(index, text, ())
+            timing.note(lines=len(lines))
+        tcl_calls = 1 + self.apply_ranges(ranges)
+        if with_tags and self.decorate is not None:
+            tcl_calls += self.decorate(first_line_num, lines)
+        return tcl_calls
+        
+    def apply_ranges(self, ranges):
+        if not ranges:
+            return 0
+        with PERF.stage('preview.tag') as timing:
+            for tag, indices in ranges.items():
+                self.widget.tag_add(tag, *indices)
+            timing.note(tags=len(ranges))
+        self.tag_names.update(ranges)
+        return len(ranges)
+        
+    def update(self, markdown_content):
+        return self.update_lines(markdown_content.split('\n'))
+        
+    def update_lines(self, new_lines, changes=None):
+        # changes, if the caller already knows them, are diff_lines ranges from
+        # self.lines to new_lines; new_lines must not be mutated afterwards
+        if self.lines is None:
+            # A previous update failed half-way, so the widget can't be trusted
+            self.reset()
+            changes = None
+            
+        was_virtual = self.virtual
+        self.virtual = self.virtualize_threshold is not None and len(new_lines) > self.virtualize_threshold
+        
+        if changes is None:
+            changes = diff_lines(self.lines, new_lines)
+        self.last_update = (self.lines, changes)
+        if not changes and was_virtual == self.virtual:
+            self.last_tcl_calls = 0
+            return 0
+            
+        top_line = int(self.widget.index('@0,0').split('.')[0])
+        tcl_calls = 1
+        shift = 0
+        repainted = 0
+        
+        try:
+            # Work bottom-up so the line numbers of earlier ranges stay valid
+            for old_start, old_end, new_start, new_end in reversed(changes):
+                if old_end > old_start:
+                    with PERF.stage('preview.clear'):
+                        self.widget.delete(f"{old_start + 1}.0", f"{old_end + 1}.0")
+                    tcl_calls += 1
+                    
+                inserted = new_lines[new_start:new_end]
+                if inserted:
+                    # Virtual mode leaves tagging to refresh_window, which only looks at the viewport
+                    tcl_calls += self.paint(f"{old_start + 1}.0", inserted, old_start + 1, with_tags=not self.virtual)
+                self.tagged[old_start:old_end] = [not self.virtual] * len(inserted)
+                            
+                if old_end < top_line:
+                    shift += (new_end - new_start) - (old_end - old_start)
+                repainted += len(inserted)
+        except Exception:
+            self.lines = None
+            raise
+            
+        self.lines = new_lines
+        
+        # Keep the same content at the top of the viewport
+        self.widget.yview(f"{max(1, top_line + shift)}.0")
+        tcl_calls += 1
+        
+        if self.virtual:
+            tcl_calls += self.refresh_window()
+        elif was_virtual:
+            # Dropped below the threshold: tag whatever virtual mode skipped
+            tcl_calls += self.tag_lines(1, len(self.lines))
+            
+        self.last_tcl_calls = tcl_calls
+        self.total_tcl_calls += tcl_calls
+        return repainted
+
+    def visible_lines(self):
+        first = int(self.widget.index('@0,0').split('.')[0])
+        last = int(self.widget.index(f"@0,{self.widget.winfo_height()}").split('.')[0])
+        return first, last
+        
+    def tag_lines(self, first, last):
+        # Tag every untagged line in [first, last] (1-based, inclusive), batched per tag
+        ranges = {}
+        line_num = max(1, first)
+        last = min(last, len(self.lines))
+        while line_num <= last:
+            if self.tagged[line_num - 1]:
+                line_num += 1
+                continue
+                
+            run_end = line_num
+            while run_end <= last and not self.tagged[run_end - 1]:
+                run_end += 1
+                
+            _, run_ranges = build_paint_plan(self.lines[line_num - 1:run_end - 1], line_num)
+            for tag, indices in run_ranges.items():
+                ranges.setdefault(tag, []).extend(indices)
+            self.tagged[line_num - 1:run_end - 1] = [True] * (run_end - line_num)
+            line_num = run_end
+            
+        return self.apply_ranges(ranges)
+        
+    def untag_lines(self, first, last):
+        # Drop all preview tags from [first, last]; they are rebuilt if the user scrolls back
+        first, last = max(1, first), min(last, len(self.lines))
+        if first > last or not any(self.tagged[first - 1:last]):
+            return 0
+            
+        for tag in self.tag_names:
+            self.widget.tag_remove(tag, f"{first}.0", f"{last + 1}.0")
+        self.tagged[first - 1:last] = [False] * (last - first + 1)
+        return len(self.tag_names)
+        
+    def refresh_window(self):
+        if not self.virtual:
+            return 0
+            
+        first, last = self.visible_lines()
+        tcl_calls = 2 + self.tag_lines(first - self.margin, last + self.margin)
+        tcl_calls += self.untag_lines(1, first - self.keep_distance - 1)
+        tcl_calls += self.untag_lines(last + self.keep_distance + 1, len(self.lines))
+        return tcl_calls
+        
+    def _on_scroll(self, first, last):
+        self.widget.vbar.set(first, last)
+        
+        # Scroll events come in bursts; tag the new viewport once things settle
+        if self.virtual and not self.window_pending:
+            self.window_pending = True
+            self.widget.after_idle(self._refresh_window_idle)
+            
+    def _refresh_window_idle(self):
+        self.window_pending = False
+        if self.lines is not None:
+            self.total_tcl_calls += self.refresh_window()
@@ -0,0 +1,253 @@
+import json
+import queue
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from preview import diff_lines
+from rendering import GITHUB_CSS, content_hash
+
+# Local live-reload preview. One browser tab connects to an event stream and
+# patches only the top-level HTML blocks that changed, so the page follows the
+# editor without reloading and without temp files. The CSS is served once as
+# a cacheable static asset instead of being inlined into every render.
+
+VOID_ELEMENTS = frozenset(('area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+                           'link', 'meta', 'source', 'track', 'wbr'))
+
+_TAG_PATTERN = re.compile(r'<!--.*?-->|<(/?)([a-zA-Z][a-zA-Z0-9-]*)\b[^>]*?(/?)>', re.S)
+
+PAGE_SCRIPT = """
+const content = document.getElementById('content');
+let version = Number(content.dataset.version);
+const events = new EventSource('/events?v=' + version);
+
+events.addEventListener('reload', () => location.reload());
+events.onmessage = (event) => {
+    const patch = JSON.parse(event.data);
+    if (patch.from !== version) {
+        // Missed an update; start over from a full page
+        location.reload();
+        return;
+    }
+    // Ops arrive bottom-up, so earlier indices stay valid
+    for (const [start, removed, inserted] of patch.ops) {
+        for (let i = 0; i < removed; i++) {
+            content.children[start].remove();
+        }
+        const template = document.createElement('template');
+        template.innerHTML = inserted.join('');
+        content.insertBefore(template.content, content.children[start] || null);
+    }
+    version = patch.to;
+};
+"""
+
+
+def split_html_blocks(html):
+    # Splits rendered HTML into its top-level elements, each wrapped in a
+    # display:contents div so the browser can swap them one by one
+    blocks = []
+    depth = 0
+    block_start = None
+    position = 0
+    
+    for match in _TAG_PATTERN.finditer(html):
+        if depth == 0:
+            text = html[position:match.start()].strip()
+            if text:
+                blocks.append(text)
+                
+        closing, name, self_closing = match.groups()
+        if name is None or (not closing and (self_closing or name.lower() in VOID_ELEMENTS)):
+            # Comments and void elements are complete on their own
+            if depth == 0:
+                blocks.append(match.group(0))
+                position = match.end()
+        elif closing:
+            depth = max(0, depth - 1)
+            if depth == 0 and block_start is not None:
+                blocks.append(html[block_start:match.end()])
+                block_start = None
+                position = match.end()
+        else:
+            if depth == 0:
+                block_start = match.start()
+            depth += 1
+            
+    tail = html[block_start if block_start is not None else position:].strip()
+    if tail:
+        blocks.append(tail)
+    return [f'<div class="md-block">{block}</div>' for block in blocks]
+
+
+class PreviewRequestHandler(BaseHTTPRequestHandler):
+    server_version = 'ReadmePreview/1.0'
+    preview = None
+    
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        if path == '/':
+            self.send_page()
+        elif path == '/github.css':
+            self.send_stylesheet()
+        elif path == '/events':
+            self.stream_events()
+        else:
+            self.send_error(404)
+            
+    def send_body(self, body, content_type, headers=()):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        
+    def send_page(self):
+        version, blocks = self.preview.snapshot()
+        page = f"""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <title>README Preview</title>
+    <link rel="stylesheet" href="/github.css">
+    <style>.md-block {{ display: contents; }}</style>
+</head>
+<body>
+<div id="content" data-version="{version}">
+{''.join(blocks)}
+</div>
+<script>{PAGE_SCRIPT}</script>
+</body>
+</html>
+"""
+        self.send_body(page.encode('utf-8'), 'text/html; charset=utf-8', [('Cache-Control', 'no-store')])
+        
+    def send_stylesheet(self):
+        # The CSS never changes while the app runs, so let the browser keep it
+        if self.headers.get('If-None-Match') == self.preview.css_etag:
+            self.send_response(304)
+            self.send_header('ETag', self.preview.css_etag)
+            self.end_headers()
+            return
+        self.send_body(self.preview.css_bytes, 'text/css; charset=utf-8',
+                       [('ETag', self.preview.css_etag), ('Cache-Control', 'max-age=86400')])
+        
+    def stream_events(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        
+        client = self.preview.add_client()
+        try:
+            # A tab that fell behind (the page was served before the latest publish,
+            # or it reconnected after missing events) needs the full page again
+            last_seen = self.headers.get('Last-Event-ID') or parse_qs(urlsplit(self.path).query).get('v', [None])[0]
+            if last_seen is not None and last_seen != str(self.preview.version):
+                self.wfile.write(b'event: reload\ndata: {}\n\n')
+                self.wfile.flush()
+                
+            while True:
+                try:
+                    item = client.get(timeout=15)
+                except queue.Empty:
+                    # Keep-alive comment; also notices tabs that went away
+                    self.wfile.write(b': ping\n\n')
+                    self.wfile.flush()
+                    continue
+                if item is None:
+                    return
+                version, message = item
+                self.wfile.write(f"id: {version}\ndata: {message}\n\n".encode('utf-8'))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError):
+            pass
+        finally:
+            self.preview.remove_client(client)
+            
+    def log_message(self, format, *args):
+        # Keep the terminal quiet; the app reports status in its own status bar
+        pass
+
+
+class PreviewServer:
+    def __init__(self, host='127.0.0.1', port=0, css=GITHUB_CSS):
+        self.lock = threading.Lock()
+        self.blocks = []
+        self.version = 0
+        self.clients = set()
+        
+        self.css_bytes = css.encode('utf-8')
+        self.css_etag = f'"{content_hash(css)}"'
+        
+        handler = type('BoundPreviewRequestHandler', (PreviewRequestHandler,), {'preview': self})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.thread = None
+        
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+        
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name='preview-server', daemon=True)
+        self.thread.start()
+        return self
+        
+    def stop(self):
+        with self.lock:
+            for client in self.clients:
+                with client.mutex:
+                    client.queue.clear()
+                client.put_nowait(None)
+            self.clients.clear()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        
+    def client_count(self):
+        with self.lock:
+            return len(self.clients)
+            
+    def add_client(self):
+        client = queue.Queue(maxsize=64)
+        with self.lock:
+            self.clients.add(client)
+        return client
+        
+    def remove_client(self, client):
+        with self.lock:
+            self.clients.discard(client)
+            
+    def snapshot(self):
+        with self.lock:
+            return self.version, list(self.blocks)
+            
+    def publish(self, html):
+        # Sends connected tabs only the blocks that differ from the last publish
+        blocks = split_html_blocks(html)
+        with self.lock:
+            changes = diff_lines(self.blocks, blocks)
+            if not changes:
+                return False
+                
+            ops = [(old_start, old_end - old_start, blocks[new_start:new_end])
+                   for old_start, old_end, new_start, new_end in reversed(changes)]
+            message = json.dumps({'from': self.version, 'to': self.version + 1, 'ops': ops})
+            self.version += 1
+            self.blocks = blocks
+            
+            for client in list(self.clients):
+                try:
+                    client.put_nowait((self.version, message))
+                except queue.Full:
+                    # Too far behind to patch; it reloads when it reconnects
+                    self.clients.discard(client)
+                    with client.mutex:
+                        client.queue.clear()
+                    client.put_nowait(None)
+        return True
@@ -0,0 +1,159 @@
+import queue
+import threading
+import time
+from collections import deque
+
+from instrumentation import PERF
+
+
+class RenderJob:
+    def __init__(self, version, content, on_done, on_dropped=None):
+        self.version = version
+        self.content = content
+        self.on_done = on_done
+        self.on_dropped = on_dropped
+        self.submitted = time.perf_counter()
+        self.started = None
+        self.finished = None
+        
+    def age_ms(self):
+        return (time.perf_counter() - self.submitted) * 1000
+
+
+class RenderWorker:
+    # Runs markdown conversion off the Tk thread. Jobs carry the editor version
+    # they were taken from: a newer submission cancels anything still waiting,
+    # and results the editor has already moved past are thrown away. Finished
+    # jobs come back through a thread-safe queue that the Tk loop polls with after().
+    def __init__(self, root, render, current_version=None, use_processes=False, poll_interval=20):
+        self.root = root
+        self.render = render
+        self.current_version = current_version
+        self.poll_interval = poll_interval
+        
+        # With processes, render must be a picklable module-level function.
+        # multiprocessing is only imported when asked for; it is slow to load.
+        self.executor = None
+        if use_processes:
+            from concurrent.futures import ProcessPoolExecutor
+            self.executor = ProcessPoolExecutor(max_workers=1)
+        
+        self.pending = deque()
+        self.condition = threading.Condition()
+        self.results = queue.Queue()
+        self.in_flight = None
+        self.latest_version = -1
+        self.latest_job = None
+        self.poll_id = None
+        self.running = True
+        
+        self.completed = 0
+        self.dropped = 0
+        self.last_render_ms = 0.0
+        
+        self.thread = threading.Thread(target=self._work, name='render-worker', daemon=True)
+        self.thread.start()
+        
+    def submit(self, version, content, on_done, on_dropped=None):
+        job = RenderJob(version, content, on_done, on_dropped)
+        with self.condition:
+            # Anything still waiting is already out of date
+            while self.pending:
+                self._drop(self.pending.popleft(), superseded=True)
+            self.pending.append(job)
+            self.latest_version = max(self.latest_version, version)
+            self.latest_job = job
+            self.condition.notify()
+            
+        self._start_polling()
+        return job
+        
+    def stats(self):
+        with self.condition:
+            latest = self.latest_job
+            return {
+                'queue_length': len(self.pending) + (1 if self.in_flight else 0),
+                'latest_version': self.latest_version,
+                'latest_job_age_ms': latest.age_ms() if latest and latest.finished is None else 0.0,
+                'completed': self.completed,
+                'dropped': self.dropped,
+                'last_render_ms': self.last_render_ms
+            }
+            
+    def shutdown(self):
+        with self.condition:
+            self.running = False
+            self.pending.clear()
+            self.condition.notify()
+            
+        if self.poll_id is not None:
+            self.root.after_cancel(self.poll_id)
+            self.poll_id = None
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            
+    def _work(self):
+        while True:
+            with self.condition:
+                while self.running and not self.pending:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                job = self.pending.popleft()
+                self.in_flight = job
+                
+            job.started = time.perf_counter()
+            try:
+                if self.executor is not None:
+                    result = self.executor.submit(self.render, job.content).result()
+                else:
+                    result = self.render(job.content)
+                error = None
+            except Exception as e:
+                result, error = None, e
+            job.finished = time.perf_counter()
+            if PERF.enabled:
+                PERF.record('render.markdown', (job.finished - job.started) * 1000, {'chars': len(job.content)})
+            
+            with self.condition:
+                # Queue the result before clearing in_flight so the poller never sees an idle gap
+                self.results.put((job, result, error))
+                self.in_flight = None
+                self.last_render_ms = (job.finished - job.started) * 1000
+                
+    def _drop(self, job, superseded=False):
+        # Called with the condition held or from the Tk thread
+        self.dropped += 1
+        if not superseded and job.on_dropped:
+            job.on_dropped(job)
+            
+    def _is_stale(self, job):
+        if job.version < self.latest_version:
+            return True
+        return self.current_version is not None and job.version < self.current_version()
+        
+    def _start_polling(self):
+        if self.poll_id is None:
+            self.poll_id = self.root.after(self.poll_interval, self._poll)
+            
+    def _poll(self):
+        self.poll_id = None
+        while True:
+            try:
+                job, result, error = self.results.get_nowait()
+            except queue.Empty:
+                break
+                
+            if job.version < self.latest_version:
+                self._drop(job, superseded=True)
+            elif self._is_stale(job):
+                self._drop(job)
+            else:
+                self.completed += 1
+                job.on_done(job, result, error)
+                
+        # Keep polling only while there is work outstanding
+        with self.condition:
+            busy = bool(self.pending) or self.in_flight is not None
+        if busy or not self.results.empty():
+            self._start_polling()
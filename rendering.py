@@ -0,0 +1,280 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+# GitHub-style CSS shared by the browser preview and the headless renderer
+GITHUB_CSS = """
+body {
+    font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", "Noto Sans", Helvetica, Arial, sans-serif;
+    font-size: 16px;
+    line-height: 1.5;
+    color: #24292f;
+    background-color: #ffffff;
+    max-width: 1012px;
+    margin: 0 auto;
+    padding: 45px;
+    box-sizing: border-box;
+}
+
+h1, h2, h3, h4, h5, h6 {
+    margin-top: 24px;
+    margin-bottom: 16px;
+    font-weight: 600;
+    line-height: 1.25;
+}
+
+h1 {
+    font-size: 2em;
+    border-bottom: 1px solid #d0d7de;
+    padding-bottom: 0.3em;
+    margin-top: 0;
+}
+
+h2 {
+    font-size: 1.5em;
+    border-bottom: 1px solid #d0d7de;
+    padding-bottom: 0.3em;
+}
+
+h3 { font-size: 1.25em; }
+h4 { font-size: 1em; }
+h5 { font-size: 0.875em; }
+h6 {
+    font-size: 0.85em;
+    color: #656d76;
+}
+
+p { margin-top: 0; margin-bottom: 16px; }
+
+code {
+    background-color: #f6f8fa;
+    border-radius: 6px;
+    font-size: 85%;
+    margin: 0;
+    padding: 0.2em 0.4em;
+    font-family: ui-monospace, SFMono-Regular, "SF Mono", Consolas, "Liberation Mono", Menlo, monospace;
+}
+
+pre {
+    background-color: #f6f8fa;
+    border-radius: 6px;
+    font-size: 85%;
+    line-height: 1.45;
+    overflow: auto;
+    padding: 16px;
+    margin-top: 0;
+    margin-bottom: 16px;
+}
+
+pre code {
+    background-color: transparent;
+    border: 0;
+    display: inline;
+    line-height: inherit;
+    margin: 0;
+    overflow: visible;
+    padding: 0;
+    word-wrap: normal;
+}
+
+blockquote {
+    border-left: 0.25em solid #d0d7de;
+    color: #656d76;
+    margin: 0;
+    padding: 0 1em;
+}
+
+ul, ol {
+    margin-top: 0;
+    margin-bottom: 16px;
+    padding-left: 2em;
+}
+
+li + li { margin-top: 0.25em; }
+
+table {
+    border-spacing: 0;
+    border-collapse: collapse;
+    display: block;
+    width: max-content;
+    max-width: 100%;
+    overflow: auto;
+    margin-top: 0;
+    margin-bottom: 16px;
+}
+
+th, td {
+    padding: 6px 13px;
+    border: 1px solid #d0d7de;
+}
+
+th {
+    background-color: #f6f8fa;
+    font-weight: 600;
+}
+
+tr:nth-child(2n) {
+    background-color: #f6f8fa;
+}
+
+img {
+    max-width: 100%;
+    height: auto;
+    box-sizing: content-box;
+    background-color: #ffffff;
+}
+
+a {
+    color: #0969da;
+    text-decoration: none;
+}
+
+a:hover {
+    text-decoration: underline;
+}
+
+strong { font-weight: 600; }
+
+hr {
+    height: 0.25em;
+    padding: 0;
+    margin: 24px 0;
+    background-color: #d0d7de;
+    border: 0;
+}
+
+/* Badge styling */
+img[src*="shields.io"] {
+    display: inline-block;
+    margin: 2px;
+}
+"""
+
+
+# Converter settings live here and nowhere else, so the live preview, the
+# browser page and the headless renderer all produce the same HTML
+MARKDOWN_PROFILES = {
+    'github': {
+        'extensions': [
+            'fenced_code',
+            'tables',
+            'toc',
+            'codehilite',
+            'nl2br',
+            'attr_list'
+        ],
+        'extension_configs': {
+            'codehilite': {
+                'css_class': 'highlight',
+                'use_pygments': False
+            }
+        }
+    }
+}
+
+# One configured markdown.Markdown per thread and profile. Building one loads
+# every extension, which costs far more than converting a typical README.
+# Worker processes get their own copy of this module, so this also covers them.
+# markdown itself is imported on first use, keeping it off the GUI's startup path.
+_converters = threading.local()
+
+
+def get_converter(profile='github'):
+    converters = getattr(_converters, 'by_profile', None)
+    if converters is None:
+        converters = _converters.by_profile = {}
+        
+    converter = converters.get(profile)
+    if converter is None:
+        import markdown
+        converter = converters[profile] = markdown.Markdown(**MARKDOWN_PROFILES[profile])
+    return converter
+
+
+def convert_markdown(markdown_content, profile='github'):
+    converter = get_converter(profile)
+    try:
+        return converter.convert(markdown_content)
+    finally:
+        # Clears per-document state (toc, footnotes, stashed html) for the next caller
+        converter.reset()
+
+
+def convert_github_markdown(markdown_content):
+    # Convert markdown to HTML with GitHub extensions
+    return convert_markdown(markdown_content, 'github')
+
+
+def profile_fingerprint(profile='github'):
+    # Changes whenever the converter settings or the markdown version do
+    import markdown
+    settings = json.dumps(MARKDOWN_PROFILES[profile], sort_keys=True)
+    return content_hash(settings, f"{profile}:{markdown.__version__}")
+
+
+def build_html_page(html, title='README Preview', css=GITHUB_CSS, stylesheet=None):
+    # Standalone GitHub-styled page; pass stylesheet to link a shared CSS file instead of inlining it
+    if stylesheet:
+        style = f'<link rel="stylesheet" href="{stylesheet}">'
+    else:
+        style = f'<style>{css}</style>'
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <title>{title}</title>
+    {style}
+</head>
+<body>
+{html}
+</body>
+</html>
+"""
+
+
+def content_hash(markdown_content, profile=''):
+    # Profile is part of the key so different converter settings never share entries
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(profile.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(markdown_content.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class RenderCache:
+    # Bounded LRU of rendered HTML keyed by the hash of the markdown source, so
+    # rendering unchanged text again is a dictionary lookup
+    def __init__(self, max_entries=16):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        
+    def get(self, markdown_content, profile=''):
+        key = content_hash(markdown_content, profile)
+        html = self.entries.get(key)
+        if html is None:
+            self.misses += 1
+            return None
+            
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return html
+        
+    def put(self, markdown_content, html, profile=''):
+        self.entries[content_hash(markdown_content, profile)] = html
+        
+        # Evict the least recently used render
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            
+    def get_or_render(self, markdown_content, render, profile=''):
+        html = self.get(markdown_content, profile)
+        if html is None:
+            html = render(markdown_content)
+            self.put(markdown_content, html, profile)
+        return html
+        
+    def clear(self):
+        self.entries.clear()
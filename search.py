@@ -0,0 +1,221 @@
+import re
+import time
+
+from preview import diff_lines
+
+# Find/replace for large documents. Matches are found line by line in short
+# time slices between Tk events, kept in a per-line index that edits only
+# invalidate where they happen, and highlighted with one tag_add per slice.
+
+MATCH_TAG = 'search_match'
+CURRENT_TAG = 'search_current'
+
+
+def compile_pattern(text, regex=False, match_case=False):
+    # Raises ValueError for an invalid regular expression
+    flags = 0 if match_case else re.IGNORECASE
+    try:
+        return re.compile(text if regex else re.escape(text), flags)
+    except re.error as e:
+        raise ValueError(f"Invalid pattern: {e}") from None
+
+
+def _map_position(position, changes):
+    # Where a line position before the changes ends up after them
+    shift = 0
+    for old_start, old_end, new_start, new_end in changes:
+        if position < old_start:
+            break
+        if position < old_end:
+            return new_start
+        shift = new_end - old_end
+    return position + shift
+
+
+class SearchIndex:
+    def __init__(self, pattern, lines):
+        self.pattern = pattern
+        self.lines = lines
+        # Per line: [(start, end), ...] column spans, or None until scanned
+        self.line_matches = [None] * len(lines)
+        # Sorted, non-overlapping [start, end) line ranges waiting to be scanned
+        self.dirty = [(0, len(lines))] if lines else []
+        self.match_count = 0
+        
+    @property
+    def done(self):
+        return not self.dirty
+        
+    def update(self, lines, changes=None, base=None):
+        # Follows an edit: changed lines lose their matches and are queued for a rescan
+        if changes is None or base is not self.lines:
+            changes = diff_lines(self.lines, lines)
+        self.lines = lines
+        if not changes:
+            return
+            
+        dirty = [(_map_position(start, changes), _map_position(end, changes)) for start, end in self.dirty]
+        for old_start, old_end, new_start, new_end in reversed(changes):
+            removed = self.line_matches[old_start:old_end]
+            self.match_count -= sum(len(spans) for spans in removed if spans)
+            self.line_matches[old_start:old_end] = [None] * (new_end - new_start)
+            dirty.append((new_start, new_end))
+        self.dirty = self._merge(dirty)
+        
+    def scan(self, deadline, batch=256):
+        # Scans queued lines until the deadline; returns the [start, end) ranges done
+        scanned = []
+        finditer = self.pattern.finditer
+        while self.dirty and time.perf_counter() < deadline:
+            start, end = self.dirty[0]
+            stop = min(end, start + batch)
+            for line_num in range(start, stop):
+                self._scan_line(line_num, finditer)
+            scanned.append((start, stop))
+            if stop == end:
+                self.dirty.pop(0)
+            else:
+                self.dirty[0] = (stop, end)
+        return scanned
+        
+    def matches_on(self, line_num):
+        # Scans the line right away if the background scan hasn't got there yet
+        spans = self.line_matches[line_num]
+        if spans is None:
+            spans = self._scan_line(line_num, self.pattern.finditer)
+        return spans
+        
+    def find_next(self, line_num, column, backwards=False):
+        # (line, start, end) of the nearest match after (or before) the position, wrapping around
+        line_count = len(self.lines)
+        if not line_count:
+            return None
+        line_num = min(max(line_num, 0), line_count - 1)
+        for step in range(line_count + 1):
+            if backwards:
+                current = (line_num - step) % line_count
+                spans = [span for span in self.matches_on(current) if step or span[0] < column]
+                if spans:
+                    return (current,) + spans[-1]
+            else:
+                current = (line_num + step) % line_count
+                spans = [span for span in self.matches_on(current) if step or span[0] >= column]
+                if spans:
+                    return (current,) + spans[0]
+        return None
+        
+    def is_match(self, line_num, start, end):
+        return 0 <= line_num < len(self.lines) and (start, end) in self.matches_on(line_num)
+        
+    def replacement_for(self, line_num, start, replacement, regex=False):
+        # The text that replaces the match at (line_num, start); regex replacements may use \1 and \g<name>
+        if not regex:
+            return replacement
+        try:
+            return self.pattern.match(self.lines[line_num], start).expand(replacement)
+        except (re.error, IndexError) as e:
+            raise ValueError(f"Invalid replacement: {e}") from None
+            
+    def replace_all(self, replacement, regex=False):
+        # (first_line, last_line, new_lines, count) covering every line with a match,
+        # so the editor can apply them as one edit; None if nothing matches
+        if not regex:
+            replacement = replacement.replace('\\', '\\\\')
+        subn = self.pattern.subn
+        first = last = None
+        new_lines = []
+        total = 0
+        for line_num, line in enumerate(self.lines):
+            try:
+                new_line, count = subn(replacement, line)
+            except (re.error, IndexError) as e:
+                raise ValueError(f"Invalid replacement: {e}") from None
+            if count:
+                if first is None:
+                    first = line_num
+                last = line_num
+                total += count
+            if first is not None:
+                new_lines.append(new_line)
+        if first is None:
+            return None
+        return first, last, new_lines[:last - first + 1], total
+        
+    def _scan_line(self, line_num, finditer):
+        # Empty matches (like ^ or a*) can't be highlighted or stepped through, so they're skipped
+        spans = [match.span() for match in finditer(self.lines[line_num]) if match.end() > match.start()]
+        previous = self.line_matches[line_num]
+        if previous:
+            self.match_count -= len(previous)
+        self.line_matches[line_num] = spans
+        self.match_count += len(spans)
+        return spans
+        
+    def _merge(self, ranges):
+        merged = []
+        for start, end in sorted(ranges):
+            if start >= end:
+                continue
+            if merged and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(end, merged[-1][1]))
+            else:
+                merged.append((start, end))
+        return merged
+
+
+class BackgroundSearch:
+    # Drives a SearchIndex from the Tk event loop: each tick scans for at most
+    # slice_ms, then re-tags just the lines it scanned with one tag_remove and
+    # one multi-range tag_add, and yields back to the event loop
+    def __init__(self, widget, on_progress=None, slice_ms=8):
+        self.widget = widget
+        self.on_progress = on_progress
+        self.slice_ms = slice_ms
+        self.index = None
+        self.after_id = None
+        
+    def start(self, pattern, lines):
+        self.stop()
+        self.index = SearchIndex(pattern, lines)
+        self._schedule()
+        
+    def stop(self):
+        if self.after_id is not None:
+            self.widget.after_cancel(self.after_id)
+            self.after_id = None
+        self.index = None
+        self.widget.tag_remove(MATCH_TAG, '1.0', 'end')
+        self.widget.tag_remove(CURRENT_TAG, '1.0', 'end')
+        
+    def follow(self, lines, changes=None, base=None):
+        if self.index is None:
+            return
+        self.index.update(lines, changes, base)
+        self._schedule()
+        
+    def _schedule(self):
+        if self.after_id is None and not self.index.done:
+            self.after_id = self.widget.after(1, self._tick)
+        if self.on_progress:
+            self.on_progress(self.index)
+            
+    def _tick(self):
+        self.after_id = None
+        if self.index is None:
+            return
+            
+        scanned = self.index.scan(time.perf_counter() + self.slice_ms / 1000)
+        ranges = []
+        for start, end in scanned:
+            self.widget.tag_remove(MATCH_TAG, f"{start + 1}.0", f"{end + 1}.0")
+            for line_num in range(start, end):
+                for column_start, column_end in self.index.line_matches[line_num]:
+                    ranges.append(f"{line_num + 1}.{column_start}")
+                    ranges.append(f"{line_num + 1}.{column_end}")
+        if ranges:
+            self.widget.tag_add(MATCH_TAG, *ranges)
+            
+        if self.on_progress:
+            self.on_progress(self.index)
+        if not self.index.done:
+            self.after_id = self.widget.after(1, self._tick)
@@ -0,0 +1,205 @@
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+
+from rendering import GITHUB_CSS, build_html_page, content_hash, convert_github_markdown, profile_fingerprint
+
+# Incremental static-site export: a folder of READMEs and docs becomes a tree
+# of GitHub-styled pages sharing one stylesheet. A manifest in the output
+# directory remembers what each page was built from, so re-runs only rebuild
+# pages whose source (or the converter settings) changed.
+
+MARKDOWN_EXTENSIONS = ('.md', '.markdown')
+MANIFEST_FILE = '.site-manifest.json'
+STYLESHEET_PATH = 'assets/github.css'
+
+# Bump when the page layout changes so every page is rebuilt
+PAGE_LAYOUT_VERSION = 1
+
+_LOCAL_MARKDOWN_LINK = re.compile(r'href="(?![a-z][a-z0-9+.-]*:|//|#)([^"#?]+?)\.(?:md|markdown)([#?][^"]*)?"', re.I)
+_FIRST_HEADING = re.compile(r'^#\s+(.+?)\s*#*\s*$', re.M)
+
+
+def find_markdown_files(paths):
+    # Expands directories into the markdown files below them, in a stable order
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, dirnames, filenames in os.walk(path):
+                dirnames[:] = sorted(d for d in dirnames if not d.startswith('.'))
+                for filename in sorted(filenames):
+                    if filename.lower().endswith(MARKDOWN_EXTENSIONS):
+                        yield os.path.join(dirpath, filename)
+        elif os.path.isfile(path):
+            yield path
+        else:
+            print(f"warning: {path} not found", file=sys.stderr)
+
+
+def write_atomic(path, data, fsync=False):
+    # Write to a temp file in the same directory, then rename over the target,
+    # so readers never see a half-written file. fsync=True also makes the
+    # bytes durable before the rename, for files that must survive a crash.
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+        
+    handle, temp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(path), suffix='.tmp')
+    try:
+        with os.fdopen(handle, 'wb') as file:
+            file.write(data)
+            if fsync:
+                file.flush()
+                os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def site_config_hash():
+    # Everything besides the source text that affects a page's bytes
+    return content_hash(GITHUB_CSS, f"{profile_fingerprint('github')}:{PAGE_LAYOUT_VERSION}")
+
+
+def page_path_for(relative_source):
+    # README.md becomes the directory's index.html, other pages keep their name
+    directory, filename = os.path.split(relative_source)
+    stem = os.path.splitext(filename)[0]
+    page = 'index.html' if stem.lower() == 'readme' else stem + '.html'
+    return os.path.join(directory, page)
+
+
+def rewrite_markdown_links(html):
+    # Relative links to other markdown files point at their generated pages
+    def replace(match):
+        target = match.group(1)
+        suffix = match.group(2) or ''
+        if os.path.basename(target).lower() == 'readme':
+            page = os.path.join(os.path.dirname(target), 'index').replace(os.sep, '/')
+        else:
+            page = target
+        return f'href="{page}.html{suffix}"'
+    return _LOCAL_MARKDOWN_LINK.sub(replace, html)
+
+
+def build_page(source, target, stylesheet_href):
+    # Runs in a worker process. Errors are returned so one bad page doesn't stop the build.
+    started = time.perf_counter()
+    try:
+        with open(source, 'r', encoding='utf-8') as file:
+            content = file.read()
+            
+        heading = _FIRST_HEADING.search(content)
+        title = heading.group(1) if heading else os.path.basename(source)
+        
+        html = rewrite_markdown_links(convert_github_markdown(content))
+        write_atomic(target, build_html_page(html, title=title, stylesheet=stylesheet_href))
+    except Exception as e:
+        return (time.perf_counter() - started) * 1000, str(e)
+    return (time.perf_counter() - started) * 1000, None
+
+
+def load_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST_FILE), 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+class SiteReport:
+    def __init__(self):
+        self.rebuilt = []
+        self.skipped = []
+        self.removed = []
+        self.failed = []
+        self.elapsed_ms = 0.0
+        
+    def summary(self):
+        return (f"rebuilt {len(self.rebuilt)}, skipped {len(self.skipped)}, removed {len(self.removed)}, "
+                f"failed {len(self.failed)} in {self.elapsed_ms:.1f}ms")
+
+
+def build_site(source_dir, output_dir, jobs=None, force=False, on_page=None):
+    started = time.perf_counter()
+    report = SiteReport()
+    
+    manifest = load_manifest(output_dir)
+    config_hash = site_config_hash()
+    if manifest.get('config') != config_hash:
+        # New converter settings or CSS: nothing built before can be trusted
+        force = True
+    old_pages = manifest.get('pages', {})
+    
+    # The stylesheet is shared by every page and only rewritten when it changes
+    stylesheet = os.path.join(output_dir, STYLESHEET_PATH)
+    if force or not os.path.exists(stylesheet):
+        write_atomic(stylesheet, GITHUB_CSS)
+        
+    pages = {}
+    work = []
+    for source in find_markdown_files([source_dir]):
+        relative_source = os.path.relpath(source, source_dir)
+        relative_page = page_path_for(relative_source)
+        target = os.path.join(output_dir, relative_page)
+        
+        with open(source, 'rb') as file:
+            source_hash = content_hash(file.read().decode('utf-8', errors='replace'))
+            
+        pages[relative_source] = {'hash': source_hash, 'output': relative_page.replace(os.sep, '/')}
+        previous = old_pages.get(relative_source)
+        if not force and previous == pages[relative_source] and os.path.exists(target):
+            report.skipped.append(relative_source)
+            continue
+            
+        depth = relative_page.count(os.sep)
+        stylesheet_href = '../' * depth + STYLESHEET_PATH
+        work.append((relative_source, source, target, stylesheet_href))
+        
+    if work:
+        workers = jobs or os.cpu_count() or 1
+        if workers == 1 or len(work) == 1:
+            results = map(build_page, *zip(*[item[1:] for item in work]))
+            executor = None
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            executor = ProcessPoolExecutor(max_workers=workers)
+            chunk_size = max(1, len(work) // (workers * 4))
+            results = executor.map(build_page, *zip(*[item[1:] for item in work]), chunksize=chunk_size)
+            
+        try:
+            for (relative_source, source, target, _), (elapsed, error) in zip(work, results):
+                if error is not None:
+                    report.failed.append((relative_source, error))
+                    # Forget the page so the next run tries again
+                    pages.pop(relative_source, None)
+                else:
+                    report.rebuilt.append(relative_source)
+                if on_page:
+                    on_page(relative_source, target, elapsed, error)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+                
+    # Pages whose source disappeared since the last build
+    current_outputs = {entry['output'] for entry in pages.values()}
+    for relative_source, entry in old_pages.items():
+        if relative_source not in pages and entry.get('output') not in current_outputs:
+            try:
+                os.remove(os.path.join(output_dir, entry['output']))
+                report.removed.append(relative_source)
+            except OSError:
+                pass
+                
+    write_atomic(os.path.join(output_dir, MANIFEST_FILE),
+                 json.dumps({'config': config_hash, 'pages': pages}, indent=1, sort_keys=True))
+    
+    report.elapsed_ms = (time.perf_counter() - started) * 1000
+    return report
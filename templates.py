@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import re
+from collections import OrderedDict
+
+# README templates are plain markdown files with {{ placeholders }}:
+#
+#   {{ title }}                       a project_info field
+#   {{ slug }}                        the title as a repo name ("My App" -> "my-app")
+#   {{ contact or "fallback text" }}  a field with a default for empty values
+#
+# The built-in templates live in templates/ next to this file; files in the
+# user template directory are added to them and win on name clashes.
+
+BUILTIN_TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+USER_TEMPLATE_DIR = os.path.join(os.path.expanduser('~'), '.readme-generator', 'templates')
+TEMPLATE_EXTENSIONS = ('.md', '.markdown', '.txt')
+
+_PLACEHOLDER = re.compile(r'\{\{\s*(\w+)(?:\s+or\s+"([^"]*)")?\s*\}\}')
+
+
+def template_context(project_info):
+    # Values derived from project_info are computed once per render, not per use
+    context = dict(project_info)
+    context['slug'] = project_info.get('title', '').lower().replace(' ', '-')
+    return context
+
+
+class TemplateEntry:
+    def __init__(self, name, path, mtime_ns, size):
+        self.name = name
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        
+    @property
+    def title(self):
+        return self.name.replace('-', ' ').replace('_', ' ').title()
+        
+    @property
+    def version(self):
+        # Changes whenever the file is edited
+        return (self.path, self.mtime_ns, self.size)
+
+
+class CompiledTemplate:
+    # A template parsed once into (literal, field, fallback) steps
+    def __init__(self, source):
+        self.steps = []
+        position = 0
+        for match in _PLACEHOLDER.finditer(source):
+            self.steps.append((source[position:match.start()], match.group(1), match.group(2)))
+            position = match.end()
+        self.tail = source[position:]
+        
+    def render(self, context):
+        parts = []
+        for literal, field, fallback in self.steps:
+            parts.append(literal)
+            value = context.get(field)
+            if not value and fallback is not None:
+                value = fallback
+            parts.append('' if value is None else str(value))
+        parts.append(self.tail)
+        return ''.join(parts)
+
+
+class TemplateLibrary:
+    def __init__(self, directories=(BUILTIN_TEMPLATE_DIR, USER_TEMPLATE_DIR), max_rendered=64):
+        self.directories = directories
+        self.max_rendered = max_rendered
+        
+        self.index_key = None
+        self.entries = OrderedDict()
+        self.compiled = {}
+        self.rendered = OrderedDict()
+        
+    def index(self):
+        # One scandir per directory and no file reads, re-done only when a
+        # directory's mtime changes, so even hundreds of templates list instantly
+        key = tuple(self._directory_mtime(directory) for directory in self.directories)
+        if key == self.index_key:
+            return list(self.entries.values())
+            
+        entries = {}
+        for directory in self.directories:
+            try:
+                scanned = list(os.scandir(directory))
+            except OSError:
+                continue
+            for item in scanned:
+                name, extension = os.path.splitext(item.name)
+                if extension.lower() not in TEMPLATE_EXTENSIONS or not item.is_file():
+                    continue
+                stat = item.stat()
+                # Later directories (the user's) override earlier ones
+                entries[name] = TemplateEntry(name, item.path, stat.st_mtime_ns, stat.st_size)
+                
+        self.entries = OrderedDict(sorted(entries.items()))
+        self.index_key = key
+        return list(self.entries.values())
+        
+    def names(self):
+        return [entry.name for entry in self.index()]
+        
+    def get(self, name):
+        entry = self._entry(name)
+        try:
+            stat = os.stat(entry.path)
+        except OSError:
+            # Deleted since the index was built
+            self.index_key = None
+            entry = self._entry(name)
+            stat = os.stat(entry.path)
+        entry.mtime_ns, entry.size = stat.st_mtime_ns, stat.st_size
+        
+        cached = self.compiled.get(entry.path)
+        if cached is not None and cached[0] == entry.version:
+            return cached[1]
+            
+        with open(entry.path, 'r', encoding='utf-8') as file:
+            template = CompiledTemplate(file.read())
+        self.compiled[entry.path] = (entry.version, template)
+        return template
+        
+    def render(self, name, project_info):
+        template = self.get(name)
+        info_hash = hashlib.blake2b(json.dumps(project_info, sort_keys=True, default=str).encode('utf-8'),
+                                    digest_size=16).hexdigest()
+        key = (self.entries[name].version, info_hash)
+        
+        text = self.rendered.get(key)
+        if text is not None:
+            self.rendered.move_to_end(key)
+            return text
+            
+        text = template.render(template_context(project_info))
+        self.rendered[key] = text
+        while len(self.rendered) > self.max_rendered:
+            self.rendered.popitem(last=False)
+        return text
+        
+    def _entry(self, name):
+        self.index()
+        try:
+            return self.entries[name]
+        except KeyError:
+            raise KeyError(f"Unknown template: {name}") from None
+            
+    def _directory_mtime(self, directory):
+        try:
+            return os.stat(directory).st_mtime_ns
+        except OSError:
+            return None
@@ -0,0 +1,191 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from autosave import (SNAPSHOT_FILE, Autosave, discard_session, list_segments, list_sessions,
+                      recover, recover_orphans, segment_name)
+from preview import diff_lines
+
+# Autosave journals in a temp directory. close(discard=False) lets go of a
+# session the way a crash would, minus the kill, so recover() sees exactly
+# what a crashed instance leaves on disk.
+
+# Starts a session in the autosave root given as argv[1], journals one edit and
+# then waits to be killed
+LOCK_HOLDER = f"""
+import sys, time
+sys.path.insert(0, {ROOT!r})
+from autosave import Autosave
+autosave = Autosave(root=sys.argv[1]).start()
+autosave.record(None, ['held', ''], None)
+autosave.flush()
+print(autosave.directory, flush=True)
+time.sleep(60)
+"""
+
+
+class AutosaveTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+        
+    def start(self, **options):
+        options.setdefault('flush_interval', 0.05)
+        return Autosave(root=self.root, **options).start()
+        
+    def journal(self, autosave, versions):
+        # Records each version as an edit of the one before, the way the preview reports them
+        lines = autosave.lines
+        for version in versions:
+            autosave.record(lines, version, diff_lines(lines, version))
+            lines = version
+        return lines
+        
+    def segment_path(self, directory):
+        return os.path.join(directory, list_segments(directory)[-1])
+        
+    def test_replay(self):
+        autosave = self.start()
+        lines = self.journal(autosave, [
+            ['# Title', ''],
+            ['# Title', 'Intro', ''],
+            ['# Title', 'Intro', '## Usage', 'run it', ''],
+            ['# Renamed', 'Intro', 'run it', 'é and ✓', ''],
+        ])
+        autosave.close(discard=False)
+        self.assertEqual(recover(autosave.directory), (lines, 4))
+        
+    def test_full_replace_when_base_unknown(self):
+        autosave = self.start()
+        self.journal(autosave, [['a', ''], ['a', 'b', '']])
+        
+        # The preview rebuilt from scratch: the journal writes the whole text
+        autosave.record([], ['fresh', ''], None)
+        autosave.close(discard=False)
+        self.assertEqual(recover(autosave.directory), (['fresh', ''], 3))
+        
+    def test_nothing_to_recover(self):
+        autosave = self.start()
+        autosave.close(discard=False)
+        self.assertIsNone(recover(autosave.directory))
+        
+    def test_torn_record(self):
+        autosave = self.start()
+        self.journal(autosave, [['one', ''], ['one', 'two', ''], ['one', 'two', 'three', '']])
+        autosave.close(discard=False)
+        
+        # A crash in the middle of the last write
+        path = self.segment_path(autosave.directory)
+        with open(path, 'rb') as file:
+            data = file.read()
+        with open(path, 'wb') as file:
+            file.write(data[:-7])
+        self.assertEqual(recover(autosave.directory), (['one', 'two', ''], 2))
+        
+    def test_gap_stops_replay(self):
+        autosave = self.start()
+        self.journal(autosave, [['one', ''], ['one', 'two', '']])
+        autosave.close(discard=False)
+        
+        with open(self.segment_path(autosave.directory), 'ab') as file:
+            file.write(b'{"seq": 5, "ops": [[0, 0, ["late"]]], "count": 4}\n')
+        self.assertEqual(recover(autosave.directory), (['one', 'two', ''], 2))
+        
+    def test_compaction(self):
+        autosave = self.start(compact_bytes=200)
+        versions = [[f"line {number}" for number in range(count)] + [''] for count in range(1, 40)]
+        lines = self.journal(autosave, versions)
+        directory = autosave.directory
+        autosave.close(discard=False)
+        
+        # The snapshot took over the first segments, and new edits went to newer ones
+        self.assertTrue(os.path.exists(os.path.join(directory, SNAPSHOT_FILE)))
+        self.assertNotIn(segment_name(1), list_segments(directory))
+        with open(os.path.join(directory, SNAPSHOT_FILE), 'r', encoding='utf-8') as file:
+            snapshot_seq = json.load(file)['seq']
+        self.assertTrue(all(name >= segment_name(snapshot_seq + 1) for name in list_segments(directory)))
+        
+        recovered, replayed = recover(directory)
+        self.assertEqual(recovered, lines)
+        self.assertEqual(replayed, len(versions) - snapshot_seq)
+        
+        # A crash after the snapshot but before the old segments were deleted
+        # replays the same text: records the snapshot covers are skipped
+        with open(os.path.join(directory, segment_name(1)), 'wb') as file:
+            file.write(b'{"seq": 1, "ops": [[0, 0, ["stale"]]], "count": 99}\n')
+        self.assertEqual(recover(directory), (lines, replayed))
+        
+    def test_clean_close_discards(self):
+        autosave = self.start()
+        self.journal(autosave, [['gone', '']])
+        autosave.close()
+        self.assertFalse(os.path.exists(autosave.directory))
+        self.assertEqual(list_sessions(self.root), [])
+        
+    def test_orphans_of_own_process_locked(self):
+        # Every tab's session is locked while it runs
+        first, second = self.start(), self.start()
+        self.journal(first, [['first', '']])
+        self.journal(second, [['second', '']])
+        self.assertEqual(recover_orphans(self.root), [])
+        
+        first.close(discard=False)
+        second.close(discard=False)
+        orphans = recover_orphans(self.root)
+        self.assertEqual(sorted(orphan[2] for orphan in orphans), [['first', ''], ['second', '']])
+        for directory, lock, _, _ in orphans:
+            discard_session(directory, lock)
+        self.assertEqual(list_sessions(self.root), [])
+        
+    def test_orphan_detected_by_lock(self):
+        holder = subprocess.Popen([sys.executable, '-c', LOCK_HOLDER, self.root],
+                                  stdout=subprocess.PIPE, text=True)
+        try:
+            directory = holder.stdout.readline().strip()
+            self.assertTrue(os.path.isdir(directory))
+            
+            # A live instance's journal is neither offered nor cleared
+            self.assertEqual(recover_orphans(self.root), [])
+            self.assertEqual(list_sessions(self.root), [directory])
+        finally:
+            holder.kill()
+            holder.wait()
+            holder.stdout.close()
+            
+        # Killed, its lock is gone and the journal is recovered exactly once
+        orphans = recover_orphans(self.root)
+        self.assertEqual([orphan[:1] + orphan[2:] for orphan in orphans], [(directory, ['held', ''], 1)])
+        self.assertEqual(recover_orphans(self.root), [])
+        discard_session(directory, orphans[0][1])
+        
+    def test_empty_orphan_cleared(self):
+        autosave = self.start()
+        autosave.close(discard=False)
+        self.assertEqual(recover_orphans(self.root), [])
+        self.assertEqual(list_sessions(self.root), [])
+        
+    def test_import_is_light(self):
+        # Startup imports autosave; tempfile and shutil wait until a session starts or goes
+        code = "import sys, autosave; print(sorted({'tempfile', 'shutil'} & set(sys.modules)))"
+        output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+        self.assertEqual(output.stdout.strip(), '[]')
+        
+    def test_session_removed_while_listing(self):
+        autosave = self.start()
+        with mock.patch('os.path.getmtime', side_effect=FileNotFoundError):
+            self.assertEqual(list_sessions(self.root), [])
+        autosave.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
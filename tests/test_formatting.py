@@ -0,0 +1,95 @@
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from formatting import Span, classify_line, scan_inline
+from bench_inline import SAMPLE_LINES, legacy_format_line, scanner_format_line
+from corpus import KINDS, generate
+
+
+def spans(line):
+    return [tuple(span) for span in scan_inline(line)]
+
+
+class ScanInlineTest(unittest.TestCase):
+    def test_no_markers(self):
+        self.assertEqual(scan_inline("Plain words only."), [])
+        self.assertEqual(scan_inline(""), [])
+        
+    def test_returns_spans(self):
+        self.assertEqual(scan_inline("**a**"), [Span('bold', 0, 5)])
+        
+    def test_markers_inside_code_ignored(self):
+        self.assertEqual(spans("`a *b* __c__ [d](e)`"), [('code', 0, 20)])
+        self.assertEqual(spans("*a* `*b*`"), [('italic', 0, 3), ('code', 4, 9)])
+        self.assertEqual(spans("**a `*x*` b**"), [('bold', 0, 13), ('code', 4, 9)])
+        
+    def test_bold_and_italic_nest(self):
+        self.assertEqual(spans("**bold *it* x**"), [('bold', 0, 15), ('italic', 7, 11)])
+        self.assertEqual(spans("_a **b** c_"), [('italic', 0, 11), ('bold', 3, 8)])
+        self.assertEqual(spans("__x__ and **y**"), [('bold', 0, 5), ('bold', 10, 15)])
+        
+    def test_link_contains_emphasis(self):
+        # Link text is scanned again; the URL never is
+        self.assertEqual(spans("[**Docs** and _more_](http://x/a_b_c)"),
+                         [('link', 0, 37), ('bold', 1, 9), ('italic', 14, 20)])
+        self.assertEqual(spans("[`code`](u)"), [('link', 0, 11), ('code', 1, 7)])
+        
+    def test_unclosed_bold(self):
+        self.assertEqual(spans("**unclosed *x*"), [('italic', 11, 14)])
+        
+    def test_range(self):
+        line = "*a* **b** `c`"
+        self.assertEqual(spans(line), [('italic', 0, 3), ('bold', 4, 9), ('code', 10, 13)])
+        self.assertEqual([tuple(span) for span in scan_inline(line, 4, 9)], [('bold', 4, 9)])
+
+
+class ClassifyLineTest(unittest.TestCase):
+    def test_blocks(self):
+        self.assertEqual(classify_line("## Usage"), 'h2')
+        self.assertEqual(classify_line("####### seven"), None)
+        self.assertEqual(classify_line("#hashtag"), None)
+        self.assertEqual(classify_line("```python"), 'code_block')
+        self.assertEqual(classify_line("> quote"), 'blockquote')
+        self.assertEqual(classify_line("  - item"), 'list_item')
+        self.assertEqual(classify_line("12. item"), 'list_item')
+        self.assertEqual(classify_line("![v](https://img.shields.io/badge/a-b-blue)"), 'badge')
+        self.assertEqual(classify_line("text"), None)
+
+
+def shadowed(span, scanner_spans, line):
+    # A legacy span the scanner skips on purpose: markers inside a code span or a link's URL
+    if span in scanner_spans:
+        return False
+    _, start, end = span
+    for other_kind, other_start, other_end in scanner_spans:
+        if other_kind == 'code' and other_start <= start and end <= other_end:
+            return True
+        if other_kind == 'link' and line.index('](', other_start) < start and end <= other_end:
+            return True
+    return False
+
+
+class LegacyTaggerTest(unittest.TestCase):
+    # The scanner tags what the old four-regex tagger did, except where the
+    # old one tagged markers inside code spans or link URLs
+    def test_matches_legacy_on_corpus(self):
+        lines = list(SAMPLE_LINES)
+        for kind in KINDS:
+            lines.extend(generate(kind, 1000).split('\n'))
+            
+        for line in lines:
+            scanner = set(scanner_format_line(line))
+            legacy = set(legacy_format_line(line))
+            with self.subTest(line=line):
+                self.assertEqual(scanner, {span for span in legacy if not shadowed(span, scanner, line)})
+                # The scanner finds nothing the old tagger missed
+                self.assertLessEqual(scanner, legacy)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from linkcheck import LinkCache, LinkChecker
+
+# LinkChecker against a stub HTTP/1.1 server on 127.0.0.1. The server counts
+# connections and requests, so reuse and caching show up as numbers.
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    
+    # path -> (status, location) for both methods; /head-refused answers HEAD with 405
+    ROUTES = {
+        '/ok': (200, None),
+        '/missing': (404, None),
+        '/redirect-1': (302, '/redirect-2'),
+        '/redirect-2': (301, '/ok'),
+        '/loop': (302, '/loop'),
+        '/caf%C3%A9?q=%C3%BC': (200, None),
+    }
+    
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+            
+    def do_HEAD(self):
+        self.respond('HEAD')
+        
+    def do_GET(self):
+        self.respond('GET')
+        
+    def respond(self, method):
+        with self.server.lock:
+            self.server.requests.append((method, self.path))
+        if self.path == '/head-refused':
+            status, location = (405, None) if method == 'HEAD' else (200, None)
+        else:
+            status, location = self.ROUTES.get(self.path, (404, None))
+            
+        body = b'' if method == 'HEAD' else f"{status} {self.path}".encode('ascii')
+        self.send_response(status)
+        if location:
+            self.send_header('Location', location)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = []
+        
+    def url(self, path):
+        return f"http://127.0.0.1:{self.server_address[1]}{path}"
+
+
+class LinkCheckTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer()
+        self.thread = threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+        self.thread.start()
+        self.directory = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.directory, 'cache.json')
+        
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+        
+    def check(self, paths, **options):
+        options.setdefault('timeout', 5.0)
+        checker = LinkChecker(**options)
+        return checker.run([self.server.url(path) for path in paths])
+        
+    def result(self, results, path):
+        return results[self.server.url(path)]
+        
+    def test_ok(self):
+        result = self.result(self.check(['/ok']), '/ok')
+        self.assertTrue(result.ok)
+        self.assertEqual(result.status, 200)
+        self.assertIsNone(result.error)
+        self.assertFalse(result.cached)
+        self.assertEqual(self.server.requests, [('HEAD', '/ok')])
+        
+    def test_head_refused_falls_back_to_get(self):
+        result = self.result(self.check(['/head-refused']), '/head-refused')
+        self.assertTrue(result.ok)
+        self.assertEqual(result.status, 200)
+        self.assertEqual(self.server.requests, [('HEAD', '/head-refused'), ('GET', '/head-refused')])
+        
+    def test_non_ascii_path_encoded(self):
+        result = self.result(self.check(['/café?q=ü']), '/café?q=ü')
+        self.assertTrue(result.ok)
+        self.assertEqual(self.server.requests, [('HEAD', '/caf%C3%A9?q=%C3%BC')])
+        
+    def test_redirect_chain(self):
+        result = self.result(self.check(['/redirect-1']), '/redirect-1')
+        self.assertTrue(result.ok)
+        self.assertEqual(result.status, 200)
+        self.assertEqual([path for _, path in self.server.requests], ['/redirect-1', '/redirect-2', '/ok'])
+        
+    def test_redirect_loop(self):
+        result = self.result(self.check(['/loop']), '/loop')
+        self.assertFalse(result.ok)
+        self.assertIsNone(result.status)
+        self.assertIn('redirects', result.error)
+        
+    def test_not_found(self):
+        result = self.result(self.check(['/missing']), '/missing')
+        self.assertFalse(result.ok)
+        self.assertEqual(result.status, 404)
+        self.assertEqual(result.error, 'HTTP 404')
+        
+    def test_connections_reused_per_host(self):
+        paths = ['/ok', '/missing', '/redirect-1', '/head-refused', '/ok?again']
+        results = self.check(paths, per_host=1)
+        self.assertEqual(len(results), len(paths))
+        
+        # One keep-alive connection carried every request, 404s and redirects included
+        self.assertGreater(len(self.server.requests), len(paths))
+        self.assertEqual(self.server.connections, 1)
+        
+    def test_per_host_limit(self):
+        paths = [f"/ok?{number}" for number in range(12)]
+        self.check(paths, per_host=3)
+        self.assertEqual(len(self.server.requests), len(paths))
+        self.assertLessEqual(self.server.connections, 3)
+        
+    def test_results_cached(self):
+        cache = LinkCache(path=self.cache_path)
+        first = self.check(['/ok', '/missing'], cache=cache)
+        self.assertFalse(any(result.cached for result in first.values()))
+        requests = len(self.server.requests)
+        
+        # A fresh cache object reads what the first run saved; nothing goes to the network
+        second = self.check(['/ok', '/missing'], cache=LinkCache(path=self.cache_path))
+        self.assertEqual(len(self.server.requests), requests)
+        self.assertTrue(all(result.cached for result in second.values()))
+        self.assertTrue(self.result(second, '/ok').ok)
+        self.assertEqual(self.result(second, '/missing').status, 404)
+        
+    def test_cache_ttl(self):
+        cache = LinkCache(path=self.cache_path, ttl=100, failure_ttl=10)
+        self.check(['/ok', '/missing'], cache=cache)
+        ok_url, missing_url = self.server.url('/ok'), self.server.url('/missing')
+        now = time.time()
+        
+        # Failures expire first, so a fixed link is re-checked sooner
+        self.assertIsNotNone(cache.get(ok_url, now=now + 50))
+        self.assertIsNone(cache.get(missing_url, now=now + 50))
+        self.assertIsNone(cache.get(ok_url, now=now + 150))
+        
+        # Expired entries are checked again
+        cache.entries[ok_url]['checked'] -= 150
+        requests = len(self.server.requests)
+        result = self.result(self.check(['/ok'], cache=cache), '/ok')
+        self.assertFalse(result.cached)
+        self.assertEqual(len(self.server.requests), requests + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()